@@ -0,0 +1,289 @@
+"""Arena de políticas: todos contra todos, con Elo y parada temprana.
+
+Cada ronda usa una semilla y juega una partida por cada forma de sentar a
+las políticas en la mesa (todas las permutaciones), así que ninguna se
+beneficia del asiento ni de la baraja. Las rondas se reparten en lotes
+entre procesos; los resultados se aplican en orden de lote, de modo que el
+Elo es reproducible. La corrida se detiene en cuanto el intervalo de
+confianza (Wilson, 95%) de la mejor política deja de solaparse con el de
+la segunda.
+
+Políticas:
+    heuristic                 cascada de machine_select_card
+    random                    carta válida al azar
+    params:ajuste.json        heurística con parámetros (p. ej. de UNOTuner --out)
+    policy:politica.npz       política aprendida de UNOPolicy
+    endgame[:CARTAS]          solucionador de finales sobre la heurística
+    modulo:funcion            cualquier política importable
+
+Con --checkpoint arena.ckpt.json el avance (lotes aplicados y tabla) se
+guarda cada pocos segundos; relanzar el mismo comando continúa desde ahí y
+da la misma tabla que una corrida sin interrupciones.
+
+Uso:
+    python UNOArena.py heuristic random params:ajuste.json --rounds 2000 --out arena.csv
+"""
+import argparse
+import csv
+import importlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations, product
+
+from UNOCheckpoint import DEFAULT_INTERVAL_S, Checkpointer
+from UNOEngine import DEFAULT_RULES, MACHINE_SEAT, heuristic_policy, make_heuristic_policy, play_headless_game, random_policy
+from UNOTuner import wilson_interval
+
+ELO_START = 1500.0
+ELO_K = 32.0
+ELO_K_DECAY = 20  # K efectivo = ELO_K * ELO_K_DECAY / (ELO_K_DECAY + partidas): converge en vez de oscilar
+DEFAULT_BATCH_ROUNDS = 10
+MIN_ROUNDS = 50  # Rondas antes de considerar la parada temprana
+
+_policy_cache = {}
+
+
+def load_policy(spec):
+    """Construye la política de una especificación (ver el encabezado del módulo)"""
+    policy = _policy_cache.get(spec)
+    if policy is not None:
+        return policy
+    kind, _, arg = spec.partition(':')
+    if spec == 'heuristic':
+        policy = heuristic_policy
+    elif spec == 'random':
+        policy = random_policy
+    elif kind == 'params':
+        with open(arg, encoding='utf-8') as f:
+            params = json.load(f)
+        if isinstance(params, list):  # Salida de UNOTuner: el primero es el mejor
+            params = params[0]['params']
+        policy = make_heuristic_policy({key: tuple(value) if isinstance(value, list) else value
+                                        for key, value in params.items()})
+    elif kind == 'policy':
+        from UNOPolicy import LearnedPolicy
+        policy = LearnedPolicy.load(arg)
+    elif kind == 'endgame':
+        from UNOEndgame import EndgamePolicy, EndgameSolver
+        policy = EndgamePolicy(EndgameSolver(threshold=int(arg)) if arg else None)
+    elif arg:
+        policy = getattr(importlib.import_module(kind), arg)
+    else:
+        raise ValueError(f"Política desconocida: {spec}")
+    _policy_cache[spec] = policy
+    return policy
+
+
+def seatings(num_policies, num_players):
+    """Formas de sentar a las políticas: permutaciones, o con repetición si hay menos
+    políticas que asientos (todas presentes en cada mesa)"""
+    if num_policies >= num_players:
+        return list(permutations(range(num_policies), num_players))
+    return [seating for seating in product(range(num_policies), repeat=num_players)
+            if len(set(seating)) == num_policies]
+
+
+def _play_batch(args):
+    """Juega las rondas de un lote; devuelve [(asientos, asiento ganador o None)]"""
+    specs, table, seeds, num_players, rules = args
+    policies = [load_policy(spec) for spec in specs]
+    results = []
+    for seed in seeds:
+        for seating in table:
+            game = play_headless_game(
+                seed=seed, num_players=num_players,
+                policies={seat: policies[p] for seat, p in enumerate(seating) if seat != MACHINE_SEAT},
+                machine_policy=policies[seating[MACHINE_SEAT]], rules=rules)
+            results.append((seating, game.winner))
+    return results
+
+
+class ArenaStandings:
+    """Elo incremental y conteo de victorias por política"""
+
+    def __init__(self, names, num_players, k=ELO_K):
+        self.names = names
+        self.num_players = num_players
+        self.k = k
+        self.elo = [ELO_START] * len(names)
+        self.games = [0] * len(names)  # Partidas en las que la política tuvo al menos un asiento
+        self.wins = [0] * len(names)
+        self.seats = [0] * len(names)  # Asientos ocupados: la tasa esperada al azar es seats / (games * N)
+        self.draws = 0
+
+    def record(self, seating, winner_seat):
+        present = set(seating)
+        for p in present:
+            self.games[p] += 1
+        for p in seating:
+            self.seats[p] += 1
+        if winner_seat is None:
+            self.draws += 1
+            return
+        winner = seating[winner_seat]
+        self.wins[winner] += 1
+        # Multijugador como pares: el ganador le gana a cada política perdedora
+        losers = present - {winner}
+        played = min(self.games[p] for p in present)
+        scale = self.k * ELO_K_DECAY / (ELO_K_DECAY + played) / max(len(seating) - 1, 1)
+        for loser in losers:
+            expected = 1.0 / (1.0 + 10 ** ((self.elo[loser] - self.elo[winner]) / 400.0))
+            self.elo[winner] += scale * (1.0 - expected)
+            self.elo[loser] -= scale * (1.0 - expected)
+
+    def interval(self, p):
+        return wilson_interval(self.wins[p], self.games[p])
+
+    def state(self):
+        return {'elo': self.elo, 'games': self.games, 'wins': self.wins, 'seats': self.seats,
+                'draws': self.draws}
+
+    def restore(self, state):
+        self.elo = state['elo']
+        self.games = state['games']
+        self.wins = state['wins']
+        self.seats = state['seats']
+        self.draws = state['draws']
+
+    def ranking(self):
+        return sorted(range(len(self.names)), key=lambda p: self.wins[p] / max(self.games[p], 1),
+                      reverse=True)
+
+    def separated(self):
+        """True si el IC de la mejor política ya no se solapa con el de la segunda"""
+        if len(self.names) < 2:
+            return True
+        best, second = self.ranking()[:2]
+        return self.interval(best)[0] > self.interval(second)[1]
+
+    def rows(self):
+        rows = []
+        for p in self.ranking():
+            low, high = self.interval(p)
+            rows.append({
+                'politica': self.names[p],
+                'elo': round(self.elo[p], 1),
+                'partidas': self.games[p],
+                'victorias': self.wins[p],
+                'tasa': self.wins[p] / max(self.games[p], 1),
+                'ic95_min': low,
+                'ic95_max': high,
+                'esperada': self.seats[p] / max(self.games[p] * self.num_players, 1),
+            })
+        return rows
+
+
+def run_arena(specs, rounds=1000, num_players=3, workers=None, seed=0,
+              batch_rounds=DEFAULT_BATCH_ROUNDS, min_rounds=MIN_ROUNDS, early_stop=True, log=print,
+              checkpoint_path=None, checkpoint_interval=DEFAULT_INTERVAL_S, rules=None):
+    """Juega hasta `rounds` rondas (o hasta que el resultado sea claro) y devuelve la tabla.
+
+    Con checkpoint_path guarda el avance y, si ya existe, continúa desde él.
+    rules activa reglas de la casa (UNOEngine.DEFAULT_RULES) en todas las partidas.
+    """
+    for spec in specs:
+        load_policy(spec)  # Falla pronto si alguna especificación es inválida
+    table = seatings(len(specs), num_players)
+    standings = ArenaStandings(list(specs), num_players)
+    workers = workers or os.cpu_count() or 1
+    batches = [list(range(start, min(start + batch_rounds, seed + rounds)))
+               for start in range(seed, seed + rounds, batch_rounds)]
+    log(f"{len(specs)} políticas, {len(table)} formas de sentarse, hasta {rounds} rondas "
+        f"({rounds * len(table)} partidas) en {workers} procesos")
+    done_rounds = 0
+    stopped = False
+    first_batch = 0
+    checkpoint = None
+    if checkpoint_path:
+        # Los workers no cambian el resultado, así que se puede reanudar con otros
+        checkpoint = Checkpointer(checkpoint_path, checkpoint_interval, params={
+            'specs': specs, 'rounds': rounds, 'num_players': num_players, 'seed': seed,
+            'batch_rounds': batch_rounds, 'min_rounds': min_rounds, 'early_stop': early_stop,
+            'rules': rules or {}})
+        state = checkpoint.load()
+        if state is not None:
+            standings.restore(state['standings'])
+            first_batch = state['next_batch']
+            done_rounds = state['rounds']
+            stopped = state['stopped']
+            log(f"↩️ Reanudando tras {done_rounds} rondas")
+
+    def save(next_batch):
+        checkpoint.save({'next_batch': next_batch, 'rounds': done_rounds, 'stopped': stopped,
+                         'standings': standings.state()})
+
+    if stopped or first_batch == len(batches):
+        batches_left = range(0)
+    else:
+        batches_left = range(first_batch, len(batches))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        next_submit = first_batch
+        for next_apply in batches_left:
+            # Mantener el pool lleno sin encolar toda la corrida (para poder parar pronto)
+            while next_submit < len(batches) and len(in_flight) < 2 * workers:
+                job = (tuple(specs), table, batches[next_submit], num_players, rules)
+                in_flight[next_submit] = pool.submit(_play_batch, job)
+                next_submit += 1
+            # Aplicar los lotes en orden, para que el Elo sea reproducible
+            for seating, winner in in_flight.pop(next_apply).result():
+                standings.record(seating, winner)
+            done_rounds += len(batches[next_apply])
+            if early_stop and done_rounds >= min_rounds and standings.separated():
+                stopped = True
+                for future in in_flight.values():
+                    future.cancel()
+                log(f"✅ Resultado claro tras {done_rounds} rondas")
+                break
+            if checkpoint is not None and checkpoint.due():
+                save(next_apply + 1)
+        else:
+            next_apply = len(batches) - 1
+    if checkpoint is not None:
+        save(next_apply + 1)
+    return {'rounds': done_rounds, 'stopped_early': stopped, 'games': done_rounds * len(table),
+            'draws': standings.draws, 'table': standings.rows()}
+
+
+def write_table(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arena de políticas de UNO con Elo")
+    parser.add_argument('policies', nargs='+', help="Especificaciones de política (ver --help del módulo)")
+    parser.add_argument('--rounds', type=int, default=1000, help="Máximo de rondas (semillas)")
+    parser.add_argument('--players', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH_ROUNDS, help="Rondas por lote")
+    parser.add_argument('--min-rounds', type=int, default=MIN_ROUNDS)
+    parser.add_argument('--no-early-stop', action='store_true')
+    parser.add_argument('--out', default=None, help="Guardar la tabla en CSV")
+    parser.add_argument('--checkpoint', default=None, metavar='RUTA',
+                        help="Guardar el avance en RUTA y reanudar desde ahí si ya existe")
+    parser.add_argument('--checkpoint-interval', type=float, default=DEFAULT_INTERVAL_S)
+    parser.add_argument('--rules', nargs='*', choices=sorted(DEFAULT_RULES), default=[],
+                        help="Reglas de la casa para todas las partidas")
+    args = parser.parse_args()
+    result = run_arena(args.policies, args.rounds, args.players, args.workers, args.seed,
+                       args.batch, args.min_rounds, not args.no_early_stop,
+                       checkpoint_path=args.checkpoint, checkpoint_interval=args.checkpoint_interval,
+                       rules={rule: True for rule in args.rules})
+    print(f"\n🏟️ ARENA: {result['rounds']} rondas, {result['games']} partidas, "
+          f"{result['draws']} sin ganador")
+    print(f"{'Política':28s} {'Elo':>7s} {'Partidas':>9s} {'Tasa':>7s} {'IC 95%':>17s}")
+    for row in result['table']:
+        print(f"{row['politica']:28s} {row['elo']:7.1f} {row['partidas']:9d} {row['tasa']:7.1%} "
+              f"[{row['ic95_min']:.1%}, {row['ic95_max']:.1%}]")
+    if args.out:
+        write_table(args.out, result['table'])
+        print(f"Tabla guardada en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""Benchmarks reproducibles de las rutas críticas del motor, el agente y la interfaz.
+
+Cada benchmark usa semillas fijas, se repite varias veces y reporta el mejor
+tiempo por operación. Los resultados se guardan en JSON para comparar
+corridas; con --compare el comando falla (código 1) si algún benchmark es
+más lento que la referencia por encima del umbral. Un benchmark que lanza
+una excepción queda en 'failed' del JSON, el resto se guarda igual y el
+comando termina con código 1.
+
+Uso:
+    python UNOBenchmark.py --out base.json
+    python UNOBenchmark.py --out nuevo.json --compare base.json --threshold 0.15
+"""
+import argparse
+import gc
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from UNOEngine import DEFAULT_RULES, UNODeck, UNOGameEngine, play_headless_game
+
+SEED = 12345
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.15  # 15% más lento que la referencia = regresión
+
+BENCHMARKS = {}
+
+
+class BenchmarkSkipped(Exception):
+    """El benchmark no puede correr en este entorno (sin pantalla, sin openpyxl, ...)"""
+
+
+def benchmark(name):
+    """Registra una función que recibe `scale` y devuelve (operaciones, función a medir)"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _mid_game_states(count, turns=12):
+    """Partidas detenidas a mitad de juego, siempre las mismas"""
+    states = []
+    seed = SEED
+    while len(states) < count:
+        game = UNOGameEngine(seed=seed, observers=('beliefs',))
+        game.start_new_game()
+        game.play_until_over(turns)
+        if game.game_started:
+            states.append(game)
+        seed += 1
+    return states
+
+
+@benchmark('deck_create_and_deal')
+def bench_deck(scale):
+    rng = random.Random(SEED)
+    n = 200 * scale
+
+    def run():
+        for _ in range(n):
+            deck = UNODeck(rng)
+            for _ in range(22):
+                deck.deal_card()
+    return n, run
+
+
+@benchmark('is_valid_play')
+def bench_is_valid_play(scale):
+    states = _mid_game_states(20)
+    pairs = [(game, card) for game in states for hand in game.player_hands for card in hand]
+    rounds = 50 * scale
+
+    def run():
+        for _ in range(rounds):
+            for game, card in pairs:
+                game.is_valid_play(card)
+    return rounds * len(pairs), run
+
+
+@benchmark('get_machine_valid_cards')
+def bench_machine_valid_cards(scale):
+    states = _mid_game_states(20)
+    rounds = 200 * scale
+
+    def run():
+        for _ in range(rounds):
+            for game in states:
+                game.get_machine_valid_cards()
+    return rounds * len(states), run
+
+
+@benchmark('machine_select_card')
+def bench_machine_select_card(scale):
+    states = [(game, game.get_valid_cards(1)) for game in _mid_game_states(40)]
+    states = [(game, valid) for game, valid in states if valid]
+    rounds = 100 * scale
+
+    def run():
+        for _ in range(rounds):
+            for game, valid in states:
+                game.machine_select_card(valid)
+    return rounds * len(states), run
+
+
+@benchmark('update_probabilities_after_play')
+def bench_probabilities_after_play(scale):
+    game = UNOGameEngine(seed=SEED, observers=())
+    game.start_new_game()
+    cards = UNODeck(random.Random(SEED)).cards
+    # Como en la mesa: la carta previa es la última que no fue comodín
+    last_colored = next(card for card in reversed(cards) if card.card_type != 'wildcard')
+    rounds = 20 * scale
+
+    def run():
+        for _ in range(rounds):
+            game.init_probability_system()
+            prev = last_colored
+            for card in cards:
+                game.update_probabilities_after_play(0, card, prev.color, prev.value)
+                if card.card_type != 'wildcard':
+                    prev = card
+    return rounds * len(cards), run
+
+
+@benchmark('update_probabilities_after_draw')
+def bench_probabilities_after_draw(scale):
+    game = UNOGameEngine(seed=SEED, observers=())
+    game.start_new_game()
+    rounds = 2000 * scale
+
+    def run():
+        for _ in range(rounds):
+            game.update_probabilities_after_draw(0)
+            game.update_probabilities_after_draw(2)
+    return rounds * 2, run
+
+
+@benchmark('registrar_jugada')
+def bench_registrar_jugada(scale):
+    game = UNOGameEngine(seed=SEED, observers=())
+    game.start_new_game()
+    cards = UNODeck(random.Random(SEED)).cards
+    rounds = 20 * scale
+
+    def run():
+        for _ in range(rounds):
+            game.jugada_stats = []
+            for card in cards:
+                game.registrar_jugada(0, card, 'r', 5)
+    return rounds * len(cards), run
+
+
+@benchmark('export_excel')
+def bench_export(scale):
+    try:
+        import pandas as pd
+        import openpyxl  # noqa: F401  (motor de to_excel)
+    except ImportError as e:
+        raise BenchmarkSkipped(f"falta {e.name}")
+    games = [play_headless_game(seed=SEED + i, observers=('beliefs', 'stats')) for i in range(5)]
+    rows = [row for game in games for row in game.jugada_stats]
+    rounds = scale
+
+    def run():
+        for _ in range(rounds):
+            pd.DataFrame(rows).to_excel(io.BytesIO(), index=False)
+    return rounds, run
+
+
+@benchmark('headless_game')
+def bench_headless_game(scale):
+    n = 50 * scale
+
+    def run():
+        for seed in range(SEED, SEED + n):
+            play_headless_game(seed=seed)
+    return n, run
+
+
+@benchmark('headless_game_8p_2decks')
+def bench_headless_large_table(scale):
+    n = 50 * scale
+
+    def run():
+        for seed in range(SEED, SEED + n):
+            play_headless_game(seed=seed, num_players=8, num_decks=2)
+    return n, run
+
+
+def _bench_rule(rule):
+    """Partidas sin interfaz con una regla de la casa, para comparar con headless_game"""
+    def setup(scale):
+        n = 50 * scale
+
+        def run():
+            for seed in range(SEED, SEED + n):
+                play_headless_game(seed=seed, rules={rule: True})
+        return n, run
+    return setup
+
+
+for _rule in DEFAULT_RULES:
+    benchmark(f'headless_game_{_rule}')(_bench_rule(_rule))
+
+
+@benchmark('headless_game_invariants_1pct')
+def bench_headless_invariants(scale):
+    from UNOInvariants import InvariantChecker
+    checker = InvariantChecker(rate=0.01)
+    n = 50 * scale
+
+    def run():
+        for seed in range(SEED, SEED + n):
+            play_headless_game(seed=seed, invariants=checker)
+    return n, run
+
+
+@benchmark('gui_update_all_displays')
+def bench_gui(scale):
+    try:
+        import tkinter as tk
+        from UNOInterface import UNOIntelligentGUI
+    except ImportError as e:
+        raise BenchmarkSkipped(f"falta {e.name}")
+    random.seed(SEED)
+    try:
+        app = UNOIntelligentGUI()
+    except tk.TclError as e:
+        raise BenchmarkSkipped(f"sin pantalla ({e}); usar xvfb-run")
+    app.root.withdraw()
+    rounds = 10 * scale
+
+    def run():
+        for _ in range(rounds):
+            app.update_all_displays()
+            app.root.update_idletasks()
+    run.cleanup = app.root.destroy
+    return rounds, run
+
+
+def run_benchmark(name, repeats=DEFAULT_REPEATS, scale=1):
+    ops, run = BENCHMARKS[name](scale)
+    timings = []
+    try:
+        run()  # Calentamiento
+        gc.collect()
+        gc.disable()  # Igual que timeit: el recolector no ensucia las mediciones
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+        cleanup = getattr(run, 'cleanup', None)
+        if cleanup:
+            cleanup()
+    best = min(timings)
+    return {
+        'ops': ops,
+        'repeats': repeats,
+        'best_s': best,
+        'ns_per_op': best / ops * 1e9,
+        'ops_per_s': ops / best if best else float('inf'),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names=None, repeats=DEFAULT_REPEATS, scale=1, log=print):
+    results = {}
+    skipped = {}
+    failed = {}
+    for name in names or BENCHMARKS:
+        random.seed(SEED)
+        try:
+            results[name] = run_benchmark(name, repeats, scale)
+        except BenchmarkSkipped as e:
+            skipped[name] = str(e)
+            log(f"  {name:34s} omitido: {e}")
+            continue
+        except Exception as e:  # Un benchmark roto no tira el resto de la corrida
+            failed[name] = f"{type(e).__name__}: {e}"
+            log(f"  {name:34s} falló: {failed[name]}")
+            continue
+        r = results[name]
+        log(f"  {name:34s} {r['ns_per_op'] / 1000:12.2f} µs/op {r['ops_per_s']:14.1f} op/s")
+    return {
+        'meta': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': SEED,
+            'repeats': repeats,
+            'scale': scale,
+        },
+        'results': results,
+        'skipped': skipped,
+        'failed': failed,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Lista de (nombre, cambio relativo) de los benchmarks que empeoraron más del umbral"""
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        change = result['ns_per_op'] / base['ns_per_op'] - 1.0
+        if change > threshold:
+            regressions.append((name, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de UNO")
+    parser.add_argument('--out', default=None, help="Guardar resultados en JSON")
+    parser.add_argument('--compare', default=None, help="JSON de referencia")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--scale', type=int, default=1, help="Multiplica el trabajo de cada benchmark")
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), default=None)
+    args = parser.parse_args()
+    print("⏱️ BENCHMARKS UNO")
+    current = run_suite(args.only, args.repeats, args.scale)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+    for name, error in current['failed'].items():
+        print(f"❌ Falló {name}: {error}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for name, change in regressions:
+            print(f"❌ Regresión en {name}: {change:+.1%}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ Sin regresiones mayores a {args.threshold:.0%}")
+    if current['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
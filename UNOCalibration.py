@@ -0,0 +1,324 @@
+"""Calibración de las probabilidades del agente contra las manos reales.
+
+Cada instantánea de decisión (ver UNOGameEngine.snapshot_decision) trae las
+probabilidades de cada jugador humano y las manos reales. Para cada entrada
+del modelo (4 colores, 10 números, 3 especiales, 2 comodines) el resultado
+es 1 si el jugador tenía al menos una carta de ese tipo.
+
+El corpus se guarda en fragmentos .npy, una fila por (decisión, jugador humano):
+
+    probs_<worker>_<n>.npy     float32 (filas, 19)
+    outcomes_<worker>_<n>.npy  uint8   (filas, 19)
+
+El análisis recorre los fragmentos por bloques (mmap) y acumula por entrada
+e intervalo de probabilidad con np.bincount, así que la memoria no depende
+del tamaño del corpus: Brier, log-loss, error de calibración esperado (ECE)
+y curvas de confiabilidad.
+
+Uso:
+    python UNOCalibration.py record --games 100000 --workers 8 --out calibracion/
+    python UNOCalibration.py analyze --data calibracion/ --curves curvas.csv
+    python UNOCalibration.py analyze --games 2000    # simular y analizar sin pasar por disco
+"""
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from UNOEngine import BELIEF_KEYS, CARD_FACES, MACHINE_SEAT, NUM_FACES, play_headless_game
+
+CALIBRATION_VERSION = 1
+BELIEF_WIDTH = len(BELIEF_KEYS)
+BELIEF_LABELS = {
+    ('colors', 'a'): 'Azul', ('colors', 'v'): 'Verde', ('colors', 'r'): 'Rojo', ('colors', 'am'): 'Amarillo',
+    ('specials', 'r2'): 'Come 2', ('specials', 'rev'): 'Reversa', ('specials', 's'): 'Salta',
+    ('wildcards', 'c'): 'Comodín', ('wildcards', 'r4'): 'Come 4',
+}
+LABELS = [BELIEF_LABELS.get(key, str(key[1])) for key in BELIEF_KEYS]
+
+DEFAULT_BINS = 10
+DEFAULT_SHARD_ROWS = 1 << 18
+DEFAULT_CHUNK_ROWS = 1 << 16
+LOG_EPS = 1e-6  # Las probabilidades 0 y 1 se recortan para que el log-loss sea finito
+
+
+def _build_outcome_table():
+    """OUTCOME_TABLE[cara, entrada] indica si la cara cuenta para esa entrada del modelo"""
+    table = np.zeros((NUM_FACES, BELIEF_WIDTH), dtype=np.uint8)
+    for face_id, (color, value) in enumerate(CARD_FACES):
+        for index, (category, key) in enumerate(BELIEF_KEYS):
+            if category == 'colors':
+                table[face_id, index] = color == key
+            else:
+                table[face_id, index] = value == key and (category == 'numbers') == isinstance(value, int)
+    return table
+
+
+OUTCOME_TABLE = _build_outcome_table()
+
+
+def snapshot_rows(snapshots):
+    """Probabilidades y resultados reales de una lista de instantáneas: (probs, outcomes)"""
+    beliefs = []
+    owners = []  # Fila -> índice de la mano real en `hands`
+    hands = []
+    for snapshot in snapshots:
+        seats = [p for p in range(len(snapshot['hands'])) if p != MACHINE_SEAT]
+        for seat, belief in zip(seats, snapshot['beliefs']):
+            beliefs.append(belief)
+            owners.append(len(hands))
+            hands.append(snapshot['hands'][seat])
+    if not beliefs:
+        return (np.zeros((0, BELIEF_WIDTH), dtype=np.float32),
+                np.zeros((0, BELIEF_WIDTH), dtype=np.uint8))
+    counts = np.zeros((len(hands), NUM_FACES), dtype=np.int32)
+    rows = np.repeat(np.arange(len(hands)), [len(hand) for hand in hands])
+    np.add.at(counts, (rows, np.concatenate(hands).astype(np.intp)), 1)
+    outcomes = (counts @ OUTCOME_TABLE > 0).astype(np.uint8)
+    return np.asarray(beliefs, dtype=np.float32), outcomes[owners]
+
+
+def _simulated_rows(seed_start, n_games):
+    for seed in range(seed_start, seed_start + n_games):
+        yield snapshot_rows(play_headless_game(seed=seed, record_snapshots=True).decision_snapshots)
+
+
+class CalibrationStats:
+    """Acumuladores por entrada del modelo e intervalo de probabilidad"""
+
+    def __init__(self, bins=DEFAULT_BINS):
+        self.bins = bins
+        self.rows = 0
+        self.count = np.zeros((BELIEF_WIDTH, bins), dtype=np.int64)
+        self.prob_sum = np.zeros((BELIEF_WIDTH, bins))
+        self.outcome_sum = np.zeros((BELIEF_WIDTH, bins))
+        self.brier_sum = np.zeros(BELIEF_WIDTH)
+        self.logloss_sum = np.zeros(BELIEF_WIDTH)
+
+    def update(self, probs, outcomes):
+        """Añade un bloque de filas (probs float, outcomes 0/1), ambos (filas, 19)"""
+        p = np.asarray(probs, dtype=np.float64)
+        y = np.asarray(outcomes, dtype=np.float64)
+        size = BELIEF_WIDTH * self.bins
+        flat = (np.clip((p * self.bins).astype(np.intp), 0, self.bins - 1) +
+                np.arange(BELIEF_WIDTH) * self.bins).ravel()
+        self.count += np.bincount(flat, minlength=size).reshape(BELIEF_WIDTH, self.bins)
+        self.prob_sum += np.bincount(flat, weights=p.ravel(), minlength=size).reshape(BELIEF_WIDTH, self.bins)
+        self.outcome_sum += np.bincount(flat, weights=y.ravel(), minlength=size).reshape(BELIEF_WIDTH, self.bins)
+        self.brier_sum += ((p - y) ** 2).sum(axis=0)
+        clipped = np.clip(p, LOG_EPS, 1.0 - LOG_EPS)
+        self.logloss_sum -= (y * np.log(clipped) + (1.0 - y) * np.log1p(-clipped)).sum(axis=0)
+        self.rows += len(p)
+
+    def merge(self, other):
+        if other.bins != self.bins:
+            raise ValueError("No se pueden combinar estadísticas con distinto número de intervalos")
+        self.rows += other.rows
+        self.count += other.count
+        self.prob_sum += other.prob_sum
+        self.outcome_sum += other.outcome_sum
+        self.brier_sum += other.brier_sum
+        self.logloss_sum += other.logloss_sum
+        return self
+
+    def summary(self):
+        """Una fila por entrada: Brier, Brier de referencia (tasa base), log-loss y ECE"""
+        n = max(self.rows, 1)
+        rate = self.outcome_sum.sum(axis=1) / n
+        mean_prob = self.prob_sum.sum(axis=1) / n
+        gaps = np.abs(self.prob_sum - self.outcome_sum).sum(axis=1) / n
+        return [{
+            'entrada': LABELS[i],
+            'filas': self.rows,
+            'prob_media': mean_prob[i],
+            'tasa_real': rate[i],
+            'brier': self.brier_sum[i] / n,
+            'brier_base': rate[i] * (1.0 - rate[i]),
+            'log_loss': self.logloss_sum[i] / n,
+            'ece': gaps[i],
+        } for i in range(BELIEF_WIDTH)]
+
+    def curves(self):
+        """Curvas de confiabilidad: probabilidad media vs frecuencia real por intervalo"""
+        rows = []
+        for i in range(BELIEF_WIDTH):
+            for b in range(self.bins):
+                count = self.count[i, b]
+                if not count:
+                    continue
+                rows.append({
+                    'entrada': LABELS[i],
+                    'desde': b / self.bins,
+                    'hasta': (b + 1) / self.bins,
+                    'filas': int(count),
+                    'prob_media': self.prob_sum[i, b] / count,
+                    'frecuencia': self.outcome_sum[i, b] / count,
+                })
+        return rows
+
+
+# ----------------------------------------------------------------------
+# Corpus en disco
+# ----------------------------------------------------------------------
+def write_rows(blocks, out_dir, prefix, shard_rows=DEFAULT_SHARD_ROWS):
+    """Escribe bloques (probs, outcomes) en fragmentos de shard_rows filas; devuelve [(sufijo, filas)]"""
+    shards = []
+    pending = []
+    pending_rows = 0
+
+    def flush(rows):
+        nonlocal pending, pending_rows
+        probs = np.concatenate([p for p, _ in pending])
+        outcomes = np.concatenate([o for _, o in pending])
+        suffix = f"{prefix}_{len(shards):05d}"
+        np.save(os.path.join(out_dir, f"probs_{suffix}.npy"), probs[:rows])
+        np.save(os.path.join(out_dir, f"outcomes_{suffix}.npy"), outcomes[:rows])
+        shards.append((suffix, rows))
+        pending = [(probs[rows:], outcomes[rows:])]
+        pending_rows -= rows
+
+    for probs, outcomes in blocks:
+        pending.append((probs, outcomes))
+        pending_rows += len(probs)
+        while pending_rows >= shard_rows:
+            flush(shard_rows)
+    if pending_rows:
+        flush(pending_rows)
+    return shards
+
+
+def _record_worker(args):
+    out_dir, worker_id, seed_start, n_games, shard_rows = args
+    return write_rows(_simulated_rows(seed_start, n_games), out_dir, f"w{worker_id:03d}", shard_rows)
+
+
+def _jobs(n_games, workers, seed):
+    per_worker = -(-n_games // workers)
+    for worker_id in range(workers):
+        start = worker_id * per_worker
+        count = min(per_worker, n_games - start)
+        if count > 0:
+            yield worker_id, seed + start, count
+
+
+def _run_jobs(func, jobs):
+    if len(jobs) == 1:
+        return [func(jobs[0])]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        return list(pool.map(func, jobs))
+
+
+def record_corpus(out_dir, n_games, workers=None, seed=0, shard_rows=DEFAULT_SHARD_ROWS):
+    """Simula n_games partidas en paralelo y guarda probabilidades y resultados reales"""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    jobs = [(out_dir, worker_id, start, count, shard_rows)
+            for worker_id, start, count in _jobs(n_games, workers, seed)]
+    shards = [shard for worker_shards in _run_jobs(_record_worker, jobs) for shard in worker_shards]
+    manifest = {
+        'version': CALIBRATION_VERSION,
+        'width': BELIEF_WIDTH,
+        'games': n_games,
+        'seed': seed,
+        'shards': [{'name': name, 'rows': rows} for name, rows in shards],
+    }
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def iter_corpus(data_dir, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Recorre el corpus por bloques de como máximo chunk_rows filas, sin cargarlo entero"""
+    with open(os.path.join(data_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest['version'] != CALIBRATION_VERSION:
+        raise ValueError(f"Versión de corpus {manifest['version']} no soportada "
+                         f"(se esperaba {CALIBRATION_VERSION})")
+    for shard in manifest['shards']:
+        name = shard['name']
+        probs = np.load(os.path.join(data_dir, f"probs_{name}.npy"), mmap_mode='r')
+        outcomes = np.load(os.path.join(data_dir, f"outcomes_{name}.npy"), mmap_mode='r')
+        for start in range(0, len(probs), chunk_rows):
+            yield probs[start:start + chunk_rows], outcomes[start:start + chunk_rows]
+
+
+def analyze_corpus(data_dir, bins=DEFAULT_BINS, chunk_rows=DEFAULT_CHUNK_ROWS):
+    stats = CalibrationStats(bins)
+    for probs, outcomes in iter_corpus(data_dir, chunk_rows):
+        stats.update(probs, outcomes)
+    return stats
+
+
+def _analyze_worker(args):
+    seed_start, n_games, bins = args
+    stats = CalibrationStats(bins)
+    for probs, outcomes in _simulated_rows(seed_start, n_games):
+        stats.update(probs, outcomes)
+    return stats
+
+
+def analyze_games(n_games, workers=None, seed=0, bins=DEFAULT_BINS):
+    """Simula y analiza en paralelo sin escribir el corpus; cada proceso devuelve sus acumuladores"""
+    workers = workers or os.cpu_count() or 1
+    jobs = [(start, count, bins) for _, start, count in _jobs(n_games, workers, seed)]
+    stats = CalibrationStats(bins)
+    for worker_stats in _run_jobs(_analyze_worker, jobs):
+        stats.merge(worker_stats)
+    return stats
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibración de las probabilidades del agente de UNO")
+    sub = parser.add_subparsers(dest='command', required=True)
+    record = sub.add_parser('record', help="Simular partidas y guardar el corpus")
+    record.add_argument('--out', required=True, help="Directorio de salida")
+    record.add_argument('--games', type=int, default=1000)
+    record.add_argument('--workers', type=int, default=None)
+    record.add_argument('--seed', type=int, default=0)
+    record.add_argument('--shard-rows', type=int, default=DEFAULT_SHARD_ROWS)
+    analyze = sub.add_parser('analyze', help="Brier, log-loss y curvas de confiabilidad")
+    source = analyze.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data', help="Directorio del corpus grabado")
+    source.add_argument('--games', type=int, help="Simular partidas en vez de leer un corpus")
+    analyze.add_argument('--workers', type=int, default=None)
+    analyze.add_argument('--seed', type=int, default=0)
+    analyze.add_argument('--bins', type=int, default=DEFAULT_BINS)
+    analyze.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    analyze.add_argument('--out', default=None, help="Guardar el resumen por entrada en CSV")
+    analyze.add_argument('--curves', default=None, help="Guardar las curvas de confiabilidad en CSV")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        manifest = record_corpus(args.out, args.games, args.workers, args.seed, args.shard_rows)
+        rows = sum(shard['rows'] for shard in manifest['shards'])
+        print(f"{rows} filas en {len(manifest['shards'])} fragmentos -> {args.out}")
+        return
+
+    if args.data:
+        stats = analyze_corpus(args.data, args.bins, args.chunk_rows)
+    else:
+        stats = analyze_games(args.games, args.workers, args.seed, args.bins)
+    summary = stats.summary()
+    print(f"\n🎯 CALIBRACIÓN: {stats.rows} filas (decisión, jugador)")
+    print(f"{'Entrada':10s} {'p media':>8s} {'real':>7s} {'Brier':>7s} {'base':>7s} {'logloss':>8s} {'ECE':>7s}")
+    for row in summary:
+        print(f"{row['entrada']:10s} {row['prob_media']:8.3f} {row['tasa_real']:7.3f} {row['brier']:7.4f} "
+              f"{row['brier_base']:7.4f} {row['log_loss']:8.4f} {row['ece']:7.4f}")
+    if args.out:
+        write_csv(args.out, summary)
+    if args.curves:
+        write_csv(args.curves, stats.curves())
+
+
+if __name__ == "__main__":
+    main()
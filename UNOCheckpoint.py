@@ -0,0 +1,95 @@
+"""Puntos de control para corridas largas (UNOFeatures, UNOArena).
+
+Cada trabajo guarda su estado en un JSON pequeño cada `interval` segundos:
+se escribe en un archivo temporal, se sincroniza a disco y se reemplaza el
+anterior con os.replace, así que un corte deja el punto de control viejo o
+el nuevo, nunca uno a medias. Al reanudar se repite desde el último punto
+guardado; como cada partida depende solo de su semilla, el resultado es el
+mismo que sin interrupción.
+
+Los parámetros de la corrida se guardan aparte (check_params): reanudar con
+otros parámetros es un error y no una mezcla silenciosa de dos corridas.
+"""
+import json
+import os
+import time
+
+DEFAULT_INTERVAL_S = 5.0
+
+
+def atomic_write_json(path, data):
+    """Escribe JSON de forma atómica y durable: temporal, fsync y os.replace"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Sincronizar también el directorio, para que el reemplazo sobreviva a un corte de luz
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def load_json(path):
+    """Contenido de path, o None si no existe"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def check_params(path, params):
+    """Guarda los parámetros de la corrida o comprueba que coincidan con los guardados.
+
+    Devuelve True si ya había una corrida con esos parámetros (se reanuda).
+    """
+    params = json.loads(json.dumps(params))  # Tuplas como listas, igual que al leer
+    saved = load_json(path)
+    if saved is None:
+        atomic_write_json(path, params)
+        return False
+    if saved != params:
+        raise ValueError(f"El punto de control {path} es de otra corrida: {saved} (ahora {params})")
+    return True
+
+
+class Checkpointer:
+    """Estado de un trabajo en path; due() dice si ya pasaron `interval` segundos.
+
+    Si se dan params, se guardan junto al estado y load() rechaza un punto de
+    control de otra corrida.
+    """
+
+    def __init__(self, path, interval=DEFAULT_INTERVAL_S, params=None):
+        self.path = path
+        self.interval = interval
+        self.params = json.loads(json.dumps(params))
+        self.saves = 0
+        self._next = time.perf_counter() + interval
+
+    def load(self):
+        """Último estado guardado, o None si no hay"""
+        saved = load_json(self.path)
+        if saved is None:
+            return None
+        if saved['params'] != self.params:
+            raise ValueError(f"El punto de control {self.path} es de otra corrida: "
+                             f"{saved['params']} (ahora {self.params})")
+        return saved['state']
+
+    def due(self):
+        return time.perf_counter() >= self._next
+
+    def save(self, state):
+        atomic_write_json(self.path, {'params': self.params, 'state': state})
+        self.saves += 1
+        self._next = time.perf_counter() + self.interval
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,347 @@
+"""Solucionador de finales con expectimax para manos pequeñas.
+
+Cuando el jugador que decide y el siguiente tienen pocas cartas, se busca
+la mejor jugada con expectimax:
+
+- Nodos MAX: las jugadas válidas propias (una por cara distinta).
+- Nodos de azar: cartas robadas, distribuidas según card_counters.
+- Oponentes: su mano es desconocida; juegan con probabilidad
+  1 - (1 - f)^n, donde f es la fracción de cartas no vistas que son válidas
+  sobre la carta en juego y n el tamaño de su mano. La carta que juegan
+  (y su efecto) se reparte según la misma distribución.
+
+La tabla de memoria usa el estado canónico (mano ordenada, carta en juego,
+tamaños de los rivales, dirección, turno, robos pendientes, profundidad) y
+guarda cotas como una tabla de transposición. Los nodos de azar se podan
+con Star1 (valores acotados en [0, 1]). La búsqueda se profundiza
+iterativamente hasta agotar un presupuesto de nodos o de tiempo, y devuelve
+la jugada de la última profundidad terminada. Su valor es exacto solo si
+ninguna hoja se estimó con la heurística del horizonte y no se descartó
+ninguna rama de azar (MIN_PROBABILITY); cada entrada de la memoria guarda
+ambas marcas, así que un valor reutilizado las arrastra.
+"""
+import time
+
+from UNOEngine import CARD_FACES, NUM_FACES
+
+DEFAULT_THRESHOLD = 3
+DEFAULT_MAX_NODES = 50000
+DEFAULT_TIME_BUDGET = 0.25  # segundos, cabe en un turno interactivo de la máquina
+DEFAULT_MAX_DEPTH = 12
+MIN_PROBABILITY = 1e-3  # Ramas de azar menos probables se descartan
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# FACE_LEGAL[carta_en_juego][cara]
+FACE_LEGAL = [[color is None or color == top_color or value == top_value
+               for color, value in CARD_FACES]
+              for top_color, top_value in CARD_FACES]
+FACE_VALUES = [value for _, value in CARD_FACES]
+FACE_IS_WILD = [color is None for color, _ in CARD_FACES]
+DRAW_EFFECTS = {'r2': 2, 'r4': 4}
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+def unseen_distribution(card_counters, num_decks=1):
+    """Probabilidad de cada cara para la siguiente carta robada, a partir de los contadores.
+
+    Los contadores son marginales (por color, número, especial, comodín), así que
+    cada cara se estima como cantidad en el mazo x fracciones restantes de su color y valor.
+    """
+    weights = [0.0] * NUM_FACES
+    colors = card_counters['colors']
+    per_color = 25 * num_decks
+    for face_id, (color, value) in enumerate(CARD_FACES):
+        if color is None:
+            weights[face_id] = card_counters['wildcards'].get(value, 0)
+        elif value == 0:
+            weights[face_id] = colors[color] / per_color * card_counters['number_0']
+        elif isinstance(value, int):
+            weights[face_id] = 2 * colors[color] / per_color * card_counters['numbers'].get(value, 0) / 8
+        else:
+            weights[face_id] = 2 * colors[color] / per_color * card_counters['specials'].get(value, 0) / 8
+    total = sum(weights)
+    if total <= 0:
+        return [1.0 / NUM_FACES] * NUM_FACES
+    return [w / total for w in weights]
+
+
+class EndgameSolver:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_nodes=DEFAULT_MAX_NODES,
+                 time_budget=DEFAULT_TIME_BUDGET, max_depth=DEFAULT_MAX_DEPTH):
+        self.threshold = threshold
+        self.max_nodes = max_nodes
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.last_stats = {}
+
+    def applies(self, game, player_id):
+        """El final se activa si quien decide y el siguiente tienen <= threshold cartas
+        (solo con las reglas oficiales, que son las que modela el solucionador)"""
+        next_player = (player_id + game.game_direction) % game.num_players
+        return (not any(game.rules.values()) and
+                len(game.player_hands[player_id]) <= self.threshold and
+                len(game.player_hands[next_player]) <= self.threshold)
+
+    def solve(self, game, player_id, valid_cards):
+        """Devuelve (índice, carta, valor, exacto) de la mejor jugada, o None sin presupuesto"""
+        self.me = player_id
+        self.num_players = game.num_players
+        distribution = unseen_distribution(game.card_counters, game.num_decks)
+        self.draw_dist = [(face, p) for face, p in enumerate(distribution) if p >= MIN_PROBABILITY]
+        # Si se descartaron caras poco probables, ningún robo es exacto
+        self.draw_pruned = any(0 < p < MIN_PROBABILITY for p in distribution)
+        self._legal_cache = {}
+        self.memo = {}
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_budget
+        hand = tuple(sorted(card.face_id for card in game.player_hands[player_id]))
+        sizes = tuple(len(h) for h in game.player_hands)
+        top = game.current_card.face_id
+        direction = game.game_direction
+        best = None
+        exact = False
+        depth_done = 0
+        for depth in range(1, self.max_depth + 1):
+            self.used_horizon = False
+            self.pruned = False
+            try:
+                result = self._root(hand, top, sizes, direction, depth)
+            except _BudgetExceeded:
+                break
+            best = result
+            depth_done = depth
+            exact = not self.used_horizon and not self.pruned
+            if not self.used_horizon:
+                break  # Árbol completo: más profundidad no cambia el valor
+        self.last_stats = {'nodes': self.nodes, 'depth': depth_done, 'memo': len(self.memo),
+                           'exact': exact}
+        if best is None:
+            return None
+        face, value = best
+        for index, card in valid_cards:
+            if card.face_id == face:
+                return index, card, value, exact
+        return None
+
+    # ------------------------------------------------------------------
+    def _legal(self, top):
+        """(fracción válida f, [(cara, q)] normalizado) de la distribución de robo"""
+        cached = self._legal_cache.get(top)
+        if cached is None:
+            legal_row = FACE_LEGAL[top]
+            legal = [(face, p) for face, p in self.draw_dist if legal_row[face]]
+            mass = sum(p for _, p in legal)
+            cached = (mass, [(face, p / mass) for face, p in legal] if mass else [])
+            self._legal_cache[top] = cached
+        return cached
+
+    def _next(self, seat, direction):
+        return (seat + direction) % self.num_players
+
+    def _horizon(self, hand_size, sizes):
+        """Estimación en la hoja: rapidez relativa para vaciar la mano"""
+        self.used_horizon = True
+        mine = 1.0 / max(hand_size, 1)
+        others = sum(1.0 / max(sizes[seat], 1) for seat in range(len(sizes)) if seat != self.me)
+        return mine / (mine + others)
+
+    def _effects(self, seat, face, top, sizes, direction):
+        """Aplica una jugada de seat: (carta en juego, tamaños, dirección, turno, robos pendientes)"""
+        new_top = top if FACE_IS_WILD[face] else face
+        value = FACE_VALUES[face]
+        pending = 0
+        if value == 'rev':
+            direction = -direction
+            turn = self._next(seat, direction)
+        elif value == 's':
+            turn = self._next(self._next(seat, direction), direction)
+        elif value in DRAW_EFFECTS:
+            victim = self._next(seat, direction)
+            if victim == self.me:
+                turn, pending = victim, DRAW_EFFECTS[value]
+            else:
+                sizes = sizes[:victim] + (sizes[victim] + DRAW_EFFECTS[value],) + sizes[victim + 1:]
+                turn = self._next(victim, direction)
+        else:
+            turn = self._next(seat, direction)
+        return new_top, sizes, direction, turn, pending
+
+    def _root(self, hand, top, sizes, direction, depth):
+        best = None
+        alpha = 0.0
+        for face in sorted(set(hand)):
+            if not FACE_LEGAL[top][face]:
+                continue
+            value = self._after_my_play(hand, face, top, sizes, direction, depth, alpha, 1.0)
+            if best is None or value > best[1]:
+                best = (face, value)
+                alpha = max(alpha, value)
+        return best
+
+    def _after_my_play(self, hand, face, top, sizes, direction, depth, alpha, beta):
+        index = hand.index(face)
+        new_hand = hand[:index] + hand[index + 1:]
+        if not new_hand:
+            return 1.0
+        top, sizes, direction, turn, pending = self._effects(self.me, face, top, sizes, direction)
+        return self._value(new_hand, top, sizes, direction, turn, pending, depth - 1, alpha, beta)
+
+    def _chance(self, outcomes, alpha, beta):
+        """Nodo de azar con poda Star1; outcomes es [(prob, función hija(alpha, beta))]"""
+        total = sum(p for p, _ in outcomes)
+        if total <= 0:
+            return 0.0
+        acc = 0.0
+        remaining = 1.0
+        for p, child in outcomes:
+            if p <= 0:
+                continue
+            p /= total
+            child_alpha = (alpha - acc - (remaining - p)) / p
+            child_beta = (beta - acc) / p
+            value = child(max(0.0, child_alpha), min(1.0, child_beta))
+            acc += p * value
+            remaining -= p
+            if acc + remaining <= alpha:
+                return acc + remaining
+            if acc >= beta:
+                return acc
+        return acc
+
+    def _value(self, hand, top, sizes, direction, turn, pending, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes > self.max_nodes or (self.nodes & 255 == 0 and time.perf_counter() > self.deadline):
+            raise _BudgetExceeded()
+        if depth <= 0:
+            return self._horizon(len(hand), sizes)
+        opp_sizes = sizes[:self.me] + sizes[self.me + 1:]
+        key = (hand, top, opp_sizes, direction, turn, pending, depth)
+        entry = self.memo.get(key)
+        if entry is not None:
+            value, flag, horizon, pruned = entry
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                # El valor guardado pudo salir de hojas estimadas o de ramas descartadas
+                self.used_horizon |= horizon
+                self.pruned |= pruned
+                return value
+        alpha_orig = alpha
+        # Marcas propias de este subárbol, para guardarlas con su valor
+        outer_horizon, outer_pruned = self.used_horizon, self.pruned
+        self.used_horizon = self.pruned = False
+        if turn == self.me:
+            value = self._my_turn(hand, top, sizes, direction, pending, depth, alpha, beta)
+        else:
+            value = self._opponent_turn(hand, top, sizes, direction, turn, depth, alpha, beta)
+        horizon, pruned = self.used_horizon, self.pruned
+        self.used_horizon = outer_horizon or horizon
+        self.pruned = outer_pruned or pruned
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.memo[key] = (value, flag, horizon, pruned)
+        return value
+
+    def _my_turn(self, hand, top, sizes, direction, pending, depth, alpha, beta):
+        me = self.me
+        if pending:
+            self.pruned |= self.draw_pruned
+            # Robo obligado por +2/+4: una carta por nodo de azar, luego pierde el turno
+            def draw(face):
+                new_hand = tuple(sorted(hand + (face,)))
+                if pending > 1:
+                    return lambda a, b: self._value(new_hand, top, sizes, direction, me,
+                                                    pending - 1, depth, a, b)
+                return lambda a, b: self._value(new_hand, top, sizes, direction,
+                                                self._next(me, direction), 0, depth - 1, a, b)
+            return self._chance([(p, draw(face)) for face, p in self.draw_dist], alpha, beta)
+        legal = [face for face in sorted(set(hand)) if FACE_LEGAL[top][face]]
+        if not legal:
+            self.pruned |= self.draw_pruned
+            # Roba una carta y la juega si es válida
+            def draw(face):
+                if FACE_LEGAL[top][face]:
+                    return lambda a, b: self._after_my_play(hand + (face,), face, top, sizes,
+                                                            direction, depth, a, b)
+                new_hand = tuple(sorted(hand + (face,)))
+                return lambda a, b: self._value(new_hand, top, sizes, direction,
+                                                self._next(me, direction), 0, depth - 1, a, b)
+            return self._chance([(p, draw(face)) for face, p in self.draw_dist], alpha, beta)
+        best = 0.0
+        for face in legal:
+            value = self._after_my_play(hand, face, top, sizes, direction, depth, alpha, beta)
+            if value > best:
+                best = value
+                if best > alpha:
+                    alpha = best
+                if best >= beta:
+                    break
+        return best
+
+    def _opponent_turn(self, hand, top, sizes, direction, seat, depth, alpha, beta):
+        size = sizes[seat]
+        mass, legal = self._legal(top)
+        p_play = 1.0 - (1.0 - mass) ** size
+        self.pruned |= self.draw_pruned
+
+        def play(face, new_size):
+            def child(a, b):
+                if new_size == 0:
+                    return 0.0
+                new_sizes = sizes[:seat] + (new_size,) + sizes[seat + 1:]
+                new_top, new_sizes, new_direction, turn, pending = self._effects(
+                    seat, face, top, new_sizes, direction)
+                return self._value(hand, new_top, new_sizes, new_direction, turn, pending,
+                                   depth - 1, a, b)
+            return child
+
+        def pass_turn(a, b):
+            new_sizes = sizes[:seat] + (size + 1,) + sizes[seat + 1:]
+            return self._value(hand, top, new_sizes, direction, self._next(seat, direction), 0,
+                               depth - 1, a, b)
+
+        outcomes = []
+        for face, q in legal:
+            # Juega de su mano
+            if p_play * q >= MIN_PROBABILITY:
+                outcomes.append((p_play * q, play(face, size - 1)))
+            elif p_play * q > 0:
+                self.pruned = True
+            # Roba y juega la carta robada
+            if (1.0 - p_play) * mass * q >= MIN_PROBABILITY:
+                outcomes.append(((1.0 - p_play) * mass * q, play(face, size)))
+            elif (1.0 - p_play) * mass * q > 0:
+                self.pruned = True
+        outcomes.append(((1.0 - p_play) * (1.0 - mass), pass_turn))
+        # Explorar primero las ramas más probables mejora la poda
+        outcomes.sort(key=lambda item: item[0], reverse=True)
+        return self._chance(outcomes, alpha, beta)
+
+
+class EndgamePolicy:
+    """Usa el solucionador en finales y la política de respaldo en el resto"""
+
+    def __init__(self, solver=None, fallback=None):
+        self.solver = solver or EndgameSolver()
+        self.fallback = fallback
+
+    def __call__(self, game, player_id, valid_cards):
+        if self.solver.applies(game, player_id):
+            result = self.solver.solve(game, player_id, valid_cards)
+            if result is not None:
+                index, card, value, exact = result
+                stats = self.solver.last_stats
+                reasoning = "🧠 FINAL (expectimax):\n"
+                reasoning += f"Nodos: {stats['nodes']} | Profundidad: {stats['depth']}\n"
+                reasoning += f"Prob. de ganar: {value:.1%}{' (exacta)' if exact else ''}\n"
+                reasoning += f"\n✅ Mejor jugada: {card.to_display_string()}"
+                return index, card, reasoning
+        if self.fallback is not None:
+            return self.fallback(game, player_id, valid_cards)
+        return game.machine_select_card(valid_cards, player_id)
@@ -0,0 +1,1186 @@
+import random
+from collections.abc import Mapping
+
+from UNOEvents import CardDrawn, CardPlayed, DirectionReversed, EventBus, GameOver, TurnSkipped
+
+TOTAL_CARDS = 108  # Total de cartas en un mazo de UNO
+MAX_TURNS = 2000  # Límite de turnos para partidas sin interfaz
+MIN_PLAYERS, MAX_PLAYERS = 2, 10
+MACHINE_SEAT = 1  # Asiento de la máquina; los demás son jugadores "humanos"
+# Observadores que se conectan por defecto: probabilidades y registro de jugadas
+DEFAULT_OBSERVERS = ('beliefs', 'stats')
+
+COLORS = ['a', 'v', 'r', 'am']
+SPECIAL_CARDS = ['r2', 'rev', 's']
+WILDCARDS = ['c', 'r4']
+
+# Caras distintas de carta (54): 4 colores x (10 números + 3 especiales) + 2 comodines
+CARD_FACES = ([(color, num) for color in COLORS for num in range(10)] +
+              [(color, special) for color in COLORS for special in SPECIAL_CARDS] +
+              [(None, wildcard) for wildcard in WILDCARDS])
+CARD_FACE_INDEX = {face: i for i, face in enumerate(CARD_FACES)}
+NUM_FACES = len(CARD_FACES)
+
+# Entradas del modelo de probabilidades de un jugador (mismo orden que probability_vector)
+BELIEF_KEYS = ([('colors', color) for color in COLORS] +
+               [('numbers', num) for num in range(10)] +
+               [('specials', special) for special in SPECIAL_CARDS] +
+               [('wildcards', wildcard) for wildcard in WILDCARDS])
+BELIEF_INDEX = {key: i for i, key in enumerate(BELIEF_KEYS)}
+BELIEF_CATEGORIES = {category: [key for cat, key in BELIEF_KEYS if cat == category]
+                     for category in ('colors', 'numbers', 'specials', 'wildcards')}
+# Entradas de card_counters: (categoría,) o (categoría, clave)
+COUNTER_KEYS = ([('colors', color) for color in COLORS] + [('number_0',)] +
+                [('numbers', num) for num in range(1, 10)] +
+                [('specials', special) for special in SPECIAL_CARDS] +
+                [('wildcards', wildcard) for wildcard in WILDCARDS])
+# Entradas que promedia get_probability_opponent_has_card para cada cara
+FACE_BELIEFS = [((BELIEF_INDEX['wildcards', value],) if color is None else
+                 (BELIEF_INDEX['colors', color],
+                  BELIEF_INDEX['numbers' if isinstance(value, int) else 'specials', value]))
+                for color, value in CARD_FACES]
+
+
+class UNOCard:
+    def __init__(self, color, value, card_type):
+        self.color = color
+        self.value = value
+        self.card_type = card_type
+        self.face_id = CARD_FACE_INDEX.get((color, value))
+
+    def __repr__(self):
+        return f"{self.color}{self.value}" if self.color else str(self.value)
+
+    def to_display_string(self):
+        """Convierte carta a string legible"""
+        color_names = {'a': 'Azul', 'v': 'Verde', 'r': 'Rojo', 'am': 'Amarillo'}
+        special_names = {'r2': 'Roba 2', 'rev': 'Reversa', 's': 'Salta', 'c': 'Comodín', 'r4': 'Roba 4'}
+        if self.color:
+            if isinstance(self.value, int):
+                return f"{color_names[self.color]} {self.value}"
+            else:
+                return f"{color_names[self.color]} {special_names.get(self.value, self.value)}"
+        else:
+            return special_names.get(self.value, self.value)
+
+    def get_color_hex(self):
+        """Obtiene color hexadecimal para la interfaz"""
+        color_map = {
+            'a': '#0066CC',  # Azul
+            'v': '#00AA00',  # Verde
+            'r': '#CC0000',  # Rojo
+            'am': '#FFAA00'  # Amarillo
+        }
+        return color_map.get(self.color, '#333333')
+
+
+def card_from_face(face_id):
+    """Carta nueva a partir de su índice en CARD_FACES"""
+    color, value = CARD_FACES[face_id]
+    card_type = 'wildcard' if color is None else 'number' if isinstance(value, int) else 'special'
+    return UNOCard(color, value, card_type)
+
+
+def counter_value(counters, key):
+    """Valor de una entrada de COUNTER_KEYS en card_counters"""
+    value = counters[key[0]]
+    return value[key[1]] if len(key) > 1 else value
+
+
+def set_counter_value(counters, key, value):
+    if len(key) > 1:
+        counters[key[0]][key[1]] = value
+    else:
+        counters[key[0]] = value
+
+
+def face_is_legal(face_id, top_face_id):
+    """True si la cara se puede jugar sobre la carta en juego"""
+    color, value = CARD_FACES[face_id]
+    top_color, top_value = CARD_FACES[top_face_id]
+    return color is None or color == top_color or value == top_value
+
+
+class UNODeck:
+    def __init__(self, rng=None, num_decks=1):
+        # rng puede ser un random.Random con semilla; por defecto el módulo random
+        self.rng = rng if rng is not None else random
+        self.cards = []
+        self.discarded = []
+        self.journal = None  # Historial de jugadas (UNOHistory) que registra los rebarajados
+        self.reshuffles = 0
+        for _ in range(num_decks):
+            self.create_deck()
+        self.shuffle()
+
+    def create_deck(self):
+        """Crea el mazo completo según especificaciones del PDF"""
+        colors = ['a', 'v', 'r', 'am']
+        # Cartas numéricas (76 total)
+        for color in colors:
+            # Un 0 por color
+            self.cards.append(UNOCard(color, 0, 'number'))
+            # Dos de cada número 1-9 por color
+            for num in range(1, 10):
+                self.cards.append(UNOCard(color, num, 'number'))
+                self.cards.append(UNOCard(color, num, 'number'))
+        # Cartas especiales (24 total)
+        specials = ['r2', 'rev', 's']
+        for color in colors:
+            for special in specials:
+                self.cards.append(UNOCard(color, special, 'special'))
+                self.cards.append(UNOCard(color, special, 'special'))
+        # Cartas comodín (8 total)
+        wildcards = ['c', 'r4']
+        for wildcard in wildcards:
+            for _ in range(4):
+                self.cards.append(UNOCard(None, wildcard, 'wildcard'))
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+
+    def deal_card(self):
+        if not self.cards:
+            self.reshuffle_from_discard()
+        return self.cards.pop() if self.cards else None
+
+    def deal_cards(self, count, player_id=None):
+        """Reparte hasta count cartas en bloques (mismo orden que count llamadas a deal_card)"""
+        dealt = []
+        while len(dealt) < count:
+            if not self.cards:
+                self.reshuffle_from_discard()
+                if not self.cards:
+                    break
+            take = min(count - len(dealt), len(self.cards))
+            chunk = self.cards[-take:]
+            del self.cards[-take:]
+            chunk.reverse()
+            if self.journal is not None:
+                # Antes del siguiente rebarajado, para deshacerlos en el orden correcto
+                for card in chunk:
+                    self.journal.record(('deal', player_id, card))
+            dealt.extend(chunk)
+        return dealt
+
+    def reshuffle_from_discard(self):
+        if len(self.discarded) > 1:
+            previous = self.discarded[:] if self.journal is not None else None
+            # Mantener la carta superior, barajar el resto
+            top_card = self.discarded.pop()
+            self.cards = self.discarded[:]
+            self.discarded = [top_card]
+            self.shuffle()
+            self.reshuffles += 1
+            if self.journal is not None:
+                self.journal.record(('reshuffle', previous, self.cards[:]))
+
+
+# Parámetros de la cascada de reglas de machine_select_card
+DEFAULT_HEURISTIC_PARAMS = {
+    'defensive_threshold': 3,  # Cartas del siguiente jugador para jugar a la defensiva
+    'defensive_cards': ('r2', 'r4', 's', 'rev'),
+    'strategy_order': ('color', 'number', 'wildcard'),
+    'tie_break': 'random',  # 'random' o 'probability'
+}
+
+
+# Reglas de la casa; todas apagadas son las reglas oficiales (ver compile_card_effects)
+DEFAULT_RULES = {
+    'stacking': False,  # +2 sobre +2 y +4 sobre +4: el castigo se acumula hasta quien no responda
+    'jump_in': False,  # Quien tenga una carta idéntica a la de la mesa la juega fuera de turno
+    'seven_zero': False,  # 7: cambia la mano con el rival con menos cartas; 0: las manos rotan
+    'draw_until_playable': False,  # Sin jugada válida se roba hasta poder jugar
+}
+DRAW_PENALTIES = {'r2': 2, 'r4': 4}
+# Métodos que compile_rules reemplaza en la instancia según las reglas
+RULE_METHODS = ('is_valid_play', 'play_turn', 'draw_for_turn')
+
+
+def _effect_reverse(game, card, player_id):
+    game.game_direction *= -1
+    if DirectionReversed in game.events:
+        game.events.emit(DirectionReversed(game.game_direction))
+
+
+def _effect_skip(game, card, player_id):
+    game.current_player = (game.current_player + game.game_direction) % game.num_players
+    if TurnSkipped in game.events:
+        game.events.emit(TurnSkipped(game.current_player, 's'))
+
+
+def _draw_effect(count):
+    """Roba 2 / Roba 4: el siguiente roba count cartas de una vez y pierde el turno"""
+    def effect(game, card, player_id):
+        next_player = (game.current_player + game.game_direction) % game.num_players
+        game.draw_cards(next_player, count, card.value)
+        game.current_player = next_player
+        if TurnSkipped in game.events:
+            game.events.emit(TurnSkipped(next_player, card.value))
+    return effect
+
+
+def _stack_effect(count):
+    """Con acumulación: el castigo queda pendiente hasta que alguien no pueda responder"""
+    def effect(game, card, player_id):
+        game.pending_draw += count
+        game.pending_value = card.value
+    return effect
+
+
+def _effect_swap_seven(game, card, player_id):
+    hands = game.player_hands
+    target = min((seat for seat in range(game.num_players) if seat != player_id),
+                 key=lambda seat: len(hands[seat]))
+    swap_hands(game, player_id, target)
+    if game.history is not None:
+        game.history.record(('swap', player_id, target))
+    game.add_to_log(f"🔀 {game.player_names[player_id]} cambia su mano con {game.player_names[target]}")
+
+
+def _effect_rotate_zero(game, card, player_id):
+    rotate_hands(game, game.game_direction)
+    if game.history is not None:
+        game.history.record(('rotate', game.game_direction))
+    game.add_to_log("🔄 Las manos pasan al siguiente jugador")
+
+
+def swap_hands(game, first, second):
+    hands = game.player_hands
+    hands[first], hands[second] = hands[second], hands[first]
+
+
+def rotate_hands(game, direction):
+    """Cada jugador pasa su mano al siguiente en el sentido direction"""
+    hands = game.player_hands
+    hands[:] = [hands[(seat - direction) % len(hands)] for seat in range(len(hands))]
+
+
+_effect_tables = {}
+
+
+def compile_card_effects(rules):
+    """Efecto de cada cara (índice de CARD_FACES) con estas reglas; None = sin efecto"""
+    key = tuple(sorted(rules.items()))
+    effects = _effect_tables.get(key)
+    if effects is not None:
+        return effects
+    effects = [None] * NUM_FACES
+    for face_id, (_, value) in enumerate(CARD_FACES):
+        if value == 'rev':
+            effects[face_id] = _effect_reverse
+        elif value == 's':
+            effects[face_id] = _effect_skip
+        elif value in DRAW_PENALTIES:
+            count = DRAW_PENALTIES[value]
+            effects[face_id] = _stack_effect(count) if rules['stacking'] else _draw_effect(count)
+        elif value == 7 and rules['seven_zero']:
+            effects[face_id] = _effect_swap_seven
+        elif value == 0 and rules['seven_zero']:
+            effects[face_id] = _effect_rotate_zero
+    _effect_tables[key] = effects
+    return effects
+
+
+class BeliefTable:
+    """Probabilidades de todos los jugadores humanos en una sola tabla.
+
+    Casi todas las actualizaciones valen para todos los jugadores a la vez;
+    en lugar de copiarlas a cada uno se escriben una vez en la parte
+    compartida, y cada jugador solo guarda lo que le es propio. Cada
+    escritura lleva una marca de orden y al leer gana la más reciente, así
+    que el costo por jugada no depende del número de jugadores.
+
+    Un jugador puede empezar con probabilidades propias (seed, p. ej. de su
+    perfil en UNOProfiles): valen hasta que una escritura las reemplaza.
+    """
+    __slots__ = ('shared', 'shared_stamp', 'own', 'own_stamp', 'clock', 'journal')
+
+    def __init__(self, players, initial):
+        self.shared = list(initial)
+        self.shared_stamp = [-1] * len(initial)
+        self.own = {player: [0.0] * len(initial) for player in players}
+        self.own_stamp = {player: [-1] * len(initial) for player in players}
+        self.clock = 0
+        self.journal = None  # Historial de jugadas (UNOHistory) que registra cada escritura
+
+    def get(self, player, index):
+        if self.own_stamp[player][index] > self.shared_stamp[index]:
+            return self.own[player][index]
+        return self.shared[index]
+
+    def seed(self, player, values):
+        """Probabilidades iniciales propias de player (antes de cualquier escritura)"""
+        self.own[player] = list(values)
+        self.own_stamp[player] = [0] * len(values)
+
+    def set_all(self, index, value):
+        """Escribe el valor para todos los jugadores"""
+        self.clock += 1
+        if self.journal is not None:
+            self.journal.record(('shared', index, self.shared[index], self.shared_stamp[index],
+                                 value, self.clock))
+        self.shared[index] = value
+        self.shared_stamp[index] = self.clock
+
+    def set(self, player, index, value):
+        """Escribe el valor solo para player"""
+        self.clock += 1
+        if self.journal is not None:
+            self.journal.record(('own', player, index, self.own[player][index], self.own_stamp[player][index],
+                                 value, self.clock))
+        self.own[player][index] = value
+        self.own_stamp[player][index] = self.clock
+
+    def vector(self, player):
+        return [self.get(player, index) for index in range(len(self.shared))]
+
+
+class BeliefCategory(Mapping):
+    """Vista tipo diccionario de una categoría ('colors', ...) de un jugador.
+
+    Mantiene la forma game.probabilities[jugador][categoría][clave]; las
+    claves fuera del modelo (p. ej. numbers['r2']) se ignoran al escribir.
+    """
+
+    def __init__(self, table, player, category):
+        self.table = table
+        self.player = player
+        self.category = category
+
+    def __getitem__(self, key):
+        return self.table.get(self.player, BELIEF_INDEX[self.category, key])
+
+    def __setitem__(self, key, value):
+        index = BELIEF_INDEX.get((self.category, key))
+        if index is not None:
+            self.table.set(self.player, index, value)
+
+    def __iter__(self):
+        return iter(BELIEF_CATEGORIES[self.category])
+
+    def __len__(self):
+        return len(BELIEF_CATEGORIES[self.category])
+
+
+def heuristic_policy(game, player_id, valid_cards):
+    """Política por defecto: la cascada de reglas de machine_select_card"""
+    return game.machine_select_card(valid_cards, player_id)
+
+
+def make_heuristic_policy(params):
+    """Cascada de reglas con un conjunto de parámetros propio"""
+    params = dict(DEFAULT_HEURISTIC_PARAMS, **params)
+
+    def policy(game, player_id, valid_cards):
+        return game.machine_select_card(valid_cards, player_id, params)
+    return policy
+
+
+def random_policy(game, player_id, valid_cards):
+    """Política base: cualquier carta válida al azar"""
+    selected = game.rng.choice(valid_cards)
+    return selected[0], selected[1], f"✅ Carta aleatoria: {selected[1].to_display_string()}"
+
+
+class UNOGameEngine:
+    """Reglas, agente y sistema de probabilidades sin interfaz gráfica.
+
+    La interfaz (UNOIntelligentGUI) hereda de esta clase y sobrescribe los
+    métodos de presentación (add_to_log, update_all_displays, ...), que aquí
+    no hacen nada para que las simulaciones no paguen su costo.
+
+    Las transiciones del juego se publican como eventos en self.events; el
+    seguimiento de probabilidades ('beliefs'), el registro de jugadas
+    ('stats') y las instantáneas de entrenamiento ('snapshots') son
+    suscriptores que se conectan con `observers`.
+    """
+
+    def __init__(self, seed=None, policies=None, machine_policy=None, observers=DEFAULT_OBSERVERS,
+                 num_players=3, num_decks=1, rules=None, profiles=None):
+        if not MIN_PLAYERS <= num_players <= MAX_PLAYERS:
+            raise ValueError(f"El número de jugadores debe estar entre {MIN_PLAYERS} y {MAX_PLAYERS}")
+        if num_decks < 1:
+            raise ValueError("Se necesita al menos un mazo")
+        unknown = set(rules or ()) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"Reglas desconocidas: {', '.join(sorted(unknown))}")
+        # Reglas de la casa; se compilan al iniciar cada partida (compile_rules)
+        self.rules = dict(DEFAULT_RULES, **(rules or {}))
+        self.rng = random.Random(seed) if seed is not None else random
+        self.num_players = num_players
+        self.num_decks = num_decks
+        self.total_cards = TOTAL_CARDS * num_decks
+        # Asientos con modelo de probabilidades (todos menos la máquina)
+        self.human_seats = tuple(p for p in range(num_players) if p != MACHINE_SEAT)
+        # Políticas para los asientos humanos en partidas sin interfaz
+        self.policies = dict(policies) if policies else {}
+        # Política opcional de la máquina (None = cascada de machine_select_card)
+        self.machine_policy = machine_policy
+        self.heuristic_params = dict(DEFAULT_HEURISTIC_PARAMS)
+        # Rama de machine_select_card que tomó la última decisión (para UNOMetrics)
+        self.last_branch = None
+        # Variables del juego
+        self.deck = UNODeck(self.rng, num_decks)
+        self.current_card = None
+        self.current_player = 0  # 0=Jugador1, 1=Máquina, 2=Jugador2, 3=Jugador3...
+        self.game_direction = 1
+        self.game_started = False
+        self.winner = None
+        self.turn_count = 0
+        # Castigo acumulado con la regla de acumulación (+2 / +4)
+        self.pending_draw = 0
+        self.pending_value = None
+        # Manos de jugadores
+        self.player_hands = [[] for _ in range(num_players)]  # [Jugador1, Máquina, Jugador2, ...]
+        self.player_names = ['Máquina' if p == MACHINE_SEAT else f'Jugador {max(p, 1)}'
+                             for p in range(num_players)]
+        self.jugada_stats = []  # Lista para registrar jugadas
+        self.uno_declarado = {p: False for p in range(num_players)}  # Estado de UNO por jugador
+        # Instantáneas completas de cada decisión (para generar datos de entrenamiento)
+        self.decision_snapshots = []
+        # Historial de jugadas para deshacer/rehacer (None = desactivado, sin costo)
+        self.history = None
+        # Perfiles por jugador (UNOProfiles.ProfileStore) que siembran las probabilidades iniciales
+        self.profiles = profiles
+        self.compile_rules()
+        # Sistema de probabilidades
+        self.init_probability_system()
+        # Eventos del motor
+        self.events = EventBus()
+        for observer in observers:
+            self.attach_observer(observer)
+
+    def attach_observer(self, name):
+        """Conecta un observador del motor: 'beliefs', 'stats' o 'snapshots'"""
+        if name == 'beliefs':
+            # Al final: las estadísticas y las instantáneas guardan las probabilidades previas a la jugada
+            self.events.subscribe(CardPlayed, self.track_beliefs_after_play, last=True)
+            self.events.subscribe(CardDrawn, self.track_beliefs_after_draw, last=True)
+        elif name == 'stats':
+            self.events.subscribe(CardPlayed, self.record_play_stats)
+        elif name == 'snapshots':
+            self.events.subscribe(CardPlayed, self.record_decision_snapshot)
+        else:
+            raise ValueError(f"Observador desconocido: {name}")
+
+    def init_probability_system(self):
+        self.colors = ['a', 'v', 'r', 'am']
+        self.numbers = list(range(10))
+        self.special_cards = ['r2', 'rev', 's']
+        self.wildcards = ['c', 'r4']
+
+        # Contadores de cartas restantes (inicializados con valores iniciales, por mazo)
+        decks = self.num_decks
+        self.card_counters = {
+            'colors': {'a': 25 * decks, 'v': 25 * decks, 'r': 25 * decks, 'am': 25 * decks},  # Cartas por color
+            'numbers': {i: 8 * decks for i in range(1, 10)},  # Números 1-9
+            'number_0': 4 * decks,  # Número 0
+            'specials': {'r2': 8 * decks, 'rev': 8 * decks, 's': 8 * decks},  # Especiales
+            'wildcards': {'c': 4 * decks, 'r4': 4 * decks}  # Comodines
+        }
+
+        # Probabilidades iniciales para jugadores humanos
+        total = self.total_cards
+        initial = ([25 * decks / total for _ in self.colors] +
+                   [(8 if num != 0 else 4) * decks / total for num in self.numbers] +
+                   [8 * decks / total for _ in self.special_cards] +
+                   [4 * decks / total for _ in self.wildcards])
+        self.beliefs = BeliefTable(self.human_seats, initial)
+        if self.profiles is not None:
+            # Lo aprendido de partidas anteriores de cada jugador, por nombre
+            for player in self.human_seats:
+                prior = self.profiles.prior(self.player_names[player], initial)
+                if prior is not None:
+                    self.beliefs.seed(player, prior)
+        self.probabilities = {
+            player: {category: BeliefCategory(self.beliefs, player, category)
+                     for category in BELIEF_CATEGORIES}
+            for player in self.human_seats
+        }
+        self.beliefs.journal = self.history
+
+    # ------------------------------------------------------------------
+    # Ganchos de presentación (la interfaz gráfica los sobrescribe)
+    # ------------------------------------------------------------------
+    def add_to_log(self, message):
+        """Añade mensaje al log del juego"""
+
+    def update_all_displays(self):
+        """Actualiza todas las pantallas"""
+
+    def update_statistics(self):
+        """Actualiza las estadísticas en tiempo real"""
+
+    def show_ai_decision(self, reasoning):
+        """Muestra el razonamiento de la IA"""
+
+    def notify_drawn_card(self, card):
+        """Avisa que la carta robada se jugará automáticamente"""
+
+    def schedule_next_turn(self):
+        """Programa el turno siguiente si lo juega la IA (sin interfaz lo hace play_turn)"""
+
+    # ------------------------------------------------------------------
+    # Historial de jugadas
+    # ------------------------------------------------------------------
+    def enable_history(self):
+        """Registra cada jugada como deltas reversibles (ver UNOHistory)"""
+        from UNOHistory import GameHistory
+        self.history = GameHistory(self)
+        self.deck.journal = self.history
+        self.beliefs.journal = self.history
+        return self.history
+
+    def end_turn(self):
+        """Cierra la jugada en el historial y programa el turno siguiente"""
+        if self.history is not None:
+            self.history.checkpoint()
+        self.schedule_next_turn()
+
+    # ------------------------------------------------------------------
+    # Flujo del juego
+    # ------------------------------------------------------------------
+    def start_new_game(self):
+        """Inicia un nuevo juego"""
+        # Reiniciar variables
+        self.deck = UNODeck(self.rng, self.num_decks)
+        self.current_player = 0
+        self.game_direction = 1
+        self.selected_card_index = None
+        self.game_started = True
+        self.winner = None
+        self.turn_count = 0
+        self.pending_draw = 0
+        self.pending_value = None
+        self.compile_rules()
+        # Los registros son de la partida actual (se exportan al terminar)
+        self.jugada_stats = []
+        self.decision_snapshots = []
+        # Reiniciar probabilidades
+        self.init_probability_system()
+        # Repartir cartas
+        self.deal_initial_cards()
+        # Establecer carta inicial
+        self.set_initial_card()
+        # El historial empieza con la partida ya repartida
+        if self.history is not None:
+            self.deck.journal = self.history
+            self.history.reset()
+        # Actualizar interfaz
+        self.update_all_displays()
+        self.add_to_log("🎮 NUEVO JUEGO INICIADO")
+        self.add_to_log(f"Carta inicial: {self.current_card.to_display_string()}")
+        self.add_to_log("Orden: " + " → ".join(self.player_names))
+        self.update_statistics()
+
+    def deal_initial_cards(self):
+        """Reparta las cartas iniciales"""
+        # Limpiar manos
+        self.player_hands = [[] for _ in range(self.num_players)]
+        # Repartir 7 cartas a cada jugador
+        for _ in range(7):
+            for player in range(self.num_players):
+                card = self.deck.deal_card()
+                if card:
+                    self.player_hands[player].append(card)
+                    # Actualizar contadores globales para todos los jugadores
+                    self.update_card_counters_remove(card)
+
+    def set_initial_card(self):
+        """Establece la carta inicial del juego"""
+        while True:
+            card = self.deck.deal_card()
+            if card and card.card_type != 'wildcard':  # No empezar con comodín
+                self.current_card = card
+                self.deck.discarded.append(card)
+                break
+            if card:
+                self.deck.cards.insert(0, card)  # El comodín vuelve al fondo del mazo
+
+    def update_card_counters_remove(self, card):
+        """Actualiza los contadores globales al remover una carta"""
+        if card.card_type == 'number':
+            if card.value == 0:
+                self.card_counters['number_0'] = max(0, self.card_counters['number_0'] - 1)
+            else:
+                self.card_counters['numbers'][card.value] = max(0, self.card_counters['numbers'].get(card.value, 0) - 1)
+            if card.color:
+                self.card_counters['colors'][card.color] = max(0, self.card_counters['colors'].get(card.color, 0) - 1)
+        elif card.card_type == 'special':
+            self.card_counters['specials'][card.value] = max(0, self.card_counters['specials'].get(card.value, 0) - 1)
+            if card.color:
+                self.card_counters['colors'][card.color] = max(0, self.card_counters['colors'].get(card.color, 0) - 1)
+        elif card.card_type == 'wildcard':
+            self.card_counters['wildcards'][card.value] = max(0, self.card_counters['wildcards'].get(card.value, 0) - 1)
+
+    def get_total_remaining_cards(self):
+        """Calcula cuántas cartas quedan en juego (mazo + manos)"""
+        return (
+            sum(self.card_counters['colors'].values()) +
+            self.card_counters['number_0'] +
+            sum(self.card_counters['numbers'].values()) +
+            sum(self.card_counters['specials'].values()) +
+            sum(self.card_counters['wildcards'].values())
+        )
+
+    def compile_rules(self):
+        """Tabla de efectos por cara y variantes de los métodos según self.rules.
+
+        Con las reglas oficiales no queda nada en la instancia: cada jugada
+        cuesta lo mismo que sin reglas de la casa.
+        """
+        self.card_effects = compile_card_effects(self.rules)
+        for name in RULE_METHODS:
+            self.__dict__.pop(name, None)
+        if self.rules['stacking']:
+            self.is_valid_play = self.is_valid_play_stacking
+        if self.rules['jump_in']:
+            self.play_turn = self.play_turn_jump_in
+        if self.rules['draw_until_playable']:
+            self.draw_for_turn = self.draw_until_playable
+
+    def is_valid_play_stacking(self, card):
+        """Con castigo pendiente solo se responde con la misma carta de robo"""
+        if self.pending_draw:
+            return card.value == self.pending_value
+        return type(self).is_valid_play(self, card)
+
+    def is_valid_play(self, card):
+        """Verifica si una carta es válida para jugar"""
+        if card.card_type == 'wildcard':
+            return True
+        if card.color == self.current_card.color:
+            return True
+        if (isinstance(card.value, int) and isinstance(self.current_card.value, int) and
+            card.value == self.current_card.value):
+            return True
+        if card.value == self.current_card.value:
+            return True
+        return False
+
+    def play_card(self, player_id, card, from_draw=False):
+        """Ejecuta la jugada de una carta"""
+        # Publicar la jugada antes de actualizar la carta actual
+        if CardPlayed in self.events:
+            self.events.emit(CardPlayed(player_id, card, self.current_card, from_draw))
+        # Guarda la carta actual antes de actualizarla
+        if card.card_type != 'wildcard':
+            self.current_card = card
+        # Agregar al descarte
+        self.deck.discarded.append(card)
+        if self.history is not None:
+            self.history.record(('discard', card))
+        # Verificar victoria
+        if len(self.player_hands[player_id]) == 0:
+            # Penalización si no declaró UNO
+            if not self.uno_declarado.get(player_id, False):
+                self.draw_cards(player_id, 2, 'castigo')
+                self.update_all_displays()
+                self.uno_declarado[player_id] = False
+                self.end_turn()
+                return  # No termina el juego, sigue jugando
+            else:
+                self.uno_declarado[player_id] = False  # Reset
+                self.game_over(player_id)
+                return
+        # Verificar UNO
+        if len(self.player_hands[player_id]) == 1:
+            self.add_to_log(f"¡{self.player_names[player_id]} tiene UNO!")
+            if player_id == 1:
+                self.declare_uno()  # La máquina declara UNO automáticamente
+        # Efectos de cartas especiales
+        self.apply_card_effects(card, player_id)
+        # Avanzar turno
+        self.advance_turn()
+        # Actualizar interfaz
+        self.update_all_displays()
+        # Si el siguiente turno lo juega la IA, programar su jugada
+        self.end_turn()
+
+    def draw_cards(self, player_id, count, reason):
+        """Reparte count cartas a player_id y publica CardDrawn; devuelve las cartas"""
+        cards = self.deck.deal_cards(count, player_id)
+        self.player_hands[player_id].extend(cards)
+        if cards and CardDrawn in self.events:
+            self.events.emit(CardDrawn(player_id, cards, reason))
+        return cards
+
+    def draw_for_turn(self, player_id):
+        """Robo de quien no tiene jugada válida: una carta; la última devuelta se puede intentar jugar"""
+        return self.draw_cards(player_id, 1, 'robo')
+
+    def draw_until_playable(self, player_id):
+        """draw_for_turn con la regla de robar hasta poder jugar (un solo CardDrawn)"""
+        deck = self.deck
+        cards = []
+        while not cards or not self.is_valid_play(cards[-1]):
+            if not deck.cards:
+                deck.reshuffle_from_discard()
+                if not deck.cards:
+                    break
+            # Hasta la primera carta jugable desde arriba del mazo, o todo el mazo
+            pile = deck.cards
+            depth = len(pile)
+            for position in range(1, len(pile) + 1):
+                if self.is_valid_play(pile[-position]):
+                    depth = position
+                    break
+            cards.extend(deck.deal_cards(depth, player_id))
+        self.player_hands[player_id].extend(cards)
+        if cards and CardDrawn in self.events:
+            self.events.emit(CardDrawn(player_id, cards, 'robo'))
+        return cards
+
+    def take_pending_draw(self, player_id):
+        """Acumulación: quien no puede responder roba todo el castigo y pierde el turno"""
+        count, value = self.pending_draw, self.pending_value
+        self.pending_draw = 0
+        self.pending_value = None
+        self.draw_cards(player_id, count, value)
+        if TurnSkipped in self.events:
+            self.events.emit(TurnSkipped(player_id, value))
+        self.advance_turn()
+        self.update_all_displays()
+        self.end_turn()
+
+    def apply_card_effects(self, card, player_id):
+        """Aplica el efecto de la carta según la tabla compilada para las reglas de la partida"""
+        effect = self.card_effects[card.face_id]
+        if effect is not None:
+            effect(self, card, player_id)
+
+    def advance_turn(self):
+        """Avanza al siguiente turno"""
+        self.current_player = (self.current_player + self.game_direction) % self.num_players
+
+    def machine_play_turn(self):
+        """Ejecuta el turno de la máquina con IA"""
+        if self.current_player != 1:
+            return
+        self.add_to_log("🤖 Turno de la máquina...")
+        # Obtener cartas válidas
+        valid_cards = self.get_machine_valid_cards()
+        if not valid_cards:
+            if self.pending_draw:
+                self.take_pending_draw(1)
+                return
+            # Debe robar
+            drawn = self.draw_for_turn(1)
+            if drawn:
+                drawn_card = drawn[-1]
+                # Verificar si puede jugar la carta robada
+                if self.is_valid_play(drawn_card):
+                    self.take_card(1, self.player_hands[1].index(drawn_card))
+                    self.play_card(1, drawn_card, from_draw=True)
+                else:
+                    self.add_to_log("🤖 Máquina no puede jugar carta robada")
+                    self.advance_turn()
+                    self.update_all_displays()
+                    self.end_turn()
+            return
+        # Seleccionar carta usando IA
+        if self.machine_policy is not None:
+            selected_card_info = self.machine_policy(self, 1, valid_cards)
+        else:
+            selected_card_info = self.machine_select_card(valid_cards)
+        if selected_card_info:
+            index, card, reasoning = selected_card_info
+            # Mostrar razonamiento de IA
+            self.show_ai_decision(reasoning)
+            # Jugar carta
+            self.take_card(1, index)
+            self.play_card(1, card)
+
+    def take_card(self, player_id, index):
+        """Saca de la mano de player_id la carta en index (para jugarla)"""
+        card = self.player_hands[player_id].pop(index)
+        if self.history is not None:
+            self.history.record(('take', player_id, index, card))
+        return card
+
+    def get_valid_cards(self, player_id):
+        """Obtiene las cartas válidas (índice, carta) de un jugador"""
+        valid_cards = []
+        for i, card in enumerate(self.player_hands[player_id]):
+            if self.is_valid_play(card):
+                valid_cards.append((i, card))
+        return valid_cards
+
+    def get_machine_valid_cards(self):
+        """Obtiene cartas válidas para la máquina"""
+        return self.get_valid_cards(1)
+
+    def machine_select_card(self, valid_cards, player_id=1, params=None):
+        """IA para seleccionar carta (basado en PDF)"""
+        if not valid_cards:
+            return None
+        params = params if params is not None else self.heuristic_params
+        reasoning = "🧠 ANÁLISIS IA:\n"
+        # Estrategia 1: Jugador siguiente con pocas cartas
+        next_player = (player_id + self.game_direction) % self.num_players
+        next_player_cards = len(self.player_hands[next_player])
+        if next_player_cards <= params['defensive_threshold']:
+            reasoning += f"⚠️ {self.player_names[next_player]} tiene {next_player_cards} cartas!\n"
+            reasoning += "Prioridad: Cartas defensivas\n"
+            defensive_cards = []
+            for i, card in valid_cards:
+                if card.value in params['defensive_cards']:
+                    defensive_cards.append((i, card))
+            if defensive_cards:
+                selected = self.break_tie(defensive_cards, next_player, params)
+                reasoning += f"✅ Seleccionada: {selected[1].to_display_string()}\n"
+                reasoning += "Razón: Carta defensiva"
+                self.last_branch = 'defensive'
+                return selected[0], selected[1], reasoning
+        # Estrategia 2: Selección por probabilidades
+        reasoning += "📊 Análisis probabilístico:\n"
+        for strategy in params['strategy_order']:
+            if strategy == 'color':
+                # a. Cartas que coinciden en color
+                color_matches = []
+                for i, card in valid_cards:
+                    if (card.color == self.current_card.color and
+                        card.value != self.current_card.value):
+                        prob = self.get_probability_opponent_has_card(next_player, card)
+                        color_matches.append((i, card, prob))
+                        reasoning += f"{card.to_display_string()}: {prob:.2f}\n"
+                if color_matches:
+                    # Ordenar por menor probabilidad
+                    color_matches.sort(key=lambda x: x[2])
+                    selected = color_matches[0]
+                    reasoning += f"\n✅ Mejor opción por color: {selected[1].to_display_string()}"
+                    self.last_branch = 'color'
+                    return selected[0], selected[1], reasoning
+            elif strategy == 'number':
+                # b. Cartas que coinciden en número
+                number_matches = []
+                for i, card in valid_cards:
+                    if (isinstance(card.value, int) and isinstance(self.current_card.value, int) and
+                        card.value == self.current_card.value and card.color != self.current_card.color):
+                        prob = self.get_probability_opponent_has_card(next_player, card)
+                        number_matches.append((i, card, prob))
+                if number_matches:
+                    number_matches.sort(key=lambda x: x[2])
+                    selected = number_matches[0]
+                    reasoning += f"\n✅ Mejor opción por número: {selected[1].to_display_string()}"
+                    self.last_branch = 'number'
+                    return selected[0], selected[1], reasoning
+            elif strategy == 'wildcard':
+                # c. Comodines (por defecto la última opción)
+                wildcard_matches = [(i, card) for i, card in valid_cards if card.card_type == 'wildcard']
+                if wildcard_matches:
+                    selected = self.break_tie(wildcard_matches, next_player, params)
+                    reasoning += f"\n✅ Usando comodín: {selected[1].to_display_string()}"
+                    self.last_branch = 'wildcard'
+                    return selected[0], selected[1], reasoning
+        # Cualquier carta válida
+        selected = self.break_tie(valid_cards, next_player, params)
+        reasoning += f"\n✅ Carta aleatoria: {selected[1].to_display_string()}"
+        self.last_branch = 'random'
+        return selected[0], selected[1], reasoning
+
+    def break_tie(self, candidates, next_player, params):
+        """Elige entre candidatas equivalentes: al azar o la menos probable en el rival"""
+        if params['tie_break'] == 'probability':
+            return min(candidates, key=lambda x: self.get_probability_opponent_has_card(next_player, x[1]))
+        return self.rng.choice(candidates)
+
+    def get_probability_opponent_has_card(self, player_id, card):
+        """Calcula probabilidad de que oponente tenga carta similar"""
+        if player_id == MACHINE_SEAT:  # Máquina
+            return 0.0
+        # Promedio de color y valor (solo el valor para comodines)
+        indices = FACE_BELIEFS[card.face_id]
+        get = self.beliefs.get
+        return sum(get(player_id, index) for index in indices) / len(indices)
+
+    def update_probabilities_after_play(self, player_id, card, prev_color, prev_value):
+        """Actualiza probabilidades después de una jugada"""
+        if player_id == MACHINE_SEAT:  # No actualizar para la máquina
+            return
+        # Actualizar contadores globales
+        self.update_card_counters_remove(card)
+        # Calcular total de cartas restantes
+        total_remaining = max(self.get_total_remaining_cards(), 1)
+        counters = self.card_counters
+        # Lo afectado por la carta jugada vale igual para todos los oponentes humanos:
+        # se escribe una sola vez en la parte compartida de la tabla
+        set_all = self.beliefs.set_all
+        if card.card_type == 'number':
+            # Actualizar color y número
+            set_all(BELIEF_INDEX['colors', card.color], counters['colors'][card.color] / total_remaining)
+            if card.value == 0:
+                set_all(BELIEF_INDEX['numbers', 0], counters['number_0'] / total_remaining)
+            else:
+                set_all(BELIEF_INDEX['numbers', card.value],
+                        counters['numbers'].get(card.value, 0) / total_remaining)
+        elif card.card_type == 'special':
+            # Actualizar color y especial
+            if card.color:
+                set_all(BELIEF_INDEX['colors', card.color], counters['colors'][card.color] / total_remaining)
+            set_all(BELIEF_INDEX['specials', card.value],
+                    counters['specials'].get(card.value, 0) / total_remaining)
+        elif card.card_type == 'wildcard':
+            # Actualizar comodín
+            set_all(BELIEF_INDEX['wildcards', card.value],
+                    counters['wildcards'].get(card.value, 0) / total_remaining)
+        # --- CASOS ESPECIALES ---
+        # Caso 1: Misma carta que el mazo (color y número): ya se actualizó globalmente
+        # Caso 2: Mismo color, diferente número: no se actualiza el número
+        # Sin color (la carta previa era un comodín) o sin número (especial): no hay entrada que tocar
+        prev_number = BELIEF_INDEX.get(('numbers', prev_value))
+        prev_color_index = BELIEF_INDEX.get(('colors', prev_color))
+        if card.card_type == 'wildcard':
+            # Caso 4: Comodín o Roba 4
+            if prev_color_index is not None:
+                set_all(prev_color_index, 0.0)
+            if prev_number is not None:
+                set_all(prev_number, 0.0)
+        elif card.card_type == 'special':
+            # Caso 5: Carta especial (+2, reversa, salta)
+            if prev_number is not None:
+                set_all(prev_number, 0.0)
+
+        # --- ACTUALIZAR PROPIA PROBABILIDAD SI JUGÓ MISMO NÚMERO, DIFERENTE COLOR ---
+        if (card.card_type == 'number' and card.value == prev_value and card.color != prev_color
+                and prev_color_index is not None):
+            self.beliefs.set(player_id, prev_color_index, 0.0)
+        if (card.card_type == 'number' and card.color == prev_color and card.value != prev_value
+                and prev_number is not None):
+            self.beliefs.set(player_id, prev_number, 0.0)
+
+    def registrar_jugada(self, player_id, card, prev_color, prev_value):
+        # Guarda la jugada y las probabilidades de ambos jugadores humanos
+        jugada = {
+            'Partida': 'Actual',
+            'Tiró': self.player_names[player_id],
+            'Carta en juego': self.current_card.to_display_string() if self.current_card else '',
+            'Carta tirada': card.to_display_string(),
+        }
+        # Probabilidades de cada jugador humano
+        for jugador in self.human_seats:
+            base = f'J{jugador+1}_'
+            probs = self.probabilities[jugador]
+            jugada[base+'ROJO'] = probs['colors']['r']*100
+            jugada[base+'VERDE'] = probs['colors']['v']*100
+            jugada[base+'AZUL'] = probs['colors']['a']*100
+            jugada[base+'AMARILLO'] = probs['colors']['am']*100
+            for n in range(10):
+                jugada[base+str(n)] = probs['numbers'][n]*100
+            jugada[base+'Comodín'] = probs['wildcards']['c']*100
+            jugada[base+'Come 2'] = probs['specials']['r2']*100
+            jugada[base+'Come 4'] = probs['wildcards']['r4']*100
+            jugada[base+'Salta'] = probs['specials']['s']*100
+            jugada[base+'Reversa'] = probs['specials']['rev']*100
+            # Mano real, para comparar las probabilidades con lo que había
+            jugada[base+'Mano'] = ' '.join(c.to_display_string() for c in self.player_hands[jugador])
+        self.jugada_stats.append(jugada)
+
+    def probability_vector(self, player_id):
+        """Aplana las probabilidades de un jugador: colores, números, especiales, comodines"""
+        return self.beliefs.vector(player_id)
+
+    def snapshot_state(self, player_id):
+        """Estado observable para que player_id decida (sin la acción)"""
+        return {
+            'player': player_id,
+            'hand': [c.face_id for c in self.player_hands[player_id]],
+            'top': self.current_card.face_id,
+            'hand_sizes': [len(hand) for hand in self.player_hands],
+            'direction': self.game_direction,
+            'beliefs': [self.probability_vector(jugador) for jugador in sorted(self.probabilities)],
+        }
+
+    def snapshot_decision(self, player_id, card):
+        """Estado observable justo antes de que player_id juegue card.
+
+        Se llama al publicarse CardPlayed, cuando la carta ya salió de la mano,
+        así que se vuelve a contar en 'hand' y en 'hand_sizes'. 'hands' guarda
+        las manos reales de todos los asientos (no observables) para medir la
+        calibración de 'beliefs'.
+        """
+        snapshot = self.snapshot_state(player_id)
+        snapshot['hand'].append(card.face_id)
+        snapshot['hand_sizes'][player_id] += 1
+        snapshot['action'] = card.face_id
+        snapshot['hands'] = [[c.face_id for c in hand] for hand in self.player_hands]
+        snapshot['hands'][player_id].append(card.face_id)
+        return snapshot
+
+    def draw_card(self):
+        """Permite al jugador current_player robar una carta"""
+        if self.current_player == 1:  # No permitir robo manual para la máquina
+            return
+        if self.pending_draw:
+            self.take_pending_draw(self.current_player)
+            return
+        drawn = self.draw_for_turn(self.current_player)
+        if drawn:
+            drawn_card = drawn[-1]
+            # Verificar si puede jugar la carta robada
+            if self.is_valid_play(drawn_card):
+                self.notify_drawn_card(drawn_card)
+                self.take_card(self.current_player, self.player_hands[self.current_player].index(drawn_card))
+                self.play_card(self.current_player, drawn_card, from_draw=True)
+                return
+
+        # No puede jugar, avanzar turno
+        self.advance_turn()
+        self.update_all_displays()
+        # Si el siguiente lo juega la IA, programar su turno
+        self.end_turn()
+
+    # ------------------------------------------------------------------
+    # Suscriptores del motor
+    # ------------------------------------------------------------------
+    def track_beliefs_after_play(self, event):
+        """Actualiza probabilidades y contadores con la carta jugada"""
+        prev_card = event.prev_card
+        prev_color = prev_card.color if prev_card else None
+        prev_value = prev_card.value if prev_card else None
+        self.update_probabilities_after_play(event.player_id, event.card, prev_color, prev_value)
+        if event.from_draw and event.player_id in self.probabilities:
+            # Robó porque no tenía la carta previa: mantener en 0 SOLO para quien robó
+            self.probabilities[event.player_id]['colors'][prev_color] = 0.0
+            self.probabilities[event.player_id]['numbers'][prev_value] = 0.0
+
+    def track_beliefs_after_draw(self, event):
+        """Caso 6: robar sin cartas válidas revela lo que el jugador no tiene"""
+        if event.reason == 'robo':
+            self.update_probabilities_after_draw(event.player_id)
+
+    def record_play_stats(self, event):
+        prev_card = event.prev_card
+        self.registrar_jugada(event.player_id, event.card,
+                              prev_card.color if prev_card else None,
+                              prev_card.value if prev_card else None)
+
+    def record_decision_snapshot(self, event):
+        self.decision_snapshots.append(self.snapshot_decision(event.player_id, event.card))
+
+    def update_probabilities_after_draw(self, player_id):
+        """
+        Caso 6: Jugador roba del mazo porque no tiene cartas válidas
+        """
+        if player_id == 1:
+            return
+        current_color = self.current_card.color
+        current_value = self.current_card.value
+        current_type = self.current_card.card_type
+
+        # Siempre baja a 0 el color y número actual
+        self.probabilities[player_id]['colors'][current_color] = 0.0
+        self.probabilities[player_id]['numbers'][current_value] = 0.0
+
+        # Para cada carta especial, baja el contador y actualiza la probabilidad
+        total_cards = self.get_total_remaining_cards()
+        for special in self.special_cards:
+            # Baja el contador solo si hay cartas restantes
+            if self.card_counters['specials'][special] > 0:
+                self.card_counters['specials'][special] -= 1
+            self.probabilities[player_id]['specials'][special] = (
+                self.card_counters['specials'][special] / max(total_cards, 1)
+            )
+
+        # Si la carta actual es comodín, baja el contador y actualiza la probabilidad de comodines
+        if current_type == 'wildcard':
+            for wildcard in self.wildcards:
+                if self.card_counters['wildcards'][wildcard] > 0:
+                    self.card_counters['wildcards'][wildcard] -= 1
+                self.probabilities[player_id]['wildcards'][wildcard] = (
+                    self.card_counters['wildcards'][wildcard] / max(total_cards, 1)
+                )
+
+    def declare_uno(self):
+        """Declara UNO"""
+        player_id = self.current_player
+        if len(self.player_hands[player_id]) == 1:
+            self.add_to_log(f"🔔 {self.player_names[player_id]} declara UNO!")
+            self.uno_declarado[player_id] = True
+        else:
+            self.add_to_log(f"❌ {self.player_names[player_id]} declara UNO incorrectamente")
+
+    def game_over(self, winner_id):
+        """Termina el juego"""
+        self.game_started = False
+        self.winner = winner_id
+        if self.history is not None:
+            self.history.checkpoint()
+        if GameOver in self.events:
+            self.events.emit(GameOver(winner_id))
+
+    # ------------------------------------------------------------------
+    # Partidas sin interfaz
+    # ------------------------------------------------------------------
+    def play_turn(self):
+        """Juega el turno actual: la máquina con su IA, los demás con su política"""
+        self.turn_count += 1
+        player_id = self.current_player
+        if player_id == 1:
+            self.machine_play_turn()
+            return
+        valid_cards = self.get_valid_cards(player_id)
+        if not valid_cards:
+            self.draw_card()
+            return
+        policy = self.policies.get(player_id, heuristic_policy)
+        index, card, _ = policy(self, player_id, valid_cards)
+        if len(self.player_hands[player_id]) == 1:
+            self.declare_uno()
+        self.take_card(player_id, index)
+        self.play_card(player_id, card)
+
+    def play_turn_jump_in(self):
+        """play_turn con la regla de meterse: el primer jugador (en orden de juego) con una
+        carta idéntica a la de la mesa la juega antes del turno y el juego sigue desde él"""
+        top = self.current_card
+        if self.game_started and self.deck.discarded[-1] is top:
+            hands = self.player_hands
+            for offset in range(1, self.num_players):
+                seat = (self.current_player + offset * self.game_direction) % self.num_players
+                for index, card in enumerate(hands[seat]):
+                    if card.face_id == top.face_id:
+                        self.turn_count += 1
+                        self.current_player = seat
+                        if len(hands[seat]) == 1:
+                            self.declare_uno()
+                        self.add_to_log(f"⚡ {self.player_names[seat]} se mete con {card.to_display_string()}")
+                        self.take_card(seat, index)
+                        self.play_card(seat, card)
+                        return
+        type(self).play_turn(self)
+
+    def play_until_over(self, max_turns=MAX_TURNS):
+        """Juega turnos hasta que alguien gane o se alcance max_turns"""
+        while self.game_started and self.turn_count < max_turns:
+            self.play_turn()
+        return self.winner
+
+
+def play_headless_game(seed=None, policies=None, max_turns=MAX_TURNS, record_snapshots=False,
+                       machine_policy=None, observers=('beliefs',), num_players=3, num_decks=1,
+                       invariants=None, metrics=None, rules=None, profiles=None):
+    """Juega una partida completa sin interfaz y devuelve el motor al terminar.
+
+    Por defecto solo se conecta el seguimiento de probabilidades, que es lo
+    que usa la heurística; sin log ni registro de jugadas. `invariants` es un
+    UNOInvariants.InvariantChecker opcional que se conecta a la partida y
+    `metrics` un UNOMetrics.GameMetrics que mide decisiones y resultados.
+    `rules` activa reglas de la casa (ver DEFAULT_RULES) y `profiles` es un
+    UNOProfiles.ProfileStore con los perfiles de los jugadores.
+    """
+    if record_snapshots:
+        observers = tuple(observers) + ('snapshots',)
+    game = UNOGameEngine(seed=seed, policies=policies, machine_policy=machine_policy,
+                         observers=observers, num_players=num_players, num_decks=num_decks, rules=rules,
+                         profiles=profiles)
+    if invariants is not None:
+        invariants.attach(game)
+    if metrics is not None:
+        metrics.attach(game)
+    game.start_new_game()
+    game.play_until_over(max_turns)
+    if metrics is not None:
+        metrics.game_finished(game)
+    return game
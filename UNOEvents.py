@@ -0,0 +1,60 @@
+"""Eventos del motor y registro de suscriptores.
+
+El motor solo construye un evento si alguien está suscrito a su tipo
+(`if CardPlayed in game.events: ...`), así que una simulación sin
+observadores no paga por el log, las estadísticas ni la interfaz.
+"""
+from collections import namedtuple
+
+# prev_card: carta en juego antes de la jugada; from_draw: era la carta recién robada
+CardPlayed = namedtuple('CardPlayed', 'player_id card prev_card from_draw')
+# reason: 'robo' (sin cartas válidas), 'r2', 'r4' o 'castigo' (no declaró UNO)
+CardDrawn = namedtuple('CardDrawn', 'player_id cards reason')
+# reason: valor de la carta que provocó el salto ('s', 'r2' o 'r4')
+TurnSkipped = namedtuple('TurnSkipped', 'player_id reason')
+DirectionReversed = namedtuple('DirectionReversed', 'direction')
+GameOver = namedtuple('GameOver', 'winner_id')
+
+EVENT_TYPES = (CardPlayed, CardDrawn, TurnSkipped, DirectionReversed, GameOver)
+
+
+class EventBus:
+    def __init__(self):
+        self._handlers = {}  # tipo de evento -> tupla de funciones
+        self._last = {}  # tipo de evento -> cuántas funciones del final son last=True
+
+    def __contains__(self, event_type):
+        """True si hay al menos un suscriptor para event_type"""
+        return event_type in self._handlers
+
+    def subscribe(self, event_type, handler, last=False):
+        """Suscribe handler; con last=True corre después de los demás, aunque se suscriban más tarde"""
+        handlers = self._handlers.get(event_type, ())
+        if last:
+            self._handlers[event_type] = handlers + (handler,)
+            self._last[event_type] = self._last.get(event_type, 0) + 1
+        else:
+            end = len(handlers) - self._last.get(event_type, 0)
+            self._handlers[event_type] = handlers[:end] + (handler,) + handlers[end:]
+
+    def unsubscribe(self, event_type, handler):
+        old = self._handlers.get(event_type, ())
+        last = self._last.get(event_type, 0)
+        last -= sum(h == handler for h in old[len(old) - last:])
+        handlers = tuple(h for h in old if h != handler)
+        if last:
+            self._last[event_type] = last
+        else:
+            self._last.pop(event_type, None)
+        if handlers:
+            self._handlers[event_type] = handlers
+        else:
+            self._handlers.pop(event_type, None)
+
+    def handler_count(self):
+        """Total de suscripciones (para la instrumentación de memoria)"""
+        return sum(len(handlers) for handlers in self._handlers.values())
+
+    def emit(self, event):
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
@@ -0,0 +1,362 @@
+"""Generación de datos de entrenamiento a partir de partidas simuladas.
+
+Cada decisión registrada (ver UNOGameEngine.snapshot_decision) se convierte
+en una fila de ancho fijo y se escribe en fragmentos .npy mapeados en memoria:
+
+    features_<worker>_<n>.npy  float32 (filas, FEATURE_WIDTH)
+    actions_<worker>_<n>.npy   int16   (filas,)       cara jugada
+    legal_<worker>_<n>.npy     uint8   (filas, 54)    cartas válidas en la mano
+
+Uso:
+    python UNOFeatures.py --games 10000 --workers 8 --out datos/
+    python UNOFeatures.py --games 1000000 --out datos/ --metrics-port 9100   (ver UNOMetrics)
+    python UNOFeatures.py --games 1000000 --out datos/ --checkpoint 5        (reanudable)
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from UNOCheckpoint import Checkpointer, check_params
+from UNOEngine import CARD_FACES, NUM_FACES, play_headless_game
+from UNOMetrics import MetricsHub, worker_metrics
+
+FEATURE_VERSION = 1
+NUM_SEATS = 3
+BELIEF_WIDTH = 19  # 4 colores + 10 números + 3 especiales + 2 comodines
+BELIEF_SEATS = 2  # Jugador 1 y Jugador 2
+
+# Desplazamientos de cada bloque dentro de la fila
+HAND_OFFSET = 0
+TOP_OFFSET = HAND_OFFSET + NUM_FACES
+SIZES_OFFSET = TOP_OFFSET + NUM_FACES
+DIRECTION_OFFSET = SIZES_OFFSET + NUM_SEATS
+PLAYER_OFFSET = DIRECTION_OFFSET + 1
+BELIEF_OFFSET = PLAYER_OFFSET + NUM_SEATS
+FEATURE_WIDTH = BELIEF_OFFSET + BELIEF_SEATS * BELIEF_WIDTH
+
+DEFAULT_SHARD_ROWS = 1 << 16
+DEFAULT_CHUNK_ROWS = 4096
+
+
+def _build_legal_table():
+    """LEGAL_TABLE[carta_en_juego, cara] indica si la cara se puede jugar encima"""
+    table = np.zeros((NUM_FACES, NUM_FACES), dtype=bool)
+    for top_id, (top_color, top_value) in enumerate(CARD_FACES):
+        for face_id, (color, value) in enumerate(CARD_FACES):
+            table[top_id, face_id] = color is None or color == top_color or value == top_value
+    return table
+
+
+LEGAL_TABLE = _build_legal_table()
+
+
+def encode_snapshot(snapshot, row, legal_row):
+    """Escribe una instantánea en las filas dadas (vistas de numpy); devuelve la acción o -1"""
+    row[:] = 0.0
+    hand = np.bincount(snapshot['hand'], minlength=NUM_FACES)
+    row[HAND_OFFSET:HAND_OFFSET + NUM_FACES] = hand
+    row[TOP_OFFSET + snapshot['top']] = 1.0
+    # Tamaños de mano relativos al jugador que decide, en el orden de juego
+    player = snapshot['player']
+    direction = snapshot['direction']
+    sizes = snapshot['hand_sizes']
+    if len(sizes) != NUM_SEATS:
+        raise ValueError(f"Las características son para mesas de {NUM_SEATS} jugadores, "
+                         f"la partida tiene {len(sizes)}")
+    for k in range(NUM_SEATS):
+        row[SIZES_OFFSET + k] = sizes[(player + k * direction) % NUM_SEATS]
+    row[DIRECTION_OFFSET] = direction
+    row[PLAYER_OFFSET + player] = 1.0
+    for k, belief in enumerate(snapshot['beliefs'][:BELIEF_SEATS]):
+        start = BELIEF_OFFSET + k * BELIEF_WIDTH
+        row[start:start + BELIEF_WIDTH] = belief
+    legal_row[:] = (hand > 0) & LEGAL_TABLE[snapshot['top']]
+    return snapshot.get('action', -1)
+
+
+class ShardWriter:
+    """Escribe filas por bloques en fragmentos .npy mapeados en memoria"""
+
+    def __init__(self, out_dir, prefix, shard_rows=DEFAULT_SHARD_ROWS):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.shard_rows = shard_rows
+        self.shards = []  # [(sufijo, filas)]
+        self._arrays = None
+        self._filled = 0
+
+    def _path(self, kind, suffix):
+        return os.path.join(self.out_dir, f"{kind}_{suffix}.npy")
+
+    def _open_shard(self):
+        suffix = f"{self.prefix}_{len(self.shards):05d}"
+        open_memmap = np.lib.format.open_memmap
+        self._suffix = suffix
+        self._arrays = (
+            open_memmap(self._path('features', suffix), mode='w+', dtype=np.float32,
+                        shape=(self.shard_rows, FEATURE_WIDTH)),
+            open_memmap(self._path('actions', suffix), mode='w+', dtype=np.int16,
+                        shape=(self.shard_rows,)),
+            open_memmap(self._path('legal', suffix), mode='w+', dtype=np.uint8,
+                        shape=(self.shard_rows, NUM_FACES)),
+        )
+        self._filled = 0
+
+    def _close_shard(self):
+        arrays = dict(zip(('features', 'actions', 'legal'), self._arrays))
+        self._arrays = None
+        for kind in ('features', 'actions', 'legal'):
+            array = arrays.pop(kind)
+            array.flush()
+            if self._filled < self.shard_rows:
+                # Fragmento incompleto: copiarlo por bloques a su tamaño exacto
+                path = self._path(kind, self._suffix)
+                tmp_path = path + '.tmp'
+                exact = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=array.dtype,
+                                                  shape=(self._filled,) + array.shape[1:])
+                for start in range(0, self._filled, DEFAULT_CHUNK_ROWS):
+                    stop = min(start + DEFAULT_CHUNK_ROWS, self._filled)
+                    exact[start:stop] = array[start:stop]
+                exact.flush()
+                # Cerrar ambos mapas antes de reemplazar el archivo
+                del exact, array
+                os.replace(tmp_path, path)
+            else:
+                del array
+        self.shards.append((self._suffix, self._filled))
+
+    def write(self, features, actions, legal):
+        """Añade un bloque de filas, abriendo fragmentos nuevos cuando se llenan"""
+        offset = 0
+        total = len(actions)
+        while offset < total:
+            if self._arrays is None:
+                self._open_shard()
+            take = min(total - offset, self.shard_rows - self._filled)
+            dest = slice(self._filled, self._filled + take)
+            src = slice(offset, offset + take)
+            self._arrays[0][dest] = features[src]
+            self._arrays[1][dest] = actions[src]
+            self._arrays[2][dest] = legal[src]
+            self._filled += take
+            offset += take
+            if self._filled == self.shard_rows:
+                self._close_shard()
+
+    def close(self):
+        if self._arrays is not None and self._filled:
+            self._close_shard()
+        return self.shards
+
+    def position(self):
+        """Fragmentos cerrados y filas del abierto, con los datos ya sincronizados a disco"""
+        if self._arrays is not None:
+            for array in self._arrays:
+                array.flush()
+        return {'shards': self.shards, 'open': self._arrays is not None, 'filled': self._filled}
+
+    def restore(self, position):
+        """Vuelve a la posición guardada; las filas posteriores del fragmento abierto se sobrescriben"""
+        self.shards = [tuple(shard) for shard in position['shards']]
+        if position['open']:
+            self._suffix = f"{self.prefix}_{len(self.shards):05d}"
+            self._arrays = tuple(np.load(self._path(kind, self._suffix), mmap_mode='r+')
+                                 for kind in ('features', 'actions', 'legal'))
+            self._filled = position['filled']
+
+
+def write_games(games, out_dir, prefix, shard_rows=DEFAULT_SHARD_ROWS, chunk_rows=DEFAULT_CHUNK_ROWS,
+                checkpoint=None, resume=None):
+    """Codifica un iterable de partidas (listas de instantáneas) y lo escribe por bloques.
+
+    checkpoint (UNOCheckpoint.Checkpointer) guarda, cuando toca, cuántas partidas
+    se escribieron y la posición de los fragmentos. resume es ese estado: games
+    debe empezar en la partida siguiente a la última guardada.
+    """
+    writer = ShardWriter(out_dir, prefix, shard_rows)
+    done = 0
+    if resume is not None:
+        writer.restore(resume['writer'])
+        done = resume['games']
+    features = np.zeros((chunk_rows, FEATURE_WIDTH), dtype=np.float32)
+    actions = np.zeros(chunk_rows, dtype=np.int16)
+    legal = np.zeros((chunk_rows, NUM_FACES), dtype=np.uint8)
+    filled = 0
+    for snapshots in games:
+        for snapshot in snapshots:
+            actions[filled] = encode_snapshot(snapshot, features[filled], legal[filled])
+            filled += 1
+            if filled == chunk_rows:
+                writer.write(features, actions, legal)
+                filled = 0
+        done += 1
+        if checkpoint is not None and checkpoint.due():
+            # Solo entre partidas y con el bloque pendiente ya en el fragmento
+            writer.write(features[:filled], actions[:filled], legal[:filled])
+            filled = 0
+            checkpoint.save({'games': done, 'writer': writer.position(), 'finished': False})
+    if filled:
+        writer.write(features[:filled], actions[:filled], legal[:filled])
+    if checkpoint is None:
+        return writer.close()
+    # Antes de recortar el último fragmento, para que un corte ahí no repita partidas
+    checkpoint.save({'games': done, 'writer': writer.position(), 'finished': False})
+    shards = writer.close()
+    checkpoint.save({'games': done, 'writer': writer.position(), 'finished': True})
+    return shards
+
+
+def _simulated_games(seed_start, n_games, policies=None, metrics=None):
+    for seed in range(seed_start, seed_start + n_games):
+        yield play_headless_game(seed=seed, policies=policies, record_snapshots=True,
+                                 metrics=metrics).decision_snapshots
+
+
+def _generate_worker(args):
+    out_dir, worker_id, seed_start, n_games, shard_rows, chunk_rows, checkpoint_interval = args
+    prefix = f"w{worker_id:03d}"
+    checkpoint = resume = None
+    done = 0
+    if checkpoint_interval is not None:
+        checkpoint = Checkpointer(os.path.join(out_dir, f"checkpoint_{prefix}.json"), checkpoint_interval)
+        resume = checkpoint.load()
+        if resume is not None:
+            if resume['finished']:
+                return [tuple(shard) for shard in resume['writer']['shards']]
+            done = resume['games']
+    metrics = worker_metrics()
+    games = _simulated_games(seed_start + done, n_games - done, metrics=metrics)
+    shards = write_games(games, out_dir, prefix, shard_rows, chunk_rows, checkpoint, resume)
+    if metrics is not None:
+        metrics.flush()
+    return shards
+
+
+def write_manifest(out_dir, shards, extra=None):
+    manifest = {
+        'version': FEATURE_VERSION,
+        'feature_width': FEATURE_WIDTH,
+        'num_faces': NUM_FACES,
+        'shards': [{'name': name, 'rows': rows} for name, rows in shards],
+    }
+    if extra:
+        manifest.update(extra)
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def generate_dataset(out_dir, n_games, workers=None, seed=0,
+                     shard_rows=DEFAULT_SHARD_ROWS, chunk_rows=DEFAULT_CHUNK_ROWS, hub=None,
+                     checkpoint_interval=None):
+    """Simula n_games partidas en paralelo; cada proceso escribe sus propios fragmentos.
+
+    hub es un UNOMetrics.MetricsHub opcional que recibe las métricas de los procesos.
+    Con checkpoint_interval (segundos) cada proceso guarda su avance y, si la
+    corrida se interrumpe, volver a lanzarla con los mismos parámetros la
+    continúa donde quedó; los fragmentos salen iguales que sin interrupción.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    run_path = os.path.join(out_dir, 'checkpoint.json')
+    if checkpoint_interval is not None:
+        # El reparto de semillas y los nombres de fragmento dependen de estos parámetros
+        check_params(run_path, {'games': n_games, 'workers': workers, 'seed': seed, 'shard_rows': shard_rows})
+    per_worker = -(-n_games // workers)
+    jobs = []
+    for worker_id in range(workers):
+        start = worker_id * per_worker
+        count = min(per_worker, n_games - start)
+        if count > 0:
+            jobs.append((out_dir, worker_id, seed + start, count, shard_rows, chunk_rows, checkpoint_interval))
+    shards = []
+    if len(jobs) == 1:
+        if hub is not None:
+            hub.install_local()
+        shards.extend(_generate_worker(jobs[0]))
+    else:
+        pool_kwargs = hub.pool_kwargs() if hub is not None else {}
+        with ProcessPoolExecutor(max_workers=len(jobs), **pool_kwargs) as pool:
+            for worker_shards in pool.map(_generate_worker, jobs):
+                shards.extend(worker_shards)
+    manifest = write_manifest(out_dir, shards, {'games': n_games, 'seed': seed})
+    if checkpoint_interval is not None:
+        # Con el manifiesto escrito la corrida está completa
+        for job in jobs:
+            Checkpointer(os.path.join(out_dir, f"checkpoint_w{job[1]:03d}.json")).remove()
+        os.remove(run_path)
+    return manifest
+
+
+def load_recorded_games(path):
+    """Lee partidas grabadas: un archivo JSONL con una lista de instantáneas por línea"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class UNODataset:
+    """Lee los fragmentos de un directorio sin copiarlos a memoria (mmap_mode='r')"""
+
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest['version'] != FEATURE_VERSION:
+            raise ValueError(f"Versión de datos {self.manifest['version']} no soportada "
+                             f"(se esperaba {FEATURE_VERSION})")
+        self.shards = []
+        for shard in self.manifest['shards']:
+            name = shard['name']
+            self.shards.append(tuple(
+                np.load(os.path.join(out_dir, f"{kind}_{name}.npy"), mmap_mode='r')
+                for kind in ('features', 'actions', 'legal')
+            ))
+
+    def __len__(self):
+        return sum(len(actions) for _, actions, _ in self.shards)
+
+    def iter_batches(self, batch_size=DEFAULT_CHUNK_ROWS):
+        """Devuelve vistas (features, actions, legal) de como máximo batch_size filas"""
+        for features, actions, legal in self.shards:
+            for start in range(0, len(actions), batch_size):
+                stop = start + batch_size
+                yield features[start:stop], actions[start:stop], legal[start:stop]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera tensores de entrenamiento de UNO")
+    parser.add_argument('--out', required=True, help="Directorio de salida")
+    parser.add_argument('--games', type=int, default=1000, help="Partidas a simular")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos en paralelo")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla de la primera partida")
+    parser.add_argument('--shard-rows', type=int, default=DEFAULT_SHARD_ROWS)
+    parser.add_argument('--from-jsonl', default=None,
+                        help="Codificar partidas grabadas en vez de simular")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Exponer métricas en vivo en http://127.0.0.1:PUERTO/metrics")
+    parser.add_argument('--metrics-json', default=None, help="Foto periódica de las métricas en JSON")
+    parser.add_argument('--checkpoint', type=float, default=None, metavar='SEGUNDOS',
+                        help="Guardar el avance cada SEGUNDOS; relanzar igual reanuda la corrida")
+    args = parser.parse_args()
+    if args.from_jsonl:
+        os.makedirs(args.out, exist_ok=True)
+        shards = write_games(load_recorded_games(args.from_jsonl), args.out, 'rec', args.shard_rows)
+        manifest = write_manifest(args.out, shards, {'source': args.from_jsonl})
+    elif args.metrics_port is not None or args.metrics_json:
+        with MetricsHub(args.metrics_port, args.metrics_json) as hub:
+            manifest = generate_dataset(args.out, args.games, args.workers, args.seed, args.shard_rows,
+                                        hub=hub, checkpoint_interval=args.checkpoint)
+    else:
+        manifest = generate_dataset(args.out, args.games, args.workers, args.seed, args.shard_rows,
+                                    checkpoint_interval=args.checkpoint)
+    rows = sum(shard['rows'] for shard in manifest['shards'])
+    print(f"{rows} decisiones en {len(manifest['shards'])} fragmentos -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
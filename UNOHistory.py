@@ -0,0 +1,224 @@
+"""Historial de jugadas con deltas reversibles (deshacer y rehacer).
+
+Con el historial activo (`game.enable_history()`), el motor anota cada
+cambio del estado como un delta pequeño:
+
+    ('take', jugador, índice, carta)           carta de la mano a la mesa
+    ('discard', carta)                          carta a la pila de descarte
+    ('deal', jugador, carta)                    carta del mazo a la mano
+    ('reshuffle', descarte, mazo)               el descarte pasa a ser el mazo
+    ('swap', jugador, jugador)                  cambio de manos (regla del 7)
+    ('rotate', sentido)                         las manos rotan (regla del 0)
+    ('shared', i, antes, marca, después, marca)         probabilidad de todos
+    ('own', jugador, i, antes, marca, después, marca)   probabilidad de uno
+
+Al cerrar cada turno (`checkpoint`, desde UNOGameEngine.end_turn) se añaden
+los contadores de cartas que cambiaron y los datos escalares (carta en
+juego, turno, sentido, UNO, ...). Deshacer aplica los inversos en orden
+contrario y rehacer los vuelve a aplicar, así que cada paso cuesta lo que
+cambió en esa jugada y no el largo de la partida; solo deshacer un
+rebarajado copia el descarte. El generador aleatorio no se rebobina: al
+jugar desde un punto anterior, los desempates y rebarajados pueden variar.
+"""
+from UNOEngine import COUNTER_KEYS, counter_value, rotate_hands, set_counter_value, swap_hands
+
+# Atributos escalares del motor que se guardan antes y después de cada jugada
+SCALARS = ('current_card', 'current_player', 'game_direction', 'game_started', 'winner', 'turn_count',
+           'pending_draw', 'pending_value')
+
+
+class Move:
+    """Una jugada: deltas en orden, escalares antes/después y contadores cambiados"""
+    __slots__ = ('deltas', 'before', 'after', 'counters', 'rows')
+
+    def __init__(self, deltas, before, after, counters):
+        self.deltas = deltas
+        self.before = before
+        self.after = after
+        self.counters = counters  # [(índice en COUNTER_KEYS, antes, después)]
+        self.rows = None  # Registros quitados al deshacer, para rehacer
+
+
+def _undo_take(game, delta):
+    game.player_hands[delta[1]].insert(delta[2], delta[3])
+
+
+def _redo_take(game, delta):
+    game.player_hands[delta[1]].pop(delta[2])
+
+
+def _undo_discard(game, delta):
+    game.deck.discarded.pop()
+
+
+def _redo_discard(game, delta):
+    game.deck.discarded.append(delta[1])
+
+
+def _undo_deal(game, delta):
+    game.deck.cards.append(game.player_hands[delta[1]].pop())
+
+
+def _redo_deal(game, delta):
+    game.player_hands[delta[1]].append(game.deck.cards.pop())
+
+
+def _undo_reshuffle(game, delta):
+    game.deck.cards = []
+    game.deck.discarded = delta[1][:]
+
+
+def _redo_reshuffle(game, delta):
+    game.deck.cards = delta[2][:]
+    game.deck.discarded = [delta[1][-1]]
+
+
+def _swap(game, delta):
+    swap_hands(game, delta[1], delta[2])
+
+
+def _undo_rotate(game, delta):
+    rotate_hands(game, -delta[1])
+
+
+def _redo_rotate(game, delta):
+    rotate_hands(game, delta[1])
+
+
+def _undo_shared(game, delta):
+    _, index, value, stamp, _, _ = delta
+    game.beliefs.shared[index] = value
+    game.beliefs.shared_stamp[index] = stamp
+
+
+def _redo_shared(game, delta):
+    _, index, _, _, value, stamp = delta
+    game.beliefs.shared[index] = value
+    game.beliefs.shared_stamp[index] = stamp
+
+
+def _undo_own(game, delta):
+    _, player, index, value, stamp, _, _ = delta
+    game.beliefs.own[player][index] = value
+    game.beliefs.own_stamp[player][index] = stamp
+
+
+def _redo_own(game, delta):
+    _, player, index, _, _, value, stamp = delta
+    game.beliefs.own[player][index] = value
+    game.beliefs.own_stamp[player][index] = stamp
+
+
+UNDO = {'take': _undo_take, 'discard': _undo_discard, 'deal': _undo_deal,
+        'reshuffle': _undo_reshuffle, 'swap': _swap, 'rotate': _undo_rotate,
+        'shared': _undo_shared, 'own': _undo_own}
+REDO = {'take': _redo_take, 'discard': _redo_discard, 'deal': _redo_deal,
+        'reshuffle': _redo_reshuffle, 'swap': _swap, 'rotate': _redo_rotate,
+        'shared': _redo_shared, 'own': _redo_own}
+
+
+class GameHistory:
+    """Jugadas de la partida actual; position es cuántas están aplicadas"""
+
+    def __init__(self, game):
+        self.game = game
+        self.reset()
+
+    def reset(self):
+        """Historial vacío a partir del estado actual (la partida recién repartida)"""
+        self.moves = []
+        self.position = 0
+        self.pending = []
+        self._before = self._scalars()
+        self._counters = self._counter_values()
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def can_undo(self):
+        return self.position > 0 or bool(self.pending)
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.moves)
+
+    def record(self, delta):
+        self.pending.append(delta)
+
+    def _scalars(self):
+        game = self.game
+        return (tuple(getattr(game, name) for name in SCALARS), tuple(game.uno_declarado.items()),
+                len(game.jugada_stats), len(game.decision_snapshots))
+
+    def _counter_values(self):
+        counters = self.game.card_counters
+        return [counter_value(counters, key) for key in COUNTER_KEYS]
+
+    def checkpoint(self):
+        """Cierra la jugada en curso si algo cambió; lo que se podía rehacer se descarta"""
+        after = self._scalars()
+        counters = self._counter_values()
+        changed = [(index, old, new) for index, (old, new) in enumerate(zip(self._counters, counters))
+                   if old != new]
+        if not self.pending and not changed and after == self._before:
+            return
+        del self.moves[self.position:]
+        self.moves.append(Move(self.pending, self._before, after, changed))
+        self.position += 1
+        self.pending = []
+        self._before = after
+        self._counters = counters
+
+    def undo(self, steps=1):
+        return self.seek(self.position - steps)
+
+    def redo(self, steps=1):
+        return self.seek(self.position + steps)
+
+    def seek(self, position):
+        """Lleva la partida a la jugada position (0 = recién repartida); devuelve la posición"""
+        self.checkpoint()
+        position = max(0, min(position, len(self.moves)))
+        while self.position > position:
+            self.position -= 1
+            self._undo(self.moves[self.position])
+        while self.position < position:
+            self._redo(self.moves[self.position])
+            self.position += 1
+        self._before = self._scalars()
+        self._counters = self._counter_values()
+        return self.position
+
+    def _undo(self, move):
+        game = self.game
+        for delta in reversed(move.deltas):
+            UNDO[delta[0]](game, delta)
+        counters = game.card_counters
+        for index, old, _ in move.counters:
+            set_counter_value(counters, COUNTER_KEYS[index], old)
+        _, _, stats, snapshots = move.before
+        move.rows = (game.jugada_stats[stats:], game.decision_snapshots[snapshots:])
+        del game.jugada_stats[stats:]
+        del game.decision_snapshots[snapshots:]
+        self._restore(move.before)
+
+    def _redo(self, move):
+        game = self.game
+        for delta in move.deltas:
+            REDO[delta[0]](game, delta)
+        counters = game.card_counters
+        for index, _, new in move.counters:
+            set_counter_value(counters, COUNTER_KEYS[index], new)
+        if move.rows is not None:
+            game.jugada_stats.extend(move.rows[0])
+            game.decision_snapshots.extend(move.rows[1])
+            move.rows = None
+        self._restore(move.after)
+
+    def _restore(self, scalars):
+        game = self.game
+        values, uno, _, _ = scalars
+        for name, value in zip(SCALARS, values):
+            setattr(game, name, value)
+        game.uno_declarado.update(uno)
@@ -1,150 +1,198 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
-import random
 from collections import defaultdict
-import copy
+import json
+import queue
+import socket
 import threading
 import time
 import pandas as pd
 
-TOTAL_CARDS = 108  # Total de cartas en un mazo de UNO
-
-class UNOCard:
-    def __init__(self, color, value, card_type):
-        self.color = color
-        self.value = value
-        self.card_type = card_type
+from UNOEngine import (CARD_FACES, DEFAULT_OBSERVERS, UNOCard, UNOGameEngine, card_from_face, heuristic_policy,
+                       random_policy)
+from UNOEvents import EVENT_TYPES, CardDrawn, CardPlayed, DirectionReversed, GameOver, TurnSkipped
+from UNOMemory import MemoryMonitor
+from UNOProfiler import ENGINE_PHASES, GUI_PHASES, PhaseProfiler
+from UNOServer import decode_counters, decode_event, encode_message
+
+PERF_REFRESH_MS = 1000  # Refresco de la pestaña de rendimiento
+MAX_LOG_LINES = 5000  # Líneas del log de la partida; las más viejas se descartan
+# Demora entre turnos automáticos en ms; None = el motor corre sin límite
+SPEEDS = {'Tiempo real': 1500, 'Rápido': 150, 'Máximo': None}
+MAX_RENDER_FPS = 10  # Cuadros por segundo como máximo a velocidad máxima
+BATCH_BUDGET_S = 0.05  # Tiempo de motor por vuelta del bucle de Tk a velocidad máxima
+SEAT_MODES = ('Humano', 'Máquina', 'Heurística', 'Aleatoria')
+REMOTE_POLL_MS = 30  # Cada cuánto aplica la interfaz los mensajes del servidor
+
+# Tamaño de las cartas dibujadas en el canvas de cada mano (píxeles)
+CARD_SIZE = {'horizontal': (84, 44), 'vertical': (130, 26)}
+CARD_GAP = 4
+HIDDEN_FACE = -1  # Carta boca abajo
+# Texto y color de cada cara, calculados una sola vez
+FACE_STYLES = {face_id: (UNOCard(color, value, None).to_display_string(),
+                         UNOCard(color, value, None).get_color_hex())
+               for face_id, (color, value) in enumerate(CARD_FACES)}
+FACE_STYLES[HIDDEN_FACE] = ('🂠', '#7F8C8D')
+
+
+class HandView:
+    """Mano dibujada en un solo tk.Canvas: un rectángulo y un texto por carta visible.
+
+    Solo se dibujan las cartas dentro de la región visible; los ítems de las
+    que salen de la vista se reutilizan para las que entran y solo se
+    reconfiguran si cambió la cara. La selección se resuelve por la posición
+    del clic, sin un binding por carta.
+    """
+
+    def __init__(self, canvas, orientation, on_click=None):
+        self.canvas = canvas
+        self.horizontal = orientation == 'horizontal'
+        self.card_w, self.card_h = CARD_SIZE[orientation]
+        self.pitch = (self.card_w if self.horizontal else self.card_h) + CARD_GAP
+        self.on_click = on_click
+        self.faces = []
+        self.selected = None
+        self._items = {}  # índice de carta -> (rectángulo, texto)
+        self._spare = []  # ítems ocultos listos para reutilizar
+        self._shown = {}  # (rectángulo, texto) -> (cara, seleccionada) dibujada
+        canvas.bind('<Button-1>', self._click)
+        canvas.bind('<Configure>', lambda event: self.redraw())
+
+    def scroll(self, *args):
+        """Comando de la barra de desplazamiento"""
+        if self.horizontal:
+            self.canvas.xview(*args)
+        else:
+            self.canvas.yview(*args)
+        self.redraw()
+
+    def show(self, faces, selected=None):
+        """Muestra la lista de caras (HIDDEN_FACE = boca abajo)"""
+        self.faces = faces
+        self.selected = selected
+        length = len(faces) * self.pitch + CARD_GAP
+        if self.horizontal:
+            self.canvas.configure(scrollregion=(0, 0, length, self.card_h + 2 * CARD_GAP))
+        else:
+            self.canvas.configure(scrollregion=(0, 0, self.card_w + 2 * CARD_GAP, length))
+        self.redraw()
 
-    def __repr__(self):
-        return f"{self.color}{self.value}" if self.color else str(self.value)
+    def select(self, index):
+        self.selected = index
+        self.redraw()
 
-    def to_display_string(self):
-        """Convierte carta a string legible"""
-        color_names = {'a': 'Azul', 'v': 'Verde', 'r': 'Rojo', 'am': 'Amarillo'}
-        special_names = {'r2': 'Roba 2', 'rev': 'Reversa', 's': 'Salta', 'c': 'Comodín', 'r4': 'Roba 4'}
-        if self.color:
-            if isinstance(self.value, int):
-                return f"{color_names[self.color]} {self.value}"
-            else:
-                return f"{color_names[self.color]} {special_names.get(self.value, self.value)}"
+    def visible_range(self):
+        if self.horizontal:
+            start, size = self.canvas.canvasx(0), self.canvas.winfo_width()
+        else:
+            start, size = self.canvas.canvasy(0), self.canvas.winfo_height()
+        first = max(int(start // self.pitch), 0)
+        last = min(int((start + size) // self.pitch) + 1, len(self.faces))
+        return first, last
+
+    def redraw(self):
+        first, last = self.visible_range()
+        for index in [i for i in self._items if not first <= i < last]:
+            items = self._items.pop(index)
+            for item in items:
+                self.canvas.itemconfigure(item, state='hidden')
+            self._shown[items] = None
+            self._spare.append(items)
+        for index in range(first, last):
+            items = self._items.get(index)
+            if items is None:
+                items = self._spare.pop() if self._spare else self._create_items()
+                self._items[index] = items
+                self._place(items, index)
+            state = (self.faces[index], index == self.selected)
+            if self._shown[items] != state:
+                text, fill = FACE_STYLES[state[0]]
+                rect, label = items
+                self.canvas.itemconfigure(rect, fill=fill, state='normal',
+                                          outline='#F1C40F' if state[1] else 'white',
+                                          width=3 if state[1] else 1)
+                self.canvas.itemconfigure(label, text=text, state='normal')
+                self._shown[items] = state
+
+    def _create_items(self):
+        rect = self.canvas.create_rectangle(0, 0, 0, 0)
+        label = self.canvas.create_text(0, 0, fill='white', font=('Arial', 8, 'bold'),
+                                        width=self.card_w - 4)
+        items = (rect, label)
+        self._shown[items] = None
+        return items
+
+    def _place(self, items, index):
+        offset = index * self.pitch + CARD_GAP
+        x, y = (offset, CARD_GAP) if self.horizontal else (CARD_GAP, offset)
+        rect, label = items
+        self.canvas.coords(rect, x, y, x + self.card_w, y + self.card_h)
+        self.canvas.coords(label, x + self.card_w / 2, y + self.card_h / 2)
+
+    def _click(self, event):
+        if self.horizontal:
+            position = self.canvas.canvasx(event.x)
         else:
-            return special_names.get(self.value, self.value)
-
-    def get_color_hex(self):
-        """Obtiene color hexadecimal para la interfaz"""
-        color_map = {
-            'a': '#0066CC',  # Azul
-            'v': '#00AA00',  # Verde
-            'r': '#CC0000',  # Rojo
-            'am': '#FFAA00'  # Amarillo
-        }
-        return color_map.get(self.color, '#333333')
-
-
-class UNODeck:
-    def __init__(self):
-        self.cards = []
-        self.discarded = []
-        self.create_deck()
-        self.shuffle()
-
-    def create_deck(self):
-        """Crea el mazo completo según especificaciones del PDF"""
-        colors = ['a', 'v', 'r', 'am']
-        # Cartas numéricas (76 total)
-        for color in colors:
-            # Un 0 por color
-            self.cards.append(UNOCard(color, 0, 'number'))
-            # Dos de cada número 1-9 por color
-            for num in range(1, 10):
-                self.cards.append(UNOCard(color, num, 'number'))
-                self.cards.append(UNOCard(color, num, 'number'))
-        # Cartas especiales (24 total)
-        specials = ['r2', 'rev', 's']
-        for color in colors:
-            for special in specials:
-                self.cards.append(UNOCard(color, special, 'special'))
-                self.cards.append(UNOCard(color, special, 'special'))
-        # Cartas comodín (8 total)
-        wildcards = ['c', 'r4']
-        for wildcard in wildcards:
-            for _ in range(4):
-                self.cards.append(UNOCard(None, wildcard, 'wildcard'))
-
-    def shuffle(self):
-        random.shuffle(self.cards)
-
-    def deal_card(self):
-        if not self.cards:
-            self.reshuffle_from_discard()
-        return self.cards.pop() if self.cards else None
-
-    def reshuffle_from_discard(self):
-        if len(self.discarded) > 1:
-            # Mantener la carta superior, barajar el resto
-            top_card = self.discarded.pop()
-            self.cards = self.discarded[:]
-            self.discarded = [top_card]
-            self.shuffle()
-
-
-class UNOIntelligentGUI:
-    def __init__(self):
+            position = self.canvas.canvasy(event.y)
+        index = int(position // self.pitch)
+        if self.on_click and 0 <= index < len(self.faces) and position - index * self.pitch >= CARD_GAP:
+            self.on_click(index)
+
+
+class UNOIntelligentGUI(UNOGameEngine):
+    def __init__(self, machine_policy=None, observers=DEFAULT_OBSERVERS, history=True, profiles=None,
+                 names=None):
         self.root = tk.Tk()
         self.root.title("🎮 UNO - Agente Inteligente | Tecnológico de Monterrey")
         self.root.geometry("1400x900")
         self.root.configure(bg='#2C3E50')
-        # Variables del juego
-        self.deck = UNODeck()
-        self.current_card = None
-        self.current_player = 0  # 0=Jugador1, 1=Máquina, 2=Jugador2
-        self.game_direction = 1
-        self.game_started = False
-        # Manos de jugadores
-        self.player_hands = [[], [], []]  # [Jugador1, Máquina, Jugador2]
-        self.player_names = ['Jugador 1', 'Máquina', 'Jugador 2']
-        # Sistema de probabilidades
-        self.init_probability_system()
+        # Variables del juego, manos y sistema de probabilidades
+        super().__init__(machine_policy=machine_policy, observers=observers, profiles=profiles)
+        for seat, name in zip(self.human_seats, names or ()):
+            self.player_names[seat] = name
+        # Con perfiles, cada partida se graba para ampliarlos al terminar
+        if profiles is not None and 'snapshots' not in observers:
+            self.attach_observer('snapshots')
+        # Historial para deshacer, rehacer y moverse por la partida
+        if history:
+            self.enable_history()
         # Variables de interfaz
         self.selected_card_index = None
         self.animation_running = False
+        # Modo espectador: ritmo de los turnos automáticos y salto de cuadros
+        self.paused = False
+        self._auto_after_id = None
+        self._restart_after_id = None
+        self._running_batch = False
+        self._render_pending = False
+        self._last_render = 0.0
+        self._log_buffer = []
+        self._pending_reasoning = None
+        self.spectator_wins = defaultdict(int)
+        # Temporizadores por fase (antes de crear los botones, que guardan los métodos)
+        self.profiler = PhaseProfiler()
+        self.profiler.instrument(self, ENGINE_PHASES)
+        self.profiler.instrument(self, GUI_PHASES)
+        if self.machine_policy is not None:
+            self.machine_policy = self.profiler.wrap('ia', self.machine_policy)
+        # Fotos de memoria al iniciar cada partida (solo si se activan)
+        self.memory = MemoryMonitor()
+        self.memory_watch = False
+        self.games_started = 0
+        self.export_btn = None
+        # Política configurada de la máquina (la opción 'Máquina' de cada asiento)
+        self.configured_machine_policy = self.machine_policy
         # Crear interfaz
         self.create_interface()
+        self.register_memory_counters()
+        # Suscribir log y aviso de fin de juego a los eventos del motor
+        for event_type in EVENT_TYPES:
+            self.events.subscribe(event_type, self.log_event)
+        self.events.subscribe(GameOver, self.show_game_over)
         # Iniciar juego automáticamente
         self.start_new_game()
-        self.jugada_stats = []  # Lista para registrar jugadas
-        self.uno_declarado = {0: False, 1: False, 2: False}  # Estado de UNO por jugador
-
-    def init_probability_system(self):
-        self.colors = ['a', 'v', 'r', 'am']
-        self.numbers = list(range(10))
-        self.special_cards = ['r2', 'rev', 's']
-        self.wildcards = ['c', 'r4']
-
-        # Contadores de cartas restantes (inicializados con valores iniciales)
-        self.card_counters = {
-            'colors': {'a': 25, 'v': 25, 'r': 25, 'am': 25},  # Cartas por color
-            'numbers': {i: 8 for i in range(1, 10)},  # Números 1-9
-            'number_0': 4,  # Número 0
-            'specials': {'r2': 8, 'rev': 8, 's': 8},  # Especiales
-            'wildcards': {'c': 4, 'r4': 4}  # Comodines
-        }
-
-        # Probabilidades iniciales para jugadores humanos
-        self.probabilities = {
-            0: {  # Jugador 1
-                'colors': {color: 25 / 108 for color in self.colors},
-                'numbers': {num: 8 / 108 if num != 0 else 4 / 108 for num in self.numbers},
-                'specials': {card: 8 / 108 for card in self.special_cards},
-                'wildcards': {card: 4 / 108 for card in self.wildcards}
-            },
-            2: {  # Jugador 2
-                'colors': {color: 25 / 108 for color in self.colors},
-                'numbers': {num: 8 / 108 if num != 0 else 4 / 108 for num in self.numbers},
-                'specials': {card: 8 / 108 for card in self.special_cards},
-                'wildcards': {card: 4 / 108 for card in self.wildcards}
-            }
-        }
+        self.root.after(PERF_REFRESH_MS, self.refresh_performance_panel)
 
     def create_interface(self):
         """Crea la interfaz gráfica completa"""
@@ -218,38 +266,23 @@ class UNOIntelligentGUI:
                                    font=('Arial', 10),
                                    bg='#34495E', fg='#BDC3C7')
         card_count_label.pack(side=tk.RIGHT)
-        # Frame con scroll horizontal para las cartas
+        # Canvas con scroll horizontal para las cartas
         cards_container = tk.Frame(player_frame, bg='#34495E')
         cards_container.pack(fill=tk.X, padx=10, pady=(0, 10))
-        # Canvas y scrollbar para scroll horizontal
-        canvas = tk.Canvas(cards_container, bg='#34495E', highlightthickness=0, height=80)
-        scrollbar = tk.Scrollbar(cards_container, orient=tk.HORIZONTAL, command=canvas.xview)
-        cards_frame = tk.Frame(canvas, bg='#34495E')
+        canvas = tk.Canvas(cards_container, bg='#34495E', highlightthickness=0,
+                           height=CARD_SIZE['horizontal'][1] + 2 * CARD_GAP)
+        hand_view = HandView(canvas, 'horizontal',
+                             on_click=lambda index, pid=player_id: self.select_card(index, pid))
+        scrollbar = tk.Scrollbar(cards_container, orient=tk.HORIZONTAL, command=hand_view.scroll)
         canvas.configure(xscrollcommand=scrollbar.set)
         canvas.pack(fill=tk.X)
         scrollbar.pack(fill=tk.X)
-        # Crear ventana en el canvas
-        canvas_window = canvas.create_window((0, 0), window=cards_frame, anchor='nw')
-        # Función para actualizar el scroll
-        def configure_scroll(event=None):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-            # Ajustar altura del canvas al contenido
-            canvas.configure(height=cards_frame.winfo_reqheight())
-        cards_frame.bind("<Configure>", configure_scroll)
-        # Función para redimensionar la ventana del canvas
-        def configure_canvas_window(event):
-            canvas_width = event.width
-            canvas.itemconfig(canvas_window, width=canvas_width)
-        canvas.bind("<Configure>", configure_canvas_window)
         # Guardar referencias
-        if not hasattr(self, 'player_labels'):
-            self.player_labels = {}
-            self.player_card_frames = {}
+        if not hasattr(self, 'hand_views'):
+            self.hand_views = {}
             self.player_card_count_labels = {}
-            self.player_canvases = {}
-        self.player_card_frames[player_id] = cards_frame
+        self.hand_views[player_id] = hand_view
         self.player_card_count_labels[player_id] = card_count_label
-        self.player_canvases[player_id] = canvas
 
     def create_machine_area(self, parent):
         """Crea el área de la máquina (lado izquierdo)"""
@@ -267,27 +300,16 @@ class UNOIntelligentGUI:
                                           font=('Arial', 10),
                                           bg='#34495E', fg='#BDC3C7')
         self.machine_card_count.pack()
-        # Frame con scroll para cartas de la máquina
+        # Canvas con scroll vertical para las cartas de la máquina
         cards_container = tk.Frame(machine_frame, bg='#34495E')
         cards_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        # Canvas y scrollbar vertical para la máquina
-        canvas = tk.Canvas(cards_container, bg='#34495E', highlightthickness=0, width=150)
-        scrollbar = tk.Scrollbar(cards_container, orient=tk.VERTICAL, command=canvas.yview)
-        machine_cards_frame = tk.Frame(canvas, bg='#34495E')
+        canvas = tk.Canvas(cards_container, bg='#34495E', highlightthickness=0,
+                           width=CARD_SIZE['vertical'][0] + 2 * CARD_GAP)
+        hand_view = HandView(canvas, 'vertical')
+        scrollbar = tk.Scrollbar(cards_container, orient=tk.VERTICAL, command=hand_view.scroll)
         canvas.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        # Crear ventana en el canvas
-        canvas_window = canvas.create_window((0, 0), window=machine_cards_frame, anchor='nw')
-        # Función para actualizar el scroll vertical
-        def configure_machine_scroll(event=None):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-        machine_cards_frame.bind("<Configure>", configure_machine_scroll)
-        # Función para redimensionar
-        def configure_machine_canvas_window(event):
-            canvas_height = event.height
-            canvas.itemconfig(canvas_window, height=canvas_height)
-        canvas.bind("<Configure>", configure_machine_canvas_window)
         # Área de decisión de IA
         decision_frame = tk.LabelFrame(machine_frame,
                                       text="Decisión IA",
@@ -301,12 +323,8 @@ class UNOIntelligentGUI:
                                        wrap=tk.WORD)
         self.ai_decision_text.pack(fill=tk.BOTH, expand=True)
         # Guardar referencias
-        self.machine_cards_frame = machine_cards_frame
-        self.player_card_frames[1] = machine_cards_frame
+        self.hand_views[1] = hand_view
         self.player_card_count_labels[1] = self.machine_card_count
-        if not hasattr(self, 'player_canvases'):
-            self.player_canvases = {}
-        self.player_canvases[1] = canvas
 
     def create_center_area(self, parent):
         """Crea el área central con carta actual"""
@@ -379,6 +397,38 @@ class UNOIntelligentGUI:
                                                       font=('Consolas', 8),
                                                       bg='#2C3E50', fg='white')
         self.game_log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Pestaña de rendimiento
+        perf_frame = tk.Frame(notebook, bg='#2C3E50')
+        notebook.add(perf_frame, text="Rendimiento")
+        perf_buttons = tk.Frame(perf_frame, bg='#2C3E50')
+        perf_buttons.pack(fill=tk.X, padx=5, pady=(5, 0))
+        self.cprofile_btn = tk.Button(perf_buttons,
+                                     text="cProfile: OFF",
+                                     font=('Arial', 8),
+                                     command=self.toggle_cprofile)
+        self.cprofile_btn.pack(side=tk.LEFT)
+        tk.Button(perf_buttons,
+                 text="💾 Guardar",
+                 font=('Arial', 8),
+                 command=self.dump_performance).pack(side=tk.LEFT, padx=5)
+        tk.Button(perf_buttons,
+                 text="Reiniciar",
+                 font=('Arial', 8),
+                 command=self.profiler.reset).pack(side=tk.LEFT)
+        self.memory_btn = tk.Button(perf_buttons,
+                                   text="Memoria: OFF",
+                                   font=('Arial', 8),
+                                   command=self.toggle_memory_watch)
+        self.memory_btn.pack(side=tk.LEFT, padx=5)
+        tk.Button(perf_buttons,
+                 text="📸 Foto",
+                 font=('Arial', 8),
+                 command=self.take_memory_snapshot).pack(side=tk.LEFT)
+        self.performance_text = scrolledtext.ScrolledText(perf_frame,
+                                                         width=30, height=20,
+                                                         font=('Consolas', 8),
+                                                         bg='#2C3E50', fg='white')
+        self.performance_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
     def create_controls_panel(self, parent):
         """Panel de controles"""
@@ -406,6 +456,8 @@ class UNOIntelligentGUI:
                                bg='#E74C3C', fg='white',
                                command=self.declare_uno)
         self.uno_btn.pack(side=tk.LEFT, padx=5)
+        self.create_spectator_controls(controls_frame)
+        self.create_history_controls(controls_frame)
         # Estado de selección
         self.selection_label = tk.Label(controls_frame,
                                        text="Selecciona una carta para jugar",
@@ -413,129 +465,85 @@ class UNOIntelligentGUI:
                                        bg='#34495E', fg='#BDC3C7')
         self.selection_label.pack(pady=5)
 
-    def start_new_game(self):
-        """Inicia un nuevo juego"""
-        # Reiniciar variables
-        self.deck = UNODeck()
-        self.current_player = 0
-        self.game_direction = 1
-        self.selected_card_index = None
-        self.game_started = True
-        # Reiniciar probabilidades
-        self.init_probability_system()
-        # Repartir cartas
-        self.deal_initial_cards()
-        # Establecer carta inicial
-        self.set_initial_card()
-        # Actualizar interfaz
-        self.update_all_displays()
-        self.add_to_log("🎮 NUEVO JUEGO INICIADO")
-        self.add_to_log(f"Carta inicial: {self.current_card.to_display_string()}")
-        self.add_to_log("Orden: Jugador 1 → Máquina → Jugador 2")
-        # Elimina o comenta la siguiente línea:
-        # self.update_machine_hand_from_probabilities()
-        self.update_statistics()
-
-    def deal_initial_cards(self):
-        """Reparta las cartas iniciales"""
-        # Limpiar manos
-        self.player_hands = [[], [], []]
-        # Repartir 7 cartas a cada jugador
-        for _ in range(7):
-            for player in range(3):
-                card = self.deck.deal_card()
-                if card:
-                    self.player_hands[player].append(card)
-                    # Actualizar contadores globales para todos los jugadores
-                    self.update_card_counters_remove(card)
-    def set_initial_card(self):
-        """Establece la carta inicial del juego"""
-        while True:
-            card = self.deck.deal_card()
-            if card and card.card_type != 'wildcard':  # No empezar con comodín
-                self.current_card = card
-                self.deck.discarded.append(card)
-                break
-
-    def update_card_counters_remove(self, card):
-        """Actualiza los contadores globales al remover una carta"""
-        if card.card_type == 'number':
-            if card.value == 0:
-                self.card_counters['number_0'] = max(0, self.card_counters['number_0'] - 1)
-            else:
-                self.card_counters['numbers'][card.value] = max(0, self.card_counters['numbers'].get(card.value, 0) - 1)
-            if card.color:
-                self.card_counters['colors'][card.color] = max(0, self.card_counters['colors'].get(card.color, 0) - 1)
-        elif card.card_type == 'special':
-            self.card_counters['specials'][card.value] = max(0, self.card_counters['specials'].get(card.value, 0) - 1)
-            if card.color:
-                self.card_counters['colors'][card.color] = max(0, self.card_counters['colors'].get(card.color, 0) - 1)
-        elif card.card_type == 'wildcard':
-            self.card_counters['wildcards'][card.value] = max(0, self.card_counters['wildcards'].get(card.value, 0) - 1)
-    
-    def get_total_remaining_cards(self):
-        """Calcula cuántas cartas quedan en juego (mazo + manos)"""
-        return (
-            sum(self.card_counters['colors'].values()) +
-            self.card_counters['number_0'] +
-            sum(self.card_counters['numbers'].values()) +
-            sum(self.card_counters['specials'].values()) +
-            sum(self.card_counters['wildcards'].values())
-        )
-
-    def create_card_button(self, parent, card, index, player_id):
-        """Crea un widget para una carta (solo se ven las de la máquina y del jugador actual)"""
-        card_text = card.to_display_string()
-        color = card.get_color_hex()
-        card_count = len(self.player_hands[player_id])
-        # Configuración dinámica de tamaño
-        if card_count <= 7:
-            width, height = 12, 2
-            font_size = 8
-        elif card_count <= 10:
-            width, height = 10, 2
-            font_size = 7
-        elif card_count <= 15:
-            width, height = 8, 2
-            font_size = 6
-        else:
-            width, height = 6, 1
-            font_size = 6
-        if player_id == 1:
-            # Máquina: mostrar carta real
-            btn = tk.Label(parent,
-                           text=card_text,
-                           font=('Arial', font_size, 'bold'),
-                           bg=color,
-                           fg='white',
-                           width=width, height=height,
-                           relief=tk.RAISED, bd=2)
-        elif player_id == self.current_player:
-            # Jugador actual: mostrar carta real y hacer clickeable
-            btn = tk.Label(parent,
-                           text=card_text,
-                           font=('Arial', font_size, 'bold'),
-                           bg=color,
-                           fg='white',
-                           width=width, height=height,
-                           relief=tk.RAISED, bd=2)
-            btn.bind('<Button-1>', lambda e, idx=index, pid=player_id: self.select_card(idx, pid))
-        else:
-            # Jugador humano que NO está en turno: mostrar carta oculta
-            btn = tk.Label(parent,
-                           text='🂠',
-                           font=('Arial', font_size, 'bold'),
-                           bg='#7F8C8D',
-                           fg='white',
-                           width=width, height=height,
-                           relief=tk.RAISED, bd=2)
-        return btn
+    def create_history_controls(self, parent):
+        """Línea de tiempo de la partida: deshacer, rehacer y saltar a cualquier jugada"""
+        if self.history is None:
+            return
+        history_frame = tk.Frame(parent, bg='#34495E')
+        history_frame.pack(pady=(0, 5))
+        tk.Button(history_frame,
+                 text="⏪ Deshacer",
+                 font=('Arial', 9, 'bold'),
+                 command=self.undo_move).pack(side=tk.LEFT, padx=2)
+        tk.Button(history_frame,
+                 text="⏩ Rehacer",
+                 font=('Arial', 9, 'bold'),
+                 command=self.redo_move).pack(side=tk.LEFT, padx=2)
+        self.history_scale = tk.Scale(history_frame,
+                                     from_=0, to=0,
+                                     orient=tk.HORIZONTAL, length=400,
+                                     showvalue=False,
+                                     bg='#34495E', fg='white', highlightthickness=0,
+                                     command=self.on_history_scale)
+        self.history_scale.pack(side=tk.LEFT, padx=5)
+        self.history_label = tk.Label(history_frame,
+                                     text="Jugada 0/0",
+                                     font=('Arial', 9),
+                                     bg='#34495E', fg='white')
+        self.history_label.pack(side=tk.LEFT, padx=5)
+        self.root.bind('<Control-z>', lambda event: self.undo_move())
+        self.root.bind('<Control-y>', lambda event: self.redo_move())
+
+    def create_spectator_controls(self, parent):
+        """Controles del modo espectador: quién juega cada asiento, velocidad y pausa"""
+        spectator_frame = tk.Frame(parent, bg='#34495E')
+        spectator_frame.pack(pady=(0, 5))
+        self.seat_vars = {}
+        for player_id in range(3):
+            tk.Label(spectator_frame,
+                    text=f"{self.player_names[player_id]}:",
+                    font=('Arial', 9),
+                    bg='#34495E', fg='white').pack(side=tk.LEFT)
+            # La máquina no puede ser humana
+            modes = SEAT_MODES[1:] if player_id == 1 else SEAT_MODES
+            var = tk.StringVar(value='Máquina' if player_id == 1 else 'Humano')
+            tk.OptionMenu(spectator_frame, var, *modes,
+                          command=lambda _: self.apply_seat_modes()).pack(side=tk.LEFT, padx=(0, 8))
+            self.seat_vars[player_id] = var
+        tk.Label(spectator_frame,
+                text="Velocidad:",
+                font=('Arial', 9),
+                bg='#34495E', fg='white').pack(side=tk.LEFT)
+        self.speed_var = tk.StringVar(value='Tiempo real')
+        tk.OptionMenu(spectator_frame, self.speed_var, *SPEEDS,
+                      command=lambda _: self.change_speed()).pack(side=tk.LEFT, padx=(0, 8))
+        self.chain_games_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(spectator_frame,
+                      text="Encadenar partidas",
+                      variable=self.chain_games_var,
+                      font=('Arial', 9),
+                      bg='#34495E', fg='white', selectcolor='#2C3E50').pack(side=tk.LEFT, padx=(0, 8))
+        self.pause_btn = tk.Button(spectator_frame,
+                                  text="⏸️ Pausa",
+                                  font=('Arial', 9, 'bold'),
+                                  command=self.toggle_pause)
+        self.pause_btn.pack(side=tk.LEFT, padx=2)
+        tk.Button(spectator_frame,
+                 text="⏭️ Paso",
+                 font=('Arial', 9, 'bold'),
+                 command=self.step_turn).pack(side=tk.LEFT, padx=2)
+        self.spectator_label = tk.Label(spectator_frame,
+                                       text="",
+                                       font=('Arial', 9),
+                                       bg='#34495E', fg='#BDC3C7')
+        self.spectator_label.pack(side=tk.LEFT, padx=8)
 
     def select_card(self, index, player_id):
         """Selecciona una carta para jugar"""
-        if player_id != self.current_player or player_id == 1:
+        if player_id != self.current_player or self.is_auto_seat(player_id):
             return
         self.selected_card_index = index
+        self.hand_views[player_id].select(index)
         card = self.player_hands[player_id][index]
         # Verificar si es válida
         if self.is_valid_play(card):
@@ -545,30 +553,17 @@ class UNOIntelligentGUI:
             self.selection_label.config(text=f"Carta inválida: {card.to_display_string()}")
             self.play_card_btn.config(state=tk.DISABLED)
 
-    def is_valid_play(self, card):
-        """Verifica si una carta es válida para jugar"""
-        if card.card_type == 'wildcard':
-            return True
-        if card.color == self.current_card.color:
-            return True
-        if (isinstance(card.value, int) and isinstance(self.current_card.value, int) and 
-            card.value == self.current_card.value):
-            return True
-        if card.value == self.current_card.value:
-            return True
-        return False
-
     def play_selected_card(self):
         """Juega la carta seleccionada"""
         if (self.selected_card_index is None or 
-            self.current_player == 1 or 
+            self.is_auto_seat(self.current_player) or 
             self.selected_card_index >= len(self.player_hands[self.current_player])):
             return
         player_id = self.current_player
         card = self.player_hands[player_id][self.selected_card_index]
         if self.is_valid_play(card):
             # Remover carta de la mano
-            self.player_hands[player_id].pop(self.selected_card_index)
+            self.take_card(player_id, self.selected_card_index)
             # Jugar carta
             self.play_card(player_id, card)
             # Limpiar selección
@@ -576,396 +571,28 @@ class UNOIntelligentGUI:
             self.play_card_btn.config(state=tk.DISABLED)
             self.selection_label.config(text="Carta jugada exitosamente")
 
-    def play_card(self, player_id, card):
-        """Ejecuta la jugada de una carta"""
-        prev_color = self.current_card.color if self.current_card else None
-        prev_value = self.current_card.value if self.current_card else None
-        # Registrar jugada antes de actualizar la carta actual
-        self.registrar_jugada(player_id, card, prev_color, prev_value)
-        # Guarda la carta actual antes de actualizarla
-        if card.card_type != 'wildcard':
-            self.current_card = card
-        # Agregar al descarte
-        self.deck.discarded.append(card)
-        # Log de la jugada
-        self.add_to_log(f"{self.player_names[player_id]} juega: {card.to_display_string()}")
-        # Verificar victoria
-        if len(self.player_hands[player_id]) == 0:
-            # Penalización si no declaró UNO
-            if not self.uno_declarado.get(player_id, False):
-                self.add_to_log(f"❌ {self.player_names[player_id]} no declaró UNO. Penalización: +2 cartas")
-                for _ in range(2):
-                    penal_card = self.deck.deal_card()
-                    if penal_card:
-                        self.player_hands[player_id].append(penal_card)
-                self.update_all_displays()
-                self.uno_declarado[player_id] = False
-                return  # No termina el juego, sigue jugando
-            else:
-                self.uno_declarado[player_id] = False  # Reset
-                self.game_over(player_id)
-                return
-        # Verificar UNO
-        if len(self.player_hands[player_id]) == 1:
-            self.add_to_log(f"¡{self.player_names[player_id]} tiene UNO!")
-            if player_id == 1:
-                self.declare_uno()  # La máquina declara UNO automáticamente
-        # Efectos de cartas especiales
-        self.apply_card_effects(card, player_id)
-        # Actualizar probabilidades, pasando la carta anterior
-        self.update_probabilities_after_play(player_id, card, prev_color, prev_value)
-        # Avanzar turno
-        self.advance_turn()
-        # Actualizar interfaz
-        self.update_all_displays()
-        # Si el siguiente turno es de la máquina, programar su jugada
-        if self.current_player == 1:
-            self.root.after(1500, self.machine_play_turn)
-
-    def apply_card_effects(self, card, player_id):
-        """Aplica los efectos de las cartas especiales"""
-        if card.value == 'rev':  # Reversa
-            self.game_direction *= -1
-            self.add_to_log("🔄 Orden de juego invertido")
-        elif card.value == 's':  # Salta
-            self.current_player = (self.current_player + self.game_direction) % 3
-            self.add_to_log(f"⏭️ {self.player_names[self.current_player]} pierde su turno")
-        elif card.value == 'r2':  # Roba 2
-            next_player = (self.current_player + self.game_direction) % 3
-            for _ in range(2):
-                drawn_card = self.deck.deal_card()
-                if drawn_card:
-                    self.player_hands[next_player].append(drawn_card)
-            self.add_to_log(f"📥 {self.player_names[next_player]} roba 2 cartas y pierde turno")
-            self.current_player = (self.current_player + self.game_direction) % 3
-        elif card.value == 'r4':  # Roba 4
-            next_player = (self.current_player + self.game_direction) % 3
-            for _ in range(4):
-                drawn_card = self.deck.deal_card()
-                if drawn_card:
-                    self.player_hands[next_player].append(drawn_card)
-            self.add_to_log(f"📥 {self.player_names[next_player]} roba 4 cartas y pierde turno")
-            self.current_player = (self.current_player + self.game_direction) % 3
-
-    def advance_turn(self):
-        """Avanza al siguiente turno"""
-        self.current_player = (self.current_player + self.game_direction) % 3
-
-    def machine_play_turn(self):
-        """Ejecuta el turno de la máquina con IA"""
-        if self.current_player != 1:
-            return
-        self.add_to_log("🤖 Turno de la máquina...")
-        # Obtener cartas válidas
-        valid_cards = self.get_machine_valid_cards()
-        if not valid_cards:
-            # Debe robar
-            self.add_to_log("🤖 Máquina roba una carta")
-            drawn_card = self.deck.deal_card()
-            if drawn_card:
-                self.player_hands[1].append(drawn_card)
-                # Verificar si puede jugar la carta robada
-                if self.is_valid_play(drawn_card):
-                    self.add_to_log(f"🤖 Máquina juega carta robada: {drawn_card.to_display_string()}")
-                    self.player_hands[1].remove(drawn_card)
-                    self.play_card(1, drawn_card)
-                else:
-                    self.add_to_log("🤖 Máquina no puede jugar carta robada")
-                    self.advance_turn()
-                    self.update_all_displays()
-            return
-        # Seleccionar carta usando IA
-        selected_card_info = self.machine_select_card(valid_cards)
-        if selected_card_info:
-            index, card, reasoning = selected_card_info
-            # Mostrar razonamiento de IA
-            self.ai_decision_text.delete(1.0, tk.END)
-            self.ai_decision_text.insert(tk.END, reasoning)
-            # Jugar carta
-            self.player_hands[1].pop(index)
-            self.add_to_log(f"🤖 Máquina juega: {card.to_display_string()}")
-            self.play_card(1, card)
-
-    def get_machine_valid_cards(self):
-        """Obtiene cartas válidas para la máquina"""
-        valid_cards = []
-        for i, card in enumerate(self.player_hands[1]):
-            if self.is_valid_play(card):
-                valid_cards.append((i, card))
-        return valid_cards
-
-    def machine_select_card(self, valid_cards):
-        """IA para seleccionar carta (basado en PDF)"""
-        if not valid_cards:
-            return None
-        reasoning = "🧠 ANÁLISIS IA:\n"
-        # Estrategia 1: Jugador siguiente con pocas cartas
-        next_player = (1 + self.game_direction) % 3
-        next_player_cards = len(self.player_hands[next_player])
-        if next_player_cards <= 3:
-            reasoning += f"⚠️ {self.player_names[next_player]} tiene {next_player_cards} cartas!\n"
-            reasoning += "Prioridad: Cartas defensivas\n"
-            defensive_cards = []
-            for i, card in valid_cards:
-                if card.value in ['r2', 'r4', 's', 'rev']:
-                    defensive_cards.append((i, card))
-            if defensive_cards:
-                selected = random.choice(defensive_cards)
-                reasoning += f"✅ Seleccionada: {selected[1].to_display_string()}\n"
-                reasoning += "Razón: Carta defensiva"
-                return selected[0], selected[1], reasoning
-        # Estrategia 2: Selección por probabilidades
-        reasoning += "📊 Análisis probabilístico:\n"
-        # a. Cartas que coinciden en color
-        color_matches = []
-        for i, card in valid_cards:
-            if (card.color == self.current_card.color and 
-                card.value != self.current_card.value):
-                prob = self.get_probability_opponent_has_card(next_player, card)
-                color_matches.append((i, card, prob))
-                reasoning += f"{card.to_display_string()}: {prob:.2f}\n"
-        if color_matches:
-            # Ordenar por menor probabilidad
-            color_matches.sort(key=lambda x: x[2])
-            selected = color_matches[0]
-            reasoning += f"\n✅ Mejor opción por color: {selected[1].to_display_string()}"
-            return selected[0], selected[1], reasoning
-        # b. Cartas que coinciden en número
-        number_matches = []
-        for i, card in valid_cards:
-            if (isinstance(card.value, int) and isinstance(self.current_card.value, int) and
-                card.value == self.current_card.value and card.color != self.current_card.color):
-                prob = self.get_probability_opponent_has_card(next_player, card)
-                number_matches.append((i, card, prob))
-        if number_matches:
-            number_matches.sort(key=lambda x: x[2])
-            selected = number_matches[0]
-            reasoning += f"\n✅ Mejor opción por número: {selected[1].to_display_string()}"
-            return selected[0], selected[1], reasoning
-        # c. Comodines (última opción)
-        wildcard_matches = [(i, card) for i, card in valid_cards if card.card_type == 'wildcard']
-        if wildcard_matches:
-            selected = random.choice(wildcard_matches)
-            reasoning += f"\n✅ Usando comodín: {selected[1].to_display_string()}"
-            return selected[0], selected[1], reasoning
-        # Cualquier carta válida
-        selected = random.choice(valid_cards)
-        reasoning += f"\n✅ Carta aleatoria: {selected[1].to_display_string()}"
-        return selected[0], selected[1], reasoning
-
-    def get_probability_opponent_has_card(self, player_id, card):
-        """Calcula probabilidad de que oponente tenga carta similar"""
-        if player_id == 1:  # Máquina
-            return 0.0
-        prob = 0.0
-        count = 0
-        if card.card_type == 'number':
-            if card.color in self.probabilities[player_id]['colors']:
-                prob += self.probabilities[player_id]['colors'][card.color]
-                count += 1
-            if card.value in self.probabilities[player_id]['numbers']:
-                prob += self.probabilities[player_id]['numbers'][card.value]
-                count += 1
-        elif card.card_type == 'special':
-            if card.color in self.probabilities[player_id]['colors']:
-                prob += self.probabilities[player_id]['colors'][card.color]
-                count += 1
-            if card.value in self.probabilities[player_id]['specials']:
-                prob += self.probabilities[player_id]['specials'][card.value]
-                count += 1
-        elif card.card_type == 'wildcard':
-            if card.value in self.probabilities[player_id]['wildcards']:
-                prob += self.probabilities[player_id]['wildcards'][card.value]
-                count += 1
-        return prob / max(count, 1)
-
-    def update_probabilities_after_play(self, player_id, card, prev_color, prev_value):
-        """Actualiza probabilidades después de una jugada"""
-        if player_id == 1:  # No actualizar para la máquina
-            return
-        # Actualizar contadores globales
-        self.update_card_counters_remove(card)
-        # Calcular total de cartas restantes
-        total_remaining = (
-            sum(self.card_counters['colors'].values()) +
-            self.card_counters['number_0'] +
-            sum(self.card_counters['numbers'].values()) +
-            sum(self.card_counters['specials'].values()) +
-            sum(self.card_counters['wildcards'].values())
-        )
-        # Solo actualizar probabilidades para los oponentes humanos
-        opponents = [0, 2] if player_id != 1 else []
-        for target_player in opponents:
-            if target_player not in self.probabilities:
-                continue
-            # --- ACTUALIZAR SOLO LO AFECTADO POR LA CARTA JUGADA ---
-            if card.card_type == 'number':
-                # Actualizar color
-                if card.color:
-                    self.probabilities[target_player]['colors'][card.color] = (
-                        self.card_counters['colors'][card.color] / max(total_remaining, 1)
-                    )
-                # Actualizar número
-                if card.value == 0:
-                    self.probabilities[target_player]['numbers'][0] = (
-                        self.card_counters['number_0'] / max(total_remaining, 1)
-                    )
-                else:
-                    self.probabilities[target_player]['numbers'][card.value] = (
-                        self.card_counters['numbers'].get(card.value, 0) / max(total_remaining, 1)
-                    )
-            elif card.card_type == 'special':
-                # Actualizar color
-                if card.color:
-                    self.probabilities[target_player]['colors'][card.color] = (
-                        self.card_counters['colors'][card.color] / max(total_remaining, 1)
-                    )
-                # Actualizar especial
-                self.probabilities[target_player]['specials'][card.value] = (
-                    self.card_counters['specials'].get(card.value, 0) / max(total_remaining, 1)
-                )
-            elif card.card_type == 'wildcard':
-                # Actualizar comodín
-                self.probabilities[target_player]['wildcards'][card.value] = (
-                    self.card_counters['wildcards'].get(card.value, 0) / max(total_remaining, 1)
-                )
-            # --- CASOS ESPECIALES ---
-            # Caso 1: Misma carta que el mazo (color y número)
-            if card.card_type == 'number' and card.color == prev_color and card.value == prev_value:
-                pass  # Ya se actualizó globalmente
-            # Caso 2: Mismo color, diferente número
-            elif card.card_type == 'number' and card.color == prev_color:
-                pass  # No actualizar la probabilidad del número para los oponentes
-            # Caso 4: Comodín o Roba 4
-            elif card.card_type == 'wildcard':
-                self.probabilities[target_player]['colors'][prev_color] = 0.0
-                self.probabilities[target_player]['numbers'][prev_value] = 0.0
-            # Caso 5: Carta especial (+2, reversa, salta)
-            elif card.card_type == 'special':
-                self.probabilities[target_player]['numbers'][prev_value] = 0.0
-
-        # --- ACTUALIZAR PROPIA PROBABILIDAD SI JUGÓ MISMO NÚMERO, DIFERENTE COLOR ---
-        if card.card_type == 'number' and card.value == prev_value and card.color != prev_color:
-            self.probabilities[player_id]['colors'][prev_color] = 0.0
-        if card.card_type == 'number' and card.color == prev_color and card.value != prev_value:
-            self.probabilities[player_id]['numbers'][prev_value] = 0.0
-
-    def registrar_jugada(self, player_id, card, prev_color, prev_value):
-        # Guarda la jugada y las probabilidades de ambos jugadores humanos
-        jugada = {
-            'Partida': 'Actual',
-            'Tiró': self.player_names[player_id],
-            'Carta en juego': self.current_card.to_display_string() if self.current_card else '',
-            'Carta tirada': card.to_display_string(),
-        }
-        # Probabilidades de Jugador 1 y Jugador 2
-        for jugador in [0, 2]:
-            base = f'J{jugador+1}_'
-            probs = self.probabilities[jugador]
-            jugada[base+'ROJO'] = probs['colors']['r']*100
-            jugada[base+'VERDE'] = probs['colors']['v']*100
-            jugada[base+'AZUL'] = probs['colors']['a']*100
-            jugada[base+'AMARILLO'] = probs['colors']['am']*100
-            for n in range(10):
-                jugada[base+str(n)] = probs['numbers'][n]*100
-            jugada[base+'Comodín'] = probs['wildcards']['c']*100
-            jugada[base+'Come 2'] = probs['specials']['r2']*100
-            jugada[base+'Come 4'] = probs['wildcards']['r4']*100
-            jugada[base+'Salta'] = probs['specials']['s']*100
-            jugada[base+'Reversa'] = probs['specials']['rev']*100
-        self.jugada_stats.append(jugada)
-
-    def draw_card(self):
-        """Permite al jugador current_player robar una carta"""
-        if self.current_player == 1:  # No permitir robo manual para la máquina
-            return
-        drawn_card = self.deck.deal_card()
-        if drawn_card:
-            self.player_hands[self.current_player].append(drawn_card)
-            self.add_to_log(f"{self.player_names[self.current_player]} roba una carta")
-            # Actualizar probabilidades (no tiene cartas válidas)
-            self.update_probabilities_after_draw(self.current_player)
-            # Verificar si puede jugar la carta robada
-            if self.is_valid_play(drawn_card):
-                messagebox.showinfo("Carta Robada", 
-                    f"Robaste: {drawn_card.to_display_string()}\nJugarás esta carta automáticamente.")
-                self.player_hands[self.current_player].remove(drawn_card)
-
-                # Guardar color y valor de la carta previa (la que obligó a robar)
-                prev_color = self.current_card.color
-                prev_value = self.current_card.value
-                jugador_que_robo = self.current_player
-                otro_jugador = 0 if jugador_que_robo == 2 else 2
-
-                self.play_card(jugador_que_robo, drawn_card)
-
-                # Mantener probabilidades en 0 SOLO para el jugador que robó
-                self.probabilities[jugador_que_robo]['colors'][prev_color] = 0.0
-                self.probabilities[jugador_que_robo]['numbers'][prev_value] = 0.0
-                return
-
-        # No puede jugar, avanzar turno
-        self.advance_turn()
-        self.update_all_displays()
-        # Si el siguiente es la máquina, programar su turno
-        if self.current_player == 1:
-            self.root.after(1500, self.machine_play_turn)
-
-    def update_probabilities_after_draw(self, player_id):
-        """
-        Caso 6: Jugador roba del mazo porque no tiene cartas válidas
-        """
-        if player_id == 1:
+    def show_game_over(self, event):
+        """Muestra el ganador y el botón de exportación"""
+        winner_id = event.winner_id
+        if self.profiles is not None:
+            # Solo lo jugado por personas (no por políticas) amplía sus perfiles
+            self.profiles.learn(self, [p for p in self.human_seats if not self.is_auto_seat(p)])
+            self.profiles.save()
+        self.spectator_wins[winner_id] += 1
+        self.update_spectator_label()
+        if self.chain_games_var.get() and all(self.is_auto_seat(p) for p in range(3)):
+            # Partidas encadenadas: sin diálogo, empieza la siguiente
+            self._render_pending = True
+            self._restart_after_id = self.root.after(SPEEDS[self.speed_var.get()] or 1,
+                                                     self.start_chained_game)
             return
-        current_color = self.current_card.color
-        current_value = self.current_card.value
-        current_type = self.current_card.card_type
-
-        # Siempre baja a 0 el color y número actual
-        self.probabilities[player_id]['colors'][current_color] = 0.0
-        self.probabilities[player_id]['numbers'][current_value] = 0.0
-
-        # Para cada carta especial, baja el contador y actualiza la probabilidad
-        total_cards = (
-            sum(self.card_counters['colors'].values()) +
-            self.card_counters['number_0'] +
-            sum(self.card_counters['numbers'].values()) +
-            sum(self.card_counters['specials'].values()) +
-            sum(self.card_counters['wildcards'].values())
-        )
-        for special in self.special_cards:
-            # Baja el contador solo si hay cartas restantes
-            if self.card_counters['specials'][special] > 0:
-                self.card_counters['specials'][special] -= 1
-            self.probabilities[player_id]['specials'][special] = (
-                self.card_counters['specials'][special] / max(total_cards, 1)
-            )
-
-        # Si la carta actual es comodín, baja el contador y actualiza la probabilidad de comodines
-        if current_type == 'wildcard':
-            for wildcard in self.wildcards:
-                if self.card_counters['wildcards'][wildcard] > 0:
-                    self.card_counters['wildcards'][wildcard] -= 1
-                self.probabilities[player_id]['wildcards'][wildcard] = (
-                    self.card_counters['wildcards'][wildcard] / max(total_cards, 1)
-                )
-
-    def declare_uno(self):
-        """Declara UNO"""
-        player_id = self.current_player
-        if len(self.player_hands[player_id]) == 1:
-            self.add_to_log(f"🔔 {self.player_names[player_id]} declara UNO!")
-            self.uno_declarado[player_id] = True
-        else:
-            self.add_to_log(f"❌ {self.player_names[player_id]} declara UNO incorrectamente")
-
-    def game_over(self, winner_id):
-        """Termina el juego"""
-        self.game_started = False
-        self.add_to_log(f"🎉 ¡{self.player_names[winner_id]} ha ganado!")
+        if self._render_pending:
+            self.render_all_displays()
         messagebox.showinfo("¡Juego Terminado!", 
                           f"🎉 ¡{self.player_names[winner_id]} ha ganado la partida!")
-        # Mostrar botón para exportar estadísticas
+        # Mostrar botón para exportar estadísticas (uno solo, aunque no se haya usado el anterior)
+        if self.export_btn is not None:
+            self.export_btn.destroy()
         self.export_btn = tk.Button(self.root, text="📊 Exportar Estadísticas a Excel", command=self.exportar_estadisticas_excel, bg="#F1C40F", font=("Arial", 12, "bold"))
         self.export_btn.place(relx=0.5, rely=0.95, anchor=tk.CENTER)
 
@@ -979,13 +606,33 @@ class UNOIntelligentGUI:
             df.to_excel(file_path, index=False)
             messagebox.showinfo("Exportación exitosa", f"Estadísticas exportadas a:\n{file_path}")
             self.export_btn.destroy()
+            self.export_btn = None
 
     def update_all_displays(self):
-        """Actualiza todas las pantallas"""
+        """Actualiza todas las pantallas (a velocidad máxima, como mucho MAX_RENDER_FPS por segundo)"""
+        if self._running_batch and time.perf_counter() - self._last_render < 1.0 / MAX_RENDER_FPS:
+            self._render_pending = True
+            return
+        self.render_all_displays()
+
+    def render_all_displays(self):
+        """Dibuja el estado actual, incluido el log y la decisión retenidos entre cuadros"""
+        self._last_render = time.perf_counter()
+        self._render_pending = False
+        if self._log_buffer:
+            self.game_log_text.insert(tk.END, "".join(self._log_buffer))
+            self.trim_log()
+            self.game_log_text.see(tk.END)
+            self._log_buffer.clear()
+        if self._pending_reasoning is not None:
+            self.ai_decision_text.delete(1.0, tk.END)
+            self.ai_decision_text.insert(tk.END, self._pending_reasoning)
+            self._pending_reasoning = None
         self.update_current_card_display()
         self.update_player_displays()
         self.update_game_state_display()
         self.update_statistics()
+        self.update_history_controls()
 
     def update_current_card_display(self):
         """Actualiza la visualización de la carta actual"""
@@ -996,23 +643,18 @@ class UNOIntelligentGUI:
             )
 
     def update_player_displays(self):
-        """Actualiza las visualizaciones de los jugadores"""
+        """Actualiza las visualizaciones de los jugadores
+        (solo se ven las cartas de los asientos automáticos y del jugador actual)"""
         for player_id in range(3):
-            # Limpiar frame de cartas
-            for widget in self.player_card_frames[player_id].winfo_children():
-                widget.destroy()
-            # Actualizar contador de cartas
-            card_count = len(self.player_hands[player_id])
-            self.player_card_count_labels[player_id].config(text=f"Cartas: {card_count}")
-            # Crear botones de cartas
-            if player_id == 1:  # Máquina - mostrar cartas verticalmente
-                for i, card in enumerate(self.player_hands[player_id]):
-                    btn = self.create_card_button(self.player_card_frames[player_id], card, i, player_id)
-                    btn.pack(pady=2, fill=tk.X)
-            else:  # Jugadores humanos - mostrar horizontalmente
-                for i, card in enumerate(self.player_hands[player_id]):
-                    btn = self.create_card_button(self.player_card_frames[player_id], card, i, player_id)
-                    btn.pack(side=tk.LEFT, padx=2)
+            hand = self.player_hands[player_id]
+            self.player_card_count_labels[player_id].config(text=f"Cartas: {len(hand)}")
+            if self.is_auto_seat(player_id) or player_id == self.current_player:
+                faces = [card.face_id for card in hand]
+            else:
+                # Jugador humano que NO está en turno: cartas ocultas
+                faces = [HIDDEN_FACE] * len(hand)
+            selected = self.selected_card_index if player_id == self.current_player else None
+            self.hand_views[player_id].show(faces, selected)
 
     def update_game_state_display(self):
         """Actualiza el estado del juego"""
@@ -1027,6 +669,10 @@ class UNOIntelligentGUI:
             self.play_card_btn.config(state=tk.DISABLED)
             self.deck_button.config(state=tk.DISABLED)
             self.selection_label.config(text="🤖 Turno de la máquina...")
+        elif self.is_auto_seat(self.current_player):  # Asiento jugado por una política
+            self.play_card_btn.config(state=tk.DISABLED)
+            self.deck_button.config(state=tk.DISABLED)
+            self.selection_label.config(text=f"🤖 Turno de {current_name} (automático)...")
         else:  # Turno de jugador humano
             self.deck_button.config(state=tk.NORMAL)
             if self.selected_card_index is not None:
@@ -1045,7 +691,7 @@ class UNOIntelligentGUI:
         self.probability_text.delete(1.0, tk.END)
         self.probability_text.insert(tk.END, "📊 PROBABILIDADES ACTUALES\n")
         self.probability_text.insert(tk.END, "=" * 40 + "\n")
-        for player_id in [0, 2]:
+        for player_id in self.human_seats:
             player_name = self.player_names[player_id]
             card_count = len(self.player_hands[player_id])
             self.probability_text.insert(tk.END, f"{player_name} ({card_count} cartas):\n")
@@ -1119,19 +765,461 @@ class UNOIntelligentGUI:
         """Añade mensaje al log del juego"""
         timestamp = time.strftime("%H:%M:%S")
         log_message = f"[{timestamp}] {message}\n"
+        if self._running_batch:
+            # A velocidad máxima el log se escribe junto con el siguiente cuadro
+            self._log_buffer.append(log_message)
+            return
         self.game_log_text.insert(tk.END, log_message)
+        self.trim_log()
         self.game_log_text.see(tk.END)  # Scroll automático
 
+    def log_line_count(self):
+        return int(self.game_log_text.index('end-1c').split('.')[0])
+
+    def trim_log(self):
+        """Descarta las líneas más viejas del log por encima de MAX_LOG_LINES"""
+        excess = self.log_line_count() - MAX_LOG_LINES
+        if excess > 0:
+            self.game_log_text.delete('1.0', f'{excess + 1}.0')
+
+    def refresh_performance_panel(self):
+        """Actualiza la pestaña de rendimiento y se vuelve a programar"""
+        self.performance_text.delete(1.0, tk.END)
+        self.performance_text.insert(tk.END, "⏱️ TIEMPOS POR FASE\n")
+        self.performance_text.insert(tk.END, self.profiler.report() + "\n")
+        if self.profiler.cprofile_running:
+            self.performance_text.insert(tk.END, "\n🔴 Capturando cProfile...\n")
+        else:
+            report = self.profiler.cprofile_report()
+            if report:
+                self.performance_text.insert(tk.END, "\n" + report)
+        if self.memory.snapshots:
+            self.performance_text.insert(tk.END, "\n🧠 MEMORIA\n" + self.memory.report() + "\n")
+        self.root.after(PERF_REFRESH_MS, self.refresh_performance_panel)
+
+    def toggle_cprofile(self):
+        """Activa o detiene la captura de cProfile"""
+        if self.profiler.cprofile_running:
+            self.profiler.stop_cprofile()
+            self.cprofile_btn.config(text="cProfile: OFF")
+        else:
+            self.profiler.start_cprofile()
+            self.cprofile_btn.config(text="cProfile: ON")
+
+    def dump_performance(self):
+        """Guarda los tiempos por fase (y la captura de cProfile) en un archivo"""
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")], title="Guardar datos de rendimiento")
+        if file_path:
+            self.profiler.dump(file_path)
+            if self.memory.snapshots:
+                self.memory.dump(file_path + '.memoria.json')
+            messagebox.showinfo("Rendimiento", f"Datos de rendimiento guardados en:\n{file_path}")
+
+    def register_memory_counters(self):
+        """Subsistemas que pueden crecer durante una sesión larga"""
+        register = self.memory.register
+        register('jugadas registradas', lambda: len(self.jugada_stats))
+        register('instantáneas', lambda: len(self.decision_snapshots))
+        register('líneas de log', self.log_line_count)
+        register('log pendiente', lambda: len(self._log_buffer))
+        register('ítems de canvas', lambda: sum(len(view.canvas.find_all())
+                                                for view in self.hand_views.values()))
+        register('callbacks after', lambda: len(self.root.tk.splitlist(self.root.tk.call('after', 'info'))))
+        register('suscriptores', self.events.handler_count)
+        if self.history is not None:
+            register('jugadas en historial', lambda: len(self.history))
+        self.memory.register_widgets(self.root)
+
+    def toggle_memory_watch(self):
+        """Activa tracemalloc y las fotos de memoria al iniciar cada partida"""
+        if self.memory_watch:
+            self.memory_watch = False
+            self.memory.stop_tracing()
+            self.memory_btn.config(text="Memoria: OFF")
+        else:
+            self.memory_watch = True
+            self.memory.start_tracing()
+            self.memory_btn.config(text="Memoria: ON")
+            self.take_memory_snapshot()
+
+    def take_memory_snapshot(self):
+        self.memory.snapshot(f"partida {self.games_started} ({time.strftime('%H:%M:%S')})")
+
+    def log_event(self, event):
+        """Escribe en el log los eventos del motor"""
+        if isinstance(event, CardPlayed):
+            name = self.player_names[event.player_id]
+            if event.from_draw:
+                self.add_to_log(f"{name} juega carta robada: {event.card.to_display_string()}")
+            else:
+                self.add_to_log(f"{name} juega: {event.card.to_display_string()}")
+        elif isinstance(event, CardDrawn):
+            name = self.player_names[event.player_id]
+            if event.reason == 'robo':
+                self.add_to_log(f"{name} roba una carta")
+            elif event.reason == 'castigo':
+                self.add_to_log(f"❌ {name} no declaró UNO. Penalización: +{len(event.cards)} cartas")
+            else:
+                self.add_to_log(f"📥 {name} roba {len(event.cards)} cartas y pierde turno")
+        elif isinstance(event, TurnSkipped):
+            if event.reason == 's':
+                self.add_to_log(f"⏭️ {self.player_names[event.player_id]} pierde su turno")
+        elif isinstance(event, DirectionReversed):
+            self.add_to_log("🔄 Orden de juego invertido")
+        elif isinstance(event, GameOver):
+            self.add_to_log(f"🎉 ¡{self.player_names[event.winner_id]} ha ganado!")
+
+    def show_ai_decision(self, reasoning):
+        """Muestra el razonamiento de la IA"""
+        if self._running_batch:
+            self._pending_reasoning = reasoning
+            return
+        self.ai_decision_text.delete(1.0, tk.END)
+        self.ai_decision_text.insert(tk.END, reasoning)
+
+    def notify_drawn_card(self, card):
+        """Avisa que la carta robada se jugará automáticamente"""
+        if self.is_auto_seat(self.current_player):
+            return
+        messagebox.showinfo("Carta Robada",
+            f"Robaste: {card.to_display_string()}\nJugarás esta carta automáticamente.")
+
+    # ------------------------------------------------------------------
+    # Modo espectador
+    # ------------------------------------------------------------------
+    def is_auto_seat(self, player_id):
+        """True si el asiento lo juega la máquina o una política"""
+        return player_id == 1 or player_id in self.policies
+
+    def seat_policy(self, mode):
+        """Política para la opción elegida en un asiento (None = cascada de la máquina)"""
+        if mode == 'Máquina':
+            return self.configured_machine_policy
+        if mode == 'Heurística':
+            return heuristic_policy
+        return random_policy
+
+    def apply_seat_modes(self):
+        """Asigna a cada asiento la política elegida en los controles"""
+        for player_id, var in self.seat_vars.items():
+            mode = var.get()
+            if player_id == 1:
+                self.machine_policy = self.seat_policy(mode)
+            elif mode == 'Humano':
+                self.policies.pop(player_id, None)
+            else:
+                self.policies[player_id] = self.seat_policy(mode) or heuristic_policy
+        self.selected_card_index = None
+        self.update_all_displays()
+        self.schedule_next_turn()
+
+    def spectate(self, speed='Rápido'):
+        """Pone todos los asientos en automático y encadena partidas"""
+        for player_id, var in self.seat_vars.items():
+            if player_id != 1:
+                var.set('Heurística')
+        self.speed_var.set(speed)
+        self.chain_games_var.set(True)
+        self.apply_seat_modes()
+
+    def change_speed(self):
+        """Aplica la nueva velocidad desde el siguiente turno"""
+        self.cancel_auto_turn()
+        self.schedule_next_turn()
+
+    def update_spectator_label(self):
+        played = sum(self.spectator_wins.values())
+        wins = "  ".join(f"{self.player_names[p]}: {self.spectator_wins[p]}" for p in range(3))
+        self.spectator_label.config(text=f"Partidas: {played} | {wins}")
+
+    def schedule_next_turn(self):
+        """Programa el turno si el asiento actual es automático, según la velocidad elegida"""
+        if self._running_batch or self._auto_after_id is not None or self.paused:
+            return
+        if not self.game_started or not self.is_auto_seat(self.current_player):
+            return
+        delay = SPEEDS[self.speed_var.get()]
+        self._auto_after_id = self.root.after(delay or 1, self.run_auto_turns)
+
+    def cancel_auto_turn(self):
+        if self._auto_after_id is not None:
+            self.root.after_cancel(self._auto_after_id)
+            self._auto_after_id = None
+
+    def run_auto_turns(self):
+        """Juega un turno automático o, a velocidad máxima, todos los que quepan en
+        BATCH_BUDGET_S; la pantalla se redibuja como mucho MAX_RENDER_FPS veces por segundo"""
+        self._auto_after_id = None
+        if SPEEDS[self.speed_var.get()] is not None:
+            self.play_auto_turn()
+            return
+        self._running_batch = True
+        deadline = time.perf_counter() + BATCH_BUDGET_S
+        try:
+            while (not self.paused and self.game_started and self.is_auto_seat(self.current_player)
+                   and time.perf_counter() < deadline):
+                self.play_auto_turn()
+        finally:
+            self._running_batch = False
+        keep_running = self.game_started and self.is_auto_seat(self.current_player)
+        if self._render_pending and (not keep_running or self.paused or
+                                     time.perf_counter() - self._last_render >= 1.0 / MAX_RENDER_FPS):
+            self.render_all_displays()
+        self.schedule_next_turn()
+
+    def play_auto_turn(self):
+        if self.game_started and self.is_auto_seat(self.current_player):
+            self.play_turn()
+
+    def toggle_pause(self):
+        """Detiene o reanuda los turnos automáticos"""
+        self.paused = not self.paused
+        self.pause_btn.config(text="▶️ Continuar" if self.paused else "⏸️ Pausa")
+        if self.paused:
+            self.cancel_auto_turn()
+            if self._render_pending:
+                self.render_all_displays()
+        else:
+            self.schedule_next_turn()
+
+    def step_turn(self):
+        """Pausa y juega un solo turno automático para revisar la decisión"""
+        if not self.paused:
+            self.toggle_pause()
+        self.play_auto_turn()
+
+    def end_turn(self):
+        super().end_turn()
+        if not self._running_batch:
+            self.update_history_controls()
+
+    def update_history_controls(self):
+        if self.history is None:
+            return
+        total = len(self.history)
+        self.history_scale.config(to=total)
+        self.history_scale.set(self.history.position)
+        self.history_label.config(text=f"Jugada {self.history.position}/{total}")
+
+    def undo_move(self):
+        if self.history is not None and self.history.can_undo:
+            self.rewind_to(self.history.position - 1)
+
+    def redo_move(self):
+        if self.history is not None and self.history.can_redo:
+            self.rewind_to(self.history.position + 1)
+
+    def on_history_scale(self, value):
+        if int(float(value)) != self.history.position:
+            self.rewind_to(int(float(value)))
+
+    def rewind_to(self, position):
+        """Lleva la partida a otra jugada; los turnos automáticos quedan en pausa"""
+        self.cancel_auto_turn()
+        if self._restart_after_id is not None:
+            self.root.after_cancel(self._restart_after_id)
+            self._restart_after_id = None
+        if not self.paused:
+            self.toggle_pause()
+        self.history.seek(position)
+        self.selected_card_index = None
+        self.play_card_btn.config(state=tk.DISABLED)
+        self.add_to_log(f"⏪ Jugada {self.history.position} de {len(self.history)}")
+        self.render_all_displays()
+
+    def start_new_game(self):
+        """Inicia un nuevo juego y, si el primer asiento es automático, su turno"""
+        self.cancel_auto_turn()
+        if self._restart_after_id is not None:
+            self.root.after_cancel(self._restart_after_id)
+            self._restart_after_id = None
+        if self.export_btn is not None:
+            self.export_btn.destroy()
+            self.export_btn = None
+        super().start_new_game()
+        self.games_started += 1
+        if self.memory_watch:
+            self.take_memory_snapshot()
+        self.schedule_next_turn()
+
+    def start_chained_game(self):
+        self._restart_after_id = None
+        self.start_new_game()
+
     def run(self):
         """Ejecuta la aplicación"""
         self.root.mainloop()
 
 
+class UNORemoteGUI(UNOIntelligentGUI):
+    """Modo cliente: dibuja una mesa de UNOServer en lugar de jugar localmente.
+
+    Un hilo lee los mensajes del socket y los deja en una cola que Tk aplica
+    cada REMOTE_POLL_MS; las acciones del usuario se envían al servidor. Las
+    manos ajenas solo se conocen por su tamaño.
+    """
+
+    def __init__(self, address):
+        self.my_seat = None
+        self.inbox = queue.Queue()
+        if ':' in address:
+            host, port = address.rsplit(':', 1)
+            self.sock = socket.create_connection((host, int(port)))
+        else:
+            self.sock = socket.socket(socket.AF_UNIX)
+            self.sock.connect(address)
+        threading.Thread(target=self.read_socket, daemon=True).start()
+        # Sin observadores locales: probabilidades y contadores vienen del servidor
+        super().__init__(observers=(), history=False)
+        self.root.title(f"🎮 UNO - Mesa remota ({address})")
+        self.root.after(REMOTE_POLL_MS, self.poll_server)
+
+    def read_socket(self):
+        """Hilo lector: una línea JSON por mensaje"""
+        with self.sock.makefile('r', encoding='utf-8') as stream:
+            for line in stream:
+                self.inbox.put(json.loads(line))
+        self.inbox.put({'op': 'error', 'message': "El servidor cerró la conexión"})
+
+    def send(self, message):
+        self.sock.sendall(encode_message(message))
+
+    def poll_server(self):
+        try:
+            while True:
+                self.apply_message(self.inbox.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(REMOTE_POLL_MS, self.poll_server)
+
+    def apply_message(self, message):
+        op = message['op']
+        if op == 'joined':
+            self.my_seat = message['seat']
+            self.add_to_log(f"🌐 Mesa {message['table']}, asiento {message['seat']}")
+        elif op == 'event':
+            event = decode_event(message)
+            if isinstance(event, GameOver) and event.winner_id is None:
+                self.add_to_log("Partida terminada sin ganador")
+            else:
+                self.events.emit(event)
+        elif op == 'state':
+            self.apply_state(message)
+        elif op == 'error':
+            messagebox.showwarning("Servidor", message['message'])
+
+    def apply_state(self, state):
+        """Copia el estado recibido en los atributos que dibuja la interfaz"""
+        self.my_seat = state['seat']
+        self.game_started = state['started']
+        self.current_player = state['turn']
+        self.game_direction = state['direction']
+        if state['top'] is not None:
+            self.current_card = card_from_face(state['top'])
+        self.player_hands = [[card_from_face(face) for face in state['hand']] if seat == self.my_seat
+                             else [None] * size
+                             for seat, size in enumerate(state['sizes'])]
+        self.player_names = state['names']
+        self.card_counters = decode_counters(state['counters'])
+        for seat, vector in state['beliefs'].items():
+            for index, value in enumerate(vector):
+                self.beliefs.set(int(seat), index, value)
+        self.deck.cards = [None] * state['deck']
+        self.deck.discarded = [None] * state['discarded']
+        my_hand = self.player_hands[self.my_seat]
+        if (self.selected_card_index is not None and
+                (self.current_player != self.my_seat or self.selected_card_index >= len(my_hand))):
+            self.selected_card_index = None
+        self.update_all_displays()
+
+    def is_auto_seat(self, player_id):
+        return player_id != self.my_seat
+
+    def update_player_displays(self):
+        """Solo se ve la mano propia; las demás, boca abajo"""
+        for player_id, hand in enumerate(self.player_hands):
+            self.player_card_count_labels[player_id].config(text=f"Cartas: {len(hand)}")
+            if player_id == self.my_seat:
+                self.hand_views[player_id].show([card.face_id for card in hand], self.selected_card_index)
+            else:
+                self.hand_views[player_id].show([HIDDEN_FACE] * len(hand))
+
+    def start_new_game(self):
+        """Deja la mesa actual (si hay) y pide una nueva al servidor"""
+        if self.my_seat is not None:
+            self.send({'op': 'leave'})
+        self.my_seat = None
+        self.game_started = False
+        self.send({'op': 'join', 'players': 3, 'full': True})
+
+    def play_selected_card(self):
+        index = self.selected_card_index
+        if index is None or self.current_player != self.my_seat:
+            return
+        hand = self.player_hands[self.my_seat]
+        if index < len(hand) and self.is_valid_play(hand[index]):
+            self.send({'op': 'play', 'card': hand[index].face_id})
+            self.selected_card_index = None
+            self.play_card_btn.config(state=tk.DISABLED)
+            self.selection_label.config(text="Carta enviada")
+
+    def draw_card(self):
+        if self.game_started and self.current_player == self.my_seat:
+            self.send({'op': 'draw'})
+
+    def declare_uno(self):
+        if self.game_started and self.current_player == self.my_seat:
+            self.send({'op': 'uno'})
+            self.add_to_log("🔔 Declaras UNO!")
+
+    def schedule_next_turn(self):
+        """El servidor juega los turnos de los bots"""
+
+    def notify_drawn_card(self, card):
+        """El servidor juega automáticamente la carta robada si es válida"""
+
+
 # Función principal
 def main():
     """Función principal para ejecutar el juego"""
+    parser = argparse.ArgumentParser(description="UNO - Agente Inteligente")
+    parser.add_argument('--policy', default=None,
+                        help="Archivo de pesos (.npz) de UNOPolicy para la máquina")
+    parser.add_argument('--endgame', type=int, default=None, metavar='CARTAS',
+                        help="Usar el solucionador de finales con manos de hasta CARTAS cartas")
+    parser.add_argument('--connect', default=None, metavar='DIRECCIÓN',
+                        help="Modo cliente: jugar en una mesa de UNOServer (host:puerto o socket Unix)")
+    parser.add_argument('--spectate', choices=list(SPEEDS), default=None, metavar='VELOCIDAD',
+                        help="Todos los asientos automáticos, partidas encadenadas "
+                             "('Tiempo real', 'Rápido' o 'Máximo')")
+    parser.add_argument('--memory', action='store_true',
+                        help="Fotos de memoria (tracemalloc) al iniciar cada partida")
+    parser.add_argument('--profiles', default=None, metavar='DIRECTORIO',
+                        help="Perfiles de los jugadores (UNOProfiles): se usan y se amplían en cada partida")
+    parser.add_argument('--names', nargs='+', default=None, metavar='NOMBRE',
+                        help="Nombres de los jugadores humanos (identifican sus perfiles)")
+    args = parser.parse_args()
     try:
-        app = UNOIntelligentGUI()
+        machine_policy = None
+        if args.policy:
+            # Importación diferida: numpy solo es necesario con --policy
+            from UNOPolicy import LearnedPolicy
+            machine_policy = LearnedPolicy.load(args.policy)
+        if args.endgame:
+            from UNOEndgame import EndgamePolicy, EndgameSolver
+            machine_policy = EndgamePolicy(EndgameSolver(threshold=args.endgame), machine_policy)
+        if args.connect:
+            UNORemoteGUI(args.connect).run()
+            return
+        profiles = None
+        if args.profiles:
+            from UNOProfiles import ProfileStore
+            profiles = ProfileStore(args.profiles)
+        app = UNOIntelligentGUI(machine_policy=machine_policy, profiles=profiles, names=args.names)
+        if args.memory:
+            app.toggle_memory_watch()
+        if args.spectate:
+            app.spectate(args.spectate)
         app.run()
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,273 @@
+"""Verificación de invariantes del motor por muestreo.
+
+`InvariantChecker(rate).attach(game)` se suscribe a los eventos del motor y
+revisa una de cada 1/rate transiciones (jugadas y robos) y siempre el
+estado final de la partida:
+
+    conservación  mazo + manos + descartes (+ la carta en vuelo) = total de
+                  cartas, y cada cara aparece tantas veces como en el mazo
+    contadores    card_counters solo baja por las causas conocidas desde el
+                  primer evento de la partida: cada jugada de un humano (la
+                  máquina no se cuenta) y cada robo sin cartas válidas de un
+                  humano, que descuenta una especial de cada tipo (y un
+                  comodín de cada tipo si la carta en juego es comodín);
+                  antes del primer evento, no es menor que las cartas de ese
+                  tipo que siguen en el mazo sin repartir
+
+Con rate=0 no se suscribe a nada, así que el costo es nulo; el muestreo no
+usa el generador del juego, de modo que las partidas no cambian.
+
+Uso:
+    python UNOInvariants.py --games 100000 --rate 0.01 --workers 8
+"""
+import argparse
+import os
+import random
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from UNOEngine import (CARD_FACES, COUNTER_KEYS, MACHINE_SEAT, NUM_FACES, UNODeck, card_from_face,
+                       counter_value, play_headless_game)
+from UNOEvents import CardDrawn, CardPlayed, GameOver
+
+DEFAULT_RATE = 0.01
+MAX_EXAMPLES = 20  # Violaciones guardadas con detalle; el resto solo se cuentan
+
+COUNTER_INDEX = {key: i for i, key in enumerate(COUNTER_KEYS)}
+COUNTER_NAMES = ['/'.join(str(part) for part in key) for key in COUNTER_KEYS]
+
+
+def _face_counters(color, value):
+    if color is None:
+        return (COUNTER_INDEX['wildcards', value],)
+    if isinstance(value, int):
+        number = COUNTER_INDEX['number_0',] if value == 0 else COUNTER_INDEX['numbers', value]
+        return COUNTER_INDEX['colors', color], number
+    return COUNTER_INDEX['colors', color], COUNTER_INDEX['specials', value]
+
+
+# Entradas de card_counters a las que cuenta cada cara
+FACE_COUNTERS = [_face_counters(color, value) for color, value in CARD_FACES]
+# Lo que descuenta update_probabilities_after_draw en cada robo sin cartas válidas
+DRAW_COUNTERS = tuple(index for index, key in enumerate(COUNTER_KEYS) if key[0] == 'specials')
+WILD_DRAW_COUNTERS = tuple(index for index, key in enumerate(COUNTER_KEYS) if key[0] == 'wildcards')
+
+_composition_cache = {}
+
+
+def deck_composition(num_decks):
+    """Cuántas veces aparece cada cara en num_decks mazos completos"""
+    composition = _composition_cache.get(num_decks)
+    if composition is None:
+        composition = [0] * NUM_FACES
+        for card in UNODeck(random.Random(0), num_decks).cards:
+            composition[card.face_id] += 1
+        _composition_cache[num_decks] = composition
+    return composition
+
+
+class InvariantViolation(Exception):
+    """Un invariante del motor no se cumple (solo en modo estricto)"""
+
+
+class InvariantChecker:
+    """Revisa invariantes de una o varias partidas y acumula las violaciones"""
+
+    def __init__(self, rate=DEFAULT_RATE, strict=False, max_examples=MAX_EXAMPLES):
+        self.rate = rate
+        self.interval = max(1, round(1 / rate)) if rate > 0 else None
+        self.strict = strict
+        self.max_examples = max_examples
+        self.checks = 0
+        self.violations = Counter()  # tipo -> revisiones en las que falló
+        self.max_deficit = Counter()  # entrada de card_counters -> mayor faltante visto
+        self.examples = []
+        self._countdown = self.interval
+        # Partida en curso (su mazo), contadores al primer evento y, desde entonces, caras jugadas
+        # por humanos y robos de humanos sin cartas válidas [normales, con un comodín en juego]
+        self._deck = None
+        self._start = None
+        self._played = None
+        self._draws = None
+
+    def attach(self, game):
+        """Suscribe el verificador a los eventos de game (antes o después de start_new_game)"""
+        if self.interval is None:
+            return
+
+        def on_play(event):
+            if self._deck is not game.deck:
+                self._new_game(game)
+            self._sample(game, event.card)
+            # Se suscribe antes que las probabilidades: el descuento de esta jugada viene después
+            if event.player_id != MACHINE_SEAT:
+                self._played[event.card.face_id] += 1
+
+        def on_draw(event):
+            if self._deck is not game.deck:
+                self._new_game(game)
+            self._sample(game)
+            if event.reason == 'robo' and event.player_id != MACHINE_SEAT:
+                self._draws[game.current_card.card_type == 'wildcard'] += 1
+
+        def on_game_over(event):
+            # El final se revisa siempre: la carta ganadora ya está en el descarte
+            self.check(game)
+        game.events.subscribe(CardPlayed, on_play)
+        game.events.subscribe(CardDrawn, on_draw)
+        game.events.subscribe(GameOver, on_game_over)
+
+    def _new_game(self, game):
+        """Primer evento de una partida: los contadores todavía no tienen descuentos"""
+        self._deck = game.deck
+        self._start = [counter_value(game.card_counters, key) for key in COUNTER_KEYS]
+        self._played = [0] * NUM_FACES
+        self._draws = [0, 0]
+
+    def _spent(self):
+        """Descuentos conocidos de cada entrada de card_counters desde el primer evento"""
+        spent = [0] * len(COUNTER_KEYS)
+        for face, count in enumerate(self._played):
+            if count:
+                for index in FACE_COUNTERS[face]:
+                    spent[index] += count
+        draws, wild_draws = self._draws
+        for index in DRAW_COUNTERS:
+            spent[index] += draws + wild_draws
+        for index in WILD_DRAW_COUNTERS:
+            spent[index] += wild_draws
+        return spent
+
+    def _sample(self, game, in_flight=None):
+        self._countdown -= 1
+        if self._countdown <= 0:
+            self._countdown = self.interval
+            self.check(game, in_flight)
+
+    def check(self, game, in_flight=None):
+        """Revisa todos los invariantes ahora; in_flight es la carta que se está jugando.
+
+        Devuelve la lista de tipos de violación encontrados (vacía si todo está bien).
+        El detalle solo se arma si se va a guardar o a lanzar.
+        """
+        self.checks += 1
+        found = []
+        pile = [0] * NUM_FACES
+        for card in game.deck.cards:
+            pile[card.face_id] += 1
+        faces = pile[:]
+        for hand in game.player_hands:
+            for card in hand:
+                faces[card.face_id] += 1
+        for card in game.deck.discarded:
+            faces[card.face_id] += 1
+        if in_flight is not None:
+            faces[in_flight.face_id] += 1
+
+        total = sum(faces)
+        if total != game.total_cards:
+            found.append(('total', lambda: f"hay {total} cartas, deberían ser {game.total_cards}"))
+        expected = deck_composition(game.num_decks)
+        if faces != expected:
+            found.append(('caras', lambda: ', '.join(
+                f"{card_from_face(face).to_display_string()} {faces[face] - expected[face]:+d}"
+                for face in range(NUM_FACES) if faces[face] != expected[face])))
+
+        if self._deck is game.deck:
+            # Piso: lo que había al primer evento menos lo que el motor descuenta a propósito
+            floor = [start - spent for start, spent in zip(self._start, self._spent())]
+            reason = "se esperaba al menos"
+        else:
+            # Sin eventos de esta partida: lo que sigue en el mazo nadie lo vio todavía
+            floor = [0] * len(COUNTER_KEYS)
+            for face, count in enumerate(pile):
+                if count:
+                    for index in FACE_COUNTERS[face]:
+                        floor[index] += count
+            reason = "quedan en el mazo"
+        deficits = []
+        for index, key in enumerate(COUNTER_KEYS):
+            deficit = floor[index] - counter_value(game.card_counters, key)
+            if deficit > 0:
+                deficits.append((COUNTER_NAMES[index], floor[index], deficit))
+                if deficit > self.max_deficit[COUNTER_NAMES[index]]:
+                    self.max_deficit[COUNTER_NAMES[index]] = deficit
+        if deficits:
+            found.append(('contador', lambda: ', '.join(
+                f"{name}: contador {floor - deficit}, {reason} {floor}"
+                for name, floor, deficit in deficits)))
+
+        kinds = [kind for kind, _ in found]
+        self.violations.update(kinds)
+        if found and (self.strict or len(self.examples) < self.max_examples):
+            details = [(kind, detail()) for kind, detail in found]
+            for kind, detail in details[:self.max_examples - len(self.examples)]:
+                self.examples.append({'tipo': kind, 'turno': game.turn_count, 'detalle': detail})
+            if self.strict:
+                raise InvariantViolation('; '.join(detail for _, detail in details))
+        return kinds
+
+    def merge(self, other):
+        self.checks += other.checks
+        self.violations.update(other.violations)
+        for name, deficit in other.max_deficit.items():
+            self.max_deficit[name] = max(self.max_deficit[name], deficit)
+        self.examples.extend(other.examples[:max(self.max_examples - len(self.examples), 0)])
+        return self
+
+    def report(self):
+        lines = [f"{self.checks} revisiones"]
+        if not self.violations:
+            lines.append("✅ Sin violaciones")
+        for kind, count in sorted(self.violations.items()):
+            lines.append(f"❌ {kind}: {count} ({count / max(self.checks, 1):.2%} de las revisiones)")
+        for name, deficit in sorted(self.max_deficit.items(), key=lambda item: -item[1]):
+            lines.append(f"   {name:14s} faltan hasta {deficit}")
+        for example in self.examples:
+            lines.append(f"   turno {example['turno']:4d} [{example['tipo']}] {example['detalle']}")
+        return "\n".join(lines)
+
+
+def _check_worker(args):
+    seed_start, n_games, rate, num_players, num_decks = args
+    checker = InvariantChecker(rate)
+    for seed in range(seed_start, seed_start + n_games):
+        play_headless_game(seed=seed, invariants=checker, num_players=num_players, num_decks=num_decks)
+    return checker
+
+
+def check_games(n_games, rate=DEFAULT_RATE, workers=None, seed=0, num_players=3, num_decks=1):
+    """Simula n_games partidas en paralelo con el verificador y combina los resultados"""
+    workers = workers or os.cpu_count() or 1
+    per_worker = -(-n_games // workers)
+    jobs = [(seed + start, min(per_worker, n_games - start), rate, num_players, num_decks)
+            for start in range(0, n_games, per_worker)]
+    checker = InvariantChecker(rate)
+    if len(jobs) == 1:
+        return checker.merge(_check_worker(jobs[0]))
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        for worker_checker in pool.map(_check_worker, jobs):
+            checker.merge(worker_checker)
+    return checker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica invariantes del motor de UNO en simulaciones")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help="Fracción de transiciones revisadas (el final de partida siempre)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--players', type=int, default=3)
+    parser.add_argument('--decks', type=int, default=1)
+    args = parser.parse_args()
+    checker = check_games(args.games, args.rate, args.workers, args.seed, args.players, args.decks)
+    print(f"🔎 INVARIANTES: {args.games} partidas")
+    print(checker.report())
+    if checker.violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Instrumentación de memoria para sesiones largas de la interfaz.
+
+`MemoryMonitor.snapshot(etiqueta)` toma una foto bajo demanda con:
+
+    subsistemas  contadores registrados con register(nombre, función)
+    widgets      widgets de Tk vivos por clase (register_widgets(root))
+    tipos        objetos vivos por tipo según el recolector (gc)
+    tracemalloc  bytes y bloques por línea, si start_tracing() está activo
+                 (reducido a un diccionario; la foto completa no se guarda)
+
+`diff(anterior, nueva)` muestra qué creció entre dos fotos. La interfaz toma
+una al iniciar cada partida, así que el reporte dice qué sobrevive de una
+partida a la siguiente. Fuera de snapshot() no hay ningún costo, salvo el
+de tracemalloc mientras esté activo.
+"""
+import gc
+import json
+import time
+import tracemalloc
+from collections import Counter, deque
+
+DEFAULT_HISTORY = 2  # Fotos guardadas: las de los dos últimos inicios de partida
+DEFAULT_LIMIT = 12  # Filas por sección en los reportes
+TRACE_FRAMES = 1
+
+
+class MemorySnapshot:
+    __slots__ = ('label', 'timestamp', 'subsystems', 'widgets', 'types', 'traced', 'traced_size')
+
+    def __init__(self, label, subsystems, widgets, types, traced, traced_size):
+        self.label = label
+        self.timestamp = time.time()
+        self.subsystems = subsystems
+        self.widgets = widgets
+        self.types = types
+        self.traced = traced  # 'archivo:línea' -> (bytes, bloques), o None
+        self.traced_size = traced_size
+
+
+def traced_by_line():
+    """Asignaciones vivas por línea, sin las del propio tracemalloc ni las de este módulo"""
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    return {f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}": (stat.size, stat.count)
+            for stat in snapshot.statistics('lineno')}
+
+
+def count_widgets(root):
+    """Widgets vivos bajo root, por clase de Tk"""
+    counts = Counter()
+    pending = [root]
+    while pending:
+        widget = pending.pop()
+        counts[widget.winfo_class()] += 1
+        pending.extend(widget.winfo_children())
+    return counts
+
+
+def _deltas(old, new, limit):
+    """[(nombre, antes, después, cambio)] de lo que cambió, los mayores cambios primero"""
+    rows = [(name, old.get(name, 0), new.get(name, 0), new.get(name, 0) - old.get(name, 0))
+            for name in set(old) | set(new)]
+    rows = [row for row in rows if row[3]]
+    rows.sort(key=lambda row: -abs(row[3]))
+    return rows[:limit]
+
+
+class MemoryMonitor:
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.subsystems = {}
+        self.widget_root = None
+        self.snapshots = deque(maxlen=history)
+
+    def register(self, name, func):
+        """func() devuelve el tamaño actual del subsistema (elementos, líneas, ...)"""
+        self.subsystems[name] = func
+
+    def register_widgets(self, root):
+        self.widget_root = root
+
+    # ------------------------------------------------------------------
+    # tracemalloc
+    # ------------------------------------------------------------------
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, frames=TRACE_FRAMES):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop_tracing(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # ------------------------------------------------------------------
+    # Fotos y comparaciones
+    # ------------------------------------------------------------------
+    def snapshot(self, label):
+        """Toma una foto, la guarda en el historial y la devuelve"""
+        subsystems = {name: func() for name, func in self.subsystems.items()}
+        widgets = count_widgets(self.widget_root) if self.widget_root is not None else Counter()
+        # Censo antes de reducir tracemalloc, para no contar los objetos de la propia foto
+        gc.collect()
+        types = Counter(type(obj).__name__ for obj in gc.get_objects())
+        traced = traced_size = None
+        if tracemalloc.is_tracing():
+            traced_size = tracemalloc.get_traced_memory()[0]
+            traced = traced_by_line()
+        snapshot = MemorySnapshot(label, subsystems, widgets, types, traced, traced_size)
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    def diff(self, old, new, limit=DEFAULT_LIMIT):
+        result = {
+            'desde': old.label,
+            'hasta': new.label,
+            'segundos': new.timestamp - old.timestamp,
+            'subsistemas': _deltas(old.subsystems, new.subsystems, len(new.subsystems) + len(old.subsystems)),
+            'widgets': _deltas(old.widgets, new.widgets, limit),
+            'tipos': _deltas(old.types, new.types, limit),
+            'lineas': [],
+        }
+        if old.traced is not None and new.traced is not None:
+            result['bytes'] = new.traced_size - old.traced_size
+            changes = []
+            for where in set(old.traced) | set(new.traced):
+                old_size, old_count = old.traced.get(where, (0, 0))
+                new_size, new_count = new.traced.get(where, (0, 0))
+                if new_size != old_size:
+                    changes.append((where, new_size - old_size, new_count - old_count))
+            changes.sort(key=lambda change: -abs(change[1]))
+            result['lineas'] = changes[:limit]
+        return result
+
+    def last_diff(self, limit=DEFAULT_LIMIT):
+        """Comparación entre las dos fotos más recientes, o None si hay menos de dos"""
+        if len(self.snapshots) < 2:
+            return None
+        return self.diff(self.snapshots[-2], self.snapshots[-1], limit)
+
+    def report(self, limit=DEFAULT_LIMIT):
+        """Texto para el panel de rendimiento: estado actual y crecimiento entre fotos"""
+        if not self.snapshots:
+            return "(sin fotos de memoria)"
+        last = self.snapshots[-1]
+        lines = [f"Última foto: {last.label}"]
+        for name, value in last.subsystems.items():
+            lines.append(f"  {name:24s} {value:10d}")
+        lines.append(f"  {'widgets de Tk':24s} {sum(last.widgets.values()):10d}")
+        if last.traced_size is not None:
+            lines.append(f"  {'memoria trazada (KB)':24s} {last.traced_size / 1024:10.1f}")
+        diff = self.last_diff(limit)
+        if diff is None:
+            return "\n".join(lines)
+        lines.append(f"\nCambios {diff['desde']} → {diff['hasta']} ({diff['segundos']:.0f} s)")
+        for title, key in (('Subsistemas', 'subsistemas'), ('Widgets', 'widgets'), ('Tipos', 'tipos')):
+            if diff[key]:
+                lines.append(f"{title}:")
+                lines.extend(f"  {name:24s} {before:8d} → {after:8d} ({change:+d})"
+                             for name, before, after, change in diff[key])
+        if diff['lineas']:
+            lines.append(f"tracemalloc ({diff['bytes'] / 1024:+.1f} KB):")
+            lines.extend(f"  {size / 1024:+8.1f} KB {count:+6d}  {where}"
+                         for where, size, count in diff['lineas'])
+        return "\n".join(lines)
+
+    def dump(self, path, limit=DEFAULT_LIMIT):
+        """Guarda la última foto y la comparación con la anterior en JSON"""
+        last = self.snapshots[-1] if self.snapshots else None
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'foto': None if last is None else {
+                    'etiqueta': last.label,
+                    'subsistemas': last.subsystems,
+                    'widgets': dict(last.widgets),
+                    'tipos': dict(last.types.most_common(limit)),
+                    'bytes_trazados': last.traced_size,
+                },
+                'cambios': self.last_diff(limit),
+            }, f, indent=2)
@@ -0,0 +1,502 @@
+"""Métricas en vivo de simulaciones largas: contadores, medidores e histogramas.
+
+Cada proceso que simula tiene su propio GameMetrics con un MetricsRegistry
+que solo él toca (sin locks en el camino caliente). Cada PUBLISH_INTERVAL_S
+manda una copia acumulada de sus contadores e histogramas a la cola del
+proceso principal; el MetricsHub guarda la última copia de cada proceso y
+las suma al exponerlas, así que una copia perdida o repetida no altera los
+totales. Los medidores no se suman: los calcula el principal.
+
+    uno_games_total{result}           partidas terminadas ('win' o 'draw')
+    uno_moves_total                   turnos jugados
+    uno_reshuffles_total              rebarajados del descarte
+    uno_machine_branch_total{branch}  rama de machine_select_card que decidió
+                                      (defensive, color, number, wildcard, random)
+    uno_decision_seconds{policy}      latencia de cada decisión (histograma)
+    uno_games_per_second              medidores calculados en el proceso
+    uno_moves_per_second              principal sobre los últimos RATE_WINDOW_S
+
+Exposición (solo en 127.0.0.1):
+    http://127.0.0.1:PUERTO/metrics       formato de texto de Prometheus
+    http://127.0.0.1:PUERTO/metrics.json  lo mismo en JSON
+    --json / --metrics-json ruta          foto periódica a disco (escritura atómica)
+
+Uso:
+    python UNOMetrics.py --games 100000 --workers 8 --port 9100 --json metricas.json
+    python UNOFeatures.py --games 100000 --out datos/ --metrics-port 9100
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from UNOEngine import MACHINE_SEAT, heuristic_policy, play_headless_game
+
+PUBLISH_INTERVAL_S = 1.0  # Cada cuánto manda cada proceso su copia al principal
+JSON_INTERVAL_S = 10.0
+RATE_WINDOW_S = 10.0  # Ventana de games/sec y moves/sec
+# Límites superiores (segundos) de los buckets de latencia de decisión
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2, 1e-1)
+BRANCHES = ('defensive', 'color', 'number', 'wildcard', 'random')
+BRANCH_KEYS = {branch: (('branch', branch),) for branch in BRANCHES}
+SUMMABLE_KINDS = ('counter', 'histogram')  # Lo que cada proceso publica y el principal suma
+
+
+def _label_text(key, extra=()):
+    pairs = key + tuple(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Metric:
+    __slots__ = ('name', 'help', 'values')
+    kind = None
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}  # clave de etiquetas -> valor
+
+
+class MetricCounter(Metric):
+    __slots__ = ()
+    kind = 'counter'
+
+    def inc(self, amount=1, key=()):
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class MetricGauge(Metric):
+    __slots__ = ()
+    kind = 'gauge'
+
+    def set(self, value, key=()):
+        self.values[key] = value
+
+
+class MetricHistogram(Metric):
+    __slots__ = ('buckets',)
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+
+    def slot(self, key=()):
+        """Serie de key, creada en cero: conteos por bucket (el último es +Inf, sin acumular) y la suma"""
+        slot = self.values.get(key)
+        if slot is None:
+            slot = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        return slot
+
+    def observe(self, value, key=()):
+        slot = self.slot(key)
+        slot[bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+
+class MetricsRegistry:
+    """Métricas de un solo dueño; snapshot() las copia para mandarlas a otro proceso"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _get(self, cls, name, help_text, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help_text, *args)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"La métrica {name} ya existe como {metric.kind}")
+        return metric
+
+    def counter(self, name, help_text):
+        return self._get(MetricCounter, name, help_text)
+
+    def gauge(self, name, help_text):
+        return self._get(MetricGauge, name, help_text)
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        return self._get(MetricHistogram, name, help_text, buckets)
+
+    def snapshot(self, kinds=None):
+        """Copia con tipos simples: {nombre: (tipo, ayuda, buckets, {etiquetas: valor})};
+        kinds limita los tipos de métrica copiados"""
+        return {name: (metric.kind, metric.help, getattr(metric, 'buckets', None),
+                       {key: value[:] if isinstance(value, list) else value
+                        for key, value in metric.values.items()})
+                for name, metric in self.metrics.items() if kinds is None or metric.kind in kinds}
+
+
+def merge_snapshots(snapshots):
+    """Suma los contadores e histogramas de copias de varios procesos (los medidores se omiten)"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, (kind, help_text, buckets, values) in snapshot.items():
+            if kind not in SUMMABLE_KINDS:
+                continue
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = (kind, help_text, buckets, {})
+            totals = target[3]
+            for key, value in values.items():
+                current = totals.get(key)
+                if current is None:
+                    totals[key] = value[:] if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    totals[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    totals[key] = current + value
+    return merged
+
+
+def metric_total(snapshot, name):
+    """Suma de todas las series de un contador o medidor (0 si no existe)"""
+    entry = snapshot.get(name)
+    return sum(entry[3].values()) if entry is not None else 0
+
+
+def render_prometheus(snapshot):
+    """Formato de texto de Prometheus (versión 0.0.4)"""
+    lines = []
+    for name in sorted(snapshot):
+        kind, help_text, buckets, values = snapshot[name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key in sorted(values):
+            value = values[key]
+            if kind != 'histogram':
+                lines.append(f"{name}{_label_text(key)} {value:g}")
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets + (float('inf'),), value[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                lines.append(f"{name}_bucket{_label_text(key, (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(key)} {value[-1]:g}")
+            lines.append(f"{name}_count{_label_text(key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot_to_json(snapshot):
+    """Copia legible en JSON: etiquetas como texto y, por histograma, conteo, suma y media"""
+    result = {}
+    for name, (kind, help_text, buckets, values) in snapshot.items():
+        series = {}
+        for key, value in values.items():
+            label = _label_text(key) or 'total'
+            if kind == 'histogram':
+                count = sum(value[:-1])
+                series[label] = {
+                    'count': count,
+                    'sum': value[-1],
+                    'mean': value[-1] / count if count else 0.0,
+                    'buckets': dict(zip([f'{bound:g}' for bound in buckets] + ['+Inf'], value[:-1])),
+                }
+            else:
+                series[label] = value
+        result[name] = {'type': kind, 'help': help_text, 'values': series}
+    return result
+
+
+# ----------------------------------------------------------------------
+# Lado de los procesos que simulan
+# ----------------------------------------------------------------------
+class GameMetrics:
+    """Mide las partidas de este proceso; publish(copia) se llama cada `interval` segundos"""
+
+    def __init__(self, publish=None, interval=PUBLISH_INTERVAL_S):
+        self.registry = MetricsRegistry()
+        self.games = self.registry.counter('uno_games_total', "Partidas terminadas")
+        self.moves = self.registry.counter('uno_moves_total', "Turnos jugados")
+        self.reshuffles = self.registry.counter('uno_reshuffles_total', "Rebarajados del descarte")
+        self.branches = self.registry.counter('uno_machine_branch_total',
+                                              "Decisiones por rama de machine_select_card")
+        self.latency = self.registry.histogram('uno_decision_seconds', "Latencia de decisión por política")
+        self.publish = publish
+        self.interval = interval
+        self._next_publish = time.perf_counter() + interval
+        self._wrapped = {}  # política -> versión medida (se reutiliza entre partidas)
+
+    def timed(self, policy):
+        """Envuelve una política para medir su latencia y la rama de la heurística"""
+        wrapper = self._wrapped.get(policy)
+        if wrapper is not None:
+            return wrapper
+        key = (('policy', getattr(policy, '__name__', type(policy).__name__)),)
+        # Todo lo que se pueda, resuelto una vez: en cada decisión solo quedan sumas
+        slot = self.latency.slot(key)
+        buckets = self.latency.buckets
+        branches = self.branches.values
+        clock = time.perf_counter
+
+        def wrapper(game, player_id, valid_cards):
+            game.last_branch = None
+            start = clock()
+            result = policy(game, player_id, valid_cards)
+            elapsed = clock() - start
+            slot[bisect_left(buckets, elapsed)] += 1
+            slot[-1] += elapsed
+            branch = game.last_branch
+            if branch is not None:
+                branch_key = BRANCH_KEYS[branch]
+                branches[branch_key] = branches.get(branch_key, 0) + 1
+            return result
+        self._wrapped[policy] = wrapper
+        return wrapper
+
+    def attach(self, game):
+        """Mide las decisiones de todos los asientos de game (antes de start_new_game)"""
+        game.machine_policy = self.timed(game.machine_policy or heuristic_policy)
+        game.policies = {seat: self.timed(game.policies.get(seat, heuristic_policy))
+                         for seat in range(game.num_players) if seat != MACHINE_SEAT}
+
+    def game_finished(self, game):
+        self.games.inc(1, (('result', 'draw' if game.winner is None else 'win'),))
+        self.moves.inc(game.turn_count)
+        self.reshuffles.inc(game.deck.reshuffles)
+        if self.publish is not None and time.perf_counter() >= self._next_publish:
+            self.flush()
+
+    def flush(self):
+        """Publica ya la copia acumulada (al terminar el trabajo del proceso)"""
+        self._next_publish = time.perf_counter() + self.interval
+        if self.publish is not None:
+            self.publish(self.registry.snapshot(SUMMABLE_KINDS))
+
+
+_worker_metrics = None
+
+
+def worker_metrics():
+    """GameMetrics de este proceso, o None si la corrida no tiene métricas"""
+    return _worker_metrics
+
+
+def init_worker(metrics_queue):
+    """Inicializador de ProcessPoolExecutor: cada proceso publica en la cola del principal"""
+    global _worker_metrics
+    worker_id = os.getpid()
+    _worker_metrics = GameMetrics(lambda snapshot: metrics_queue.put((worker_id, snapshot)))
+
+
+# ----------------------------------------------------------------------
+# Lado del proceso principal
+# ----------------------------------------------------------------------
+class MetricsHub:
+    """Junta las copias de los procesos, calcula tasas y las expone por HTTP y JSON.
+
+    Uso:
+        with MetricsHub(port=9100, json_path='m.json') as hub:
+            ProcessPoolExecutor(..., **hub.pool_kwargs())
+    """
+
+    def __init__(self, port=None, json_path=None, json_interval=JSON_INTERVAL_S):
+        self.port = port
+        self.json_path = json_path
+        self.json_interval = json_interval
+        self.started = time.time()
+        self.latest = {}  # proceso -> última copia acumulada (se reemplaza, no se suma)
+        self.registry = MetricsRegistry()
+        self.games_rate = self.registry.gauge('uno_games_per_second', "Partidas por segundo")
+        self.moves_rate = self.registry.gauge('uno_moves_per_second', "Turnos por segundo")
+        self.workers = self.registry.gauge('uno_workers', "Procesos que han publicado métricas")
+        self.uptime = self.registry.gauge('uno_uptime_seconds', "Segundos desde el inicio de la corrida")
+        self._rates = deque()  # (tiempo, partidas, turnos)
+        self._queue = None
+        self._threads = []
+        self._stop = threading.Event()
+        self._server = None
+        self._previous_local = None
+
+    # ----- ciclo de vida -----
+    def start(self):
+        self._queue = multiprocessing.Queue()
+        collector = threading.Thread(target=self._collect, daemon=True)
+        collector.start()
+        self._threads.append(collector)
+        if self.port is not None:
+            hub = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path == '/metrics':
+                        body = render_prometheus(hub.aggregate()).encode('utf-8')
+                        content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                    elif self.path == '/metrics.json':
+                        body = json.dumps(hub.json_document(), indent=2).encode('utf-8')
+                        content_type = 'application/json'
+                    else:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header('Content-Type', content_type)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # Sin una línea por cada consulta de Prometheus
+            self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+            server = threading.Thread(target=self._server.serve_forever, daemon=True)
+            server.start()
+            self._threads.append(server)
+        return self
+
+    def close(self):
+        """Recoge lo que quede en la cola, escribe la última foto y apaga el servidor"""
+        global _worker_metrics
+        if self._previous_local is not None:
+            _worker_metrics.flush()
+            _worker_metrics = self._previous_local[0]
+            self._previous_local = None
+        self._stop.set()
+        for thread in self._threads[:1]:
+            thread.join()
+        self._drain()
+        self._update_rates()
+        if self.json_path:
+            self.write_json()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._queue.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def pool_kwargs(self):
+        """Argumentos para ProcessPoolExecutor: cada proceso publica en este hub"""
+        return {'initializer': init_worker, 'initargs': (self._queue,)}
+
+    def install_local(self):
+        """Mide también en este proceso (corridas de un solo proceso, sin pool)"""
+        global _worker_metrics
+        self._previous_local = (_worker_metrics,)
+        _worker_metrics = GameMetrics(lambda snapshot: self.update('principal', snapshot))
+        return _worker_metrics
+
+    # ----- recolección -----
+    def update(self, worker_id, snapshot):
+        self.latest[worker_id] = snapshot  # Reemplazo atómico: el servidor lee sin locks
+
+    def _drain(self):
+        while True:
+            try:
+                worker_id, snapshot = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self.update(worker_id, snapshot)
+
+    def _collect(self):
+        next_json = time.perf_counter() + self.json_interval
+        while not self._stop.is_set():
+            try:
+                worker_id, snapshot = self._queue.get(timeout=PUBLISH_INTERVAL_S / 2)
+                self.update(worker_id, snapshot)
+            except queue.Empty:
+                pass
+            self._update_rates()
+            if self.json_path and time.perf_counter() >= next_json:
+                next_json = time.perf_counter() + self.json_interval
+                self.write_json()
+
+    def _update_rates(self):
+        merged = merge_snapshots(list(self.latest.values()))
+        now = time.perf_counter()
+        self._rates.append((now, metric_total(merged, 'uno_games_total'), metric_total(merged, 'uno_moves_total')))
+        while len(self._rates) > 2 and now - self._rates[1][0] >= RATE_WINDOW_S:
+            self._rates.popleft()
+        first, last = self._rates[0], self._rates[-1]
+        elapsed = last[0] - first[0]
+        if elapsed > 0:
+            self.games_rate.set((last[1] - first[1]) / elapsed)
+            self.moves_rate.set((last[2] - first[2]) / elapsed)
+
+    # ----- exposición -----
+    def aggregate(self):
+        """Totales de todos los procesos más los medidores del principal"""
+        self.workers.set(len(self.latest))
+        self.uptime.set(time.time() - self.started)
+        merged = merge_snapshots(list(self.latest.values()))
+        merged.update(self.registry.snapshot())
+        return merged
+
+    def json_document(self):
+        return {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'metrics': snapshot_to_json(self.aggregate()),
+        }
+
+    def write_json(self):
+        temp_path = self.json_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.json_document(), f, indent=2)
+        os.replace(temp_path, self.json_path)
+
+
+def _simulate_worker(args):
+    seed_start, n_games, num_players = args
+    metrics = worker_metrics()
+    for seed in range(seed_start, seed_start + n_games):
+        play_headless_game(seed=seed, num_players=num_players, metrics=metrics)
+    if metrics is not None:
+        metrics.flush()
+    return n_games
+
+
+def simulate(n_games, workers=None, seed=0, num_players=3, hub=None):
+    """Juega n_games partidas sin interfaz repartidas entre procesos, midiendo en hub"""
+    workers = workers or os.cpu_count() or 1
+    per_worker = -(-n_games // workers)
+    jobs = [(seed + start, min(per_worker, n_games - start), num_players)
+            for start in range(0, n_games, per_worker)]
+    if len(jobs) == 1:
+        if hub is not None:
+            hub.install_local()
+        return _simulate_worker(jobs[0])
+    pool_kwargs = hub.pool_kwargs() if hub is not None else {}
+    with ProcessPoolExecutor(max_workers=len(jobs), **pool_kwargs) as pool:
+        return sum(pool.map(_simulate_worker, jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula partidas de UNO exponiendo métricas en vivo")
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--players', type=int, default=3)
+    parser.add_argument('--port', type=int, default=None, help="Puerto local para /metrics")
+    parser.add_argument('--json', default=None, help="Foto periódica de las métricas en JSON")
+    parser.add_argument('--json-interval', type=float, default=JSON_INTERVAL_S)
+    args = parser.parse_args()
+    if args.port is not None:
+        print(f"📈 Métricas en http://127.0.0.1:{args.port}/metrics")
+    start = time.perf_counter()
+    with MetricsHub(args.port, args.json, args.json_interval) as hub:
+        simulate(args.games, args.workers, args.seed, args.players, hub)
+    elapsed = time.perf_counter() - start
+    totals = hub.aggregate()
+    games = metric_total(totals, 'uno_games_total')
+    moves = metric_total(totals, 'uno_moves_total')
+    print(f"{games} partidas, {moves} turnos en {elapsed:.1f} s "
+          f"({games / elapsed:.0f} partidas/s, {moves / elapsed:.0f} turnos/s)")
+    branches = totals.get('uno_machine_branch_total')
+    if branches:
+        decisions = sum(branches[3].values())
+        for key, count in sorted(branches[3].items(), key=lambda item: -item[1]):
+            print(f"  {dict(key)['branch']:10s} {count / decisions:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
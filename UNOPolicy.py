@@ -0,0 +1,238 @@
+"""Política aprendida que puntúa todas las jugadas válidas con un modelo pequeño.
+
+El modelo es lineal (logístico) o un MLP de una capa oculta en numpy puro:
+una sola multiplicación de matrices produce un puntaje por cada cara de
+carta (54) y se elige la mejor entre las cartas válidas. Varias partidas
+se pueden evaluar a la vez pasando una matriz de estados.
+
+Uso:
+    python UNOPolicy.py train --data datos/ --out politica.npz --hidden 32
+    python UNOPolicy.py eval --weights politica.npz --games 1000
+"""
+import argparse
+
+import numpy as np
+
+from UNOEngine import MAX_TURNS, NUM_FACES, UNOGameEngine
+from UNOFeatures import FEATURE_VERSION, FEATURE_WIDTH, UNODataset, encode_snapshot
+
+POLICY_FORMAT = 'uno-policy'
+POLICY_VERSION = 1
+
+
+class UNOPolicyModel:
+    """Pesos normalizados + capas (W, b); la última capa da un puntaje por cara"""
+
+    def __init__(self, layers, mean, std):
+        self.layers = [(np.asarray(W, dtype=np.float32), np.asarray(b, dtype=np.float32))
+                       for W, b in layers]
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.inv_std = (1.0 / np.asarray(std, dtype=np.float32)).astype(np.float32)
+
+    @classmethod
+    def initialize(cls, mean, std, hidden=0, seed=0):
+        rng = np.random.default_rng(seed)
+        sizes = [FEATURE_WIDTH] + ([hidden] if hidden else []) + [NUM_FACES]
+        layers = []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            W = rng.normal(0.0, np.sqrt(2.0 / fan_in), size=(fan_in, fan_out))
+            layers.append((W, np.zeros(fan_out)))
+        return cls(layers, mean, std)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if str(data['format']) != POLICY_FORMAT:
+                raise ValueError(f"{path} no es un archivo de pesos de política")
+            if int(data['version']) != POLICY_VERSION:
+                raise ValueError(f"Versión de pesos {int(data['version'])} no soportada")
+            if int(data['feature_version']) != FEATURE_VERSION:
+                raise ValueError(f"Los pesos usan la versión de características "
+                                 f"{int(data['feature_version'])}, se esperaba {FEATURE_VERSION}")
+            num_layers = int(data['num_layers'])
+            layers = [(data[f'W{k}'], data[f'b{k}']) for k in range(num_layers)]
+            return cls(layers, data['mean'], 1.0 / data['inv_std'])
+
+    def save(self, path):
+        arrays = {f'W{k}': W for k, (W, _) in enumerate(self.layers)}
+        arrays.update({f'b{k}': b for k, (_, b) in enumerate(self.layers)})
+        np.savez(path, format=POLICY_FORMAT, version=POLICY_VERSION,
+                 feature_version=FEATURE_VERSION, num_layers=len(self.layers),
+                 mean=self.mean, inv_std=self.inv_std, **arrays)
+
+    def forward(self, features):
+        """Devuelve (puntajes, activaciones) para una matriz (partidas, FEATURE_WIDTH)"""
+        h = (features - self.mean) * self.inv_std
+        activations = [h]
+        for W, b in self.layers[:-1]:
+            h = np.maximum(h @ W + b, 0.0)
+            activations.append(h)
+        W, b = self.layers[-1]
+        return h @ W + b, activations
+
+    def scores(self, features):
+        return self.forward(features)[0]
+
+    def select(self, features, legal):
+        """Mejor cara válida por fila (-1 si la fila no tiene cartas válidas)"""
+        scores = np.where(legal.astype(bool), self.scores(features), -np.inf)
+        choice = scores.argmax(axis=1)
+        choice[~legal.any(axis=1)] = -1
+        return choice
+
+
+class LearnedPolicy:
+    """Política compatible con UNOGameEngine.policies y machine_policy"""
+
+    def __init__(self, model):
+        self.model = model
+        self._features = np.zeros((1, FEATURE_WIDTH), dtype=np.float32)
+        self._legal = np.zeros((1, NUM_FACES), dtype=np.uint8)
+
+    @classmethod
+    def load(cls, path):
+        return cls(UNOPolicyModel.load(path))
+
+    def __call__(self, game, player_id, valid_cards):
+        encode_snapshot(game.snapshot_state(player_id), self._features[0], self._legal[0])
+        scores = self.model.scores(self._features)[0]
+        ranked = sorted(valid_cards, key=lambda item: scores[item[1].face_id], reverse=True)
+        index, card = ranked[0]
+        reasoning = "🧠 POLÍTICA APRENDIDA:\n"
+        for _, candidate in ranked[:5]:
+            reasoning += f"{candidate.to_display_string()}: {scores[candidate.face_id]:.2f}\n"
+        reasoning += f"\n✅ Mejor puntaje: {card.to_display_string()}"
+        return index, card, reasoning
+
+
+def _choice_policy(choices):
+    """Política que juega la cara ya decidida en lote para esa partida"""
+    def policy(game, player_id, valid_cards):
+        face_id = choices[id(game)]
+        for index, card in valid_cards:
+            if card.face_id == face_id:
+                return index, card, "✅ Decisión en lote"
+        return valid_cards[0][0], valid_cards[0][1], "✅ Decisión en lote"
+    return policy
+
+
+def play_lockstep_games(model, seeds, seats=(1,), max_turns=MAX_TURNS):
+    """Juega muchas partidas a la vez: en cada paso, una multiplicación de matrices
+    decide por todas las partidas cuyo turno es de un asiento con la política aprendida"""
+    choices = {}
+    policy = _choice_policy(choices)
+    games = []
+    for seed in seeds:
+        game = UNOGameEngine(seed=seed, policies={seat: policy for seat in seats if seat != 1},
+                             machine_policy=policy if 1 in seats else None, observers=('beliefs',))
+        game.start_new_game()
+        games.append(game)
+    features = np.zeros((len(games), FEATURE_WIDTH), dtype=np.float32)
+    legal = np.zeros((len(games), NUM_FACES), dtype=np.uint8)
+    live = [game for game in games if game.game_started]
+    while live:
+        pending = [game for game in live if game.current_player in seats]
+        for row, game in enumerate(pending):
+            encode_snapshot(game.snapshot_state(game.current_player), features[row], legal[row])
+        if pending:
+            selected = model.select(features[:len(pending)], legal[:len(pending)])
+            for game, face_id in zip(pending, selected):
+                choices[id(game)] = int(face_id)
+        for game in live:
+            game.play_turn()
+        live = [game for game in live if game.game_started and game.turn_count < max_turns]
+    return [game.winner for game in games]
+
+
+def feature_statistics(dataset):
+    """Media y desviación estándar por columna, en una pasada por bloques"""
+    total = np.zeros(FEATURE_WIDTH, dtype=np.float64)
+    total_sq = np.zeros(FEATURE_WIDTH, dtype=np.float64)
+    rows = 0
+    for features, _, _ in dataset.iter_batches():
+        total += features.sum(axis=0, dtype=np.float64)
+        total_sq += np.square(features, dtype=np.float64).sum(axis=0)
+        rows += len(features)
+    mean = total / max(rows, 1)
+    std = np.sqrt(np.maximum(total_sq / max(rows, 1) - mean ** 2, 0.0))
+    return mean, np.where(std > 1e-6, std, 1.0)
+
+
+def train_policy(dataset, hidden=0, epochs=3, batch_size=1024, lr=1e-3, seed=0):
+    """Entrena por entropía cruzada (softmax sobre las cartas válidas) con Adam"""
+    mean, std = feature_statistics(dataset)
+    model = UNOPolicyModel.initialize(mean, std, hidden, seed)
+    params = [array for layer in model.layers for array in layer]
+    moments = [(np.zeros_like(p), np.zeros_like(p)) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+    for epoch in range(epochs):
+        total_loss = 0.0
+        rows = 0
+        for features, actions, legal in dataset.iter_batches(batch_size):
+            mask = legal.astype(bool)
+            keep = actions >= 0
+            features, actions, mask = features[keep], actions[keep], mask[keep]
+            if not len(actions):
+                continue
+            scores, activations = model.forward(features)
+            scores = np.where(mask, scores, -np.inf)
+            scores -= scores.max(axis=1, keepdims=True)
+            probs = np.exp(scores)
+            probs /= probs.sum(axis=1, keepdims=True)
+            picked = np.arange(len(actions))
+            total_loss -= np.log(probs[picked, actions] + 1e-12).sum()
+            rows += len(actions)
+            # Retropropagación
+            grad = probs
+            grad[picked, actions] -= 1.0
+            grad /= len(actions)
+            grads = []
+            for k in range(len(model.layers) - 1, -1, -1):
+                W, _ = model.layers[k]
+                h = activations[k]
+                grads.append((h.T @ grad, grad.sum(axis=0)))
+                if k:
+                    grad = (grad @ W.T) * (h > 0)
+            grads = [g for layer in reversed(grads) for g in layer]
+            step += 1
+            for p, g, (m, v) in zip(params, grads, moments):
+                m *= beta1
+                m += (1 - beta1) * g
+                v *= beta2
+                v += (1 - beta2) * g * g
+                m_hat = m / (1 - beta1 ** step)
+                v_hat = v / (1 - beta2 ** step)
+                p -= (lr * m_hat / (np.sqrt(v_hat) + eps)).astype(p.dtype)
+        print(f"Época {epoch + 1}/{epochs}: pérdida {total_loss / max(rows, 1):.4f}")
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Política aprendida para la máquina de UNO")
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help="Entrena con datos de UNOFeatures")
+    train.add_argument('--data', required=True)
+    train.add_argument('--out', required=True)
+    train.add_argument('--hidden', type=int, default=0, help="Neuronas ocultas (0 = lineal)")
+    train.add_argument('--epochs', type=int, default=3)
+    train.add_argument('--lr', type=float, default=1e-3)
+    evaluate = sub.add_parser('eval', help="Tasa de victorias de la máquina con la política")
+    evaluate.add_argument('--weights', required=True)
+    evaluate.add_argument('--games', type=int, default=1000)
+    evaluate.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.command == 'train':
+        model = train_policy(UNODataset(args.data), args.hidden, args.epochs, lr=args.lr)
+        model.save(args.out)
+        print(f"Pesos guardados en {args.out}")
+    else:
+        model = UNOPolicyModel.load(args.weights)
+        winners = play_lockstep_games(model, range(args.seed, args.seed + args.games))
+        wins = sum(1 for winner in winners if winner == 1)
+        print(f"Máquina con política aprendida: {wins}/{args.games} victorias "
+              f"({wins / max(args.games, 1):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Temporizadores por fase del motor, la IA y la interfaz.
+
+`PhaseProfiler.instrument(obj, fases)` envuelve métodos de una instancia
+(solo de esa instancia, la clase no cambia) con un temporizador. Si no se
+instrumenta nada, no hay ningún costo. Las llamadas anidadas de la misma
+fase se miden una sola vez (la más externa).
+
+Por fase se guardan el total, el máximo y una ventana de las últimas
+muestras para calcular p50/p95. También se puede activar cProfile y
+volcar todo a archivo.
+"""
+import cProfile
+import functools
+import io
+import json
+import pstats
+import time
+from collections import deque
+
+DEFAULT_WINDOW = 2000  # Muestras recientes por fase para los percentiles
+
+ENGINE_PHASES = {
+    'motor': ('play_card', 'draw_card', 'machine_play_turn'),
+    'ia': ('machine_select_card',),
+    'probabilidades': ('update_probabilities_after_play', 'update_probabilities_after_draw'),
+    'registro': ('registrar_jugada',),
+}
+GUI_PHASES = {
+    'render_total': ('render_all_displays',),
+    'render_jugadores': ('update_player_displays',),
+    'render_estadisticas': ('update_statistics',),
+    'log': ('add_to_log',),
+}
+
+
+class PhaseStats:
+    __slots__ = ('count', 'total', 'max', 'samples', 'depth')
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=window)
+        self.depth = 0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentile(self, fraction):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class PhaseProfiler:
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.phases = {}
+        self._cprofile = None
+        self._cprofile_stats = None
+
+    def _stats(self, phase):
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats(self.window)
+        return stats
+
+    def wrap(self, phase, func):
+        """Devuelve func medida dentro de phase"""
+        stats = self._stats(phase)
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if stats.depth:
+                return func(*args, **kwargs)
+            stats.depth += 1
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.depth -= 1
+                stats.add(perf_counter() - start)
+        return timed
+
+    def instrument(self, obj, phases):
+        """Envuelve los métodos de obj según {fase: (nombres de método, ...)}"""
+        for phase, names in phases.items():
+            for name in names:
+                setattr(obj, name, self.wrap(phase, getattr(obj, name)))
+
+    def reset(self):
+        for stats in self.phases.values():
+            stats.count = 0
+            stats.total = 0.0
+            stats.max = 0.0
+            stats.samples.clear()
+
+    def summary(self):
+        return {
+            phase: {
+                'count': stats.count,
+                'total_ms': stats.total * 1000,
+                'p50_ms': stats.percentile(0.50) * 1000,
+                'p95_ms': stats.percentile(0.95) * 1000,
+                'max_ms': stats.max * 1000,
+            }
+            for phase, stats in self.phases.items()
+        }
+
+    def report(self):
+        """Tabla de texto para el panel de rendimiento"""
+        lines = [f"{'Fase':20s} {'n':>6s} {'p50':>8s} {'p95':>8s} {'máx':>8s} {'total':>9s}"]
+        for phase, s in sorted(self.summary().items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{phase:20s} {s['count']:6d} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} "
+                         f"{s['max_ms']:8.2f} {s['total_ms']:9.1f}")
+        lines.append("(tiempos en ms)")
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # cProfile opcional
+    # ------------------------------------------------------------------
+    @property
+    def cprofile_running(self):
+        return self._cprofile is not None
+
+    def start_cprofile(self):
+        if self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop_cprofile(self):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile_stats = pstats.Stats(self._cprofile)
+            self._cprofile = None
+
+    def cprofile_report(self, limit=25):
+        if self._cprofile_stats is None:
+            return ""
+        out = io.StringIO()
+        self._cprofile_stats.stream = out
+        self._cprofile_stats.sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, path):
+        """Guarda el resumen en JSON; si hubo captura de cProfile, también path + '.prof'"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'phases': self.summary()}, f, indent=2)
+        if self._cprofile_stats is not None:
+            self._cprofile_stats.dump_stats(path + '.prof')
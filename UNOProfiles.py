@@ -0,0 +1,351 @@
+"""Perfiles por jugador aprendidos de partidas grabadas.
+
+Cada jugador (por nombre) acumula contadores de sus partidas: en cada
+decisión de la mesa, para cada entrada del modelo (colores, números,
+especiales y comodines), si tenía esa carta en la mano. Su frecuencia,
+suavizada hacia la de todos los perfiles, dividida entre la de todos los
+perfiles es un factor por entrada que multiplica las probabilidades
+iniciales de siempre: se quedan en la escala de los contadores (la misma
+que tendrán después de la primera actualización) y a quien se guarda los
+comodines se le asigna más probabilidad de tenerlos desde el primer turno.
+También se cuenta cuántas veces se guardó un comodín o una carta de acción
+pudiendo jugar otra.
+
+Los perfiles viven en un directorio:
+
+    profiles.npy    float64 (jugadores, PROFILE_WIDTH)  contadores
+    manifest.json   nombres en el orden de las filas
+
+Se abren con mmap la primera vez que una partida pide un perfil y el
+factor de cada jugador se calcula una sola vez; después solo se siembran las
+probabilidades al empezar cada partida, sin costo por jugada. Los nombres
+nuevos se añaden al final, así que un corte entre escribir profiles.npy y
+manifest.json deja perfiles válidos.
+
+Uso:
+    python UNOProfiles.py learn --out perfiles/ --games 2000 --player Ana=random --player Beto=heuristic
+    python UNOProfiles.py show --data perfiles/
+    python UNOProfiles.py evaluate --data perfiles/ --games 500 --seed 1000000 --player Ana=random ...
+    python UNOInterface.py --profiles perfiles/
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from UNOCalibration import BELIEF_WIDTH, LABELS, CalibrationStats, snapshot_rows
+from UNOCheckpoint import atomic_write_json, load_json
+from UNOEngine import CARD_FACES, MACHINE_SEAT, MAX_TURNS, UNOGameEngine, face_is_legal
+
+PROFILE_FORMAT = 'uno-profiles'
+PROFILE_VERSION = 1
+
+# Columnas de cada fila
+GAMES = 0
+DECISIONS = 1  # Decisiones propias
+OBSERVED = 2  # Decisiones de la mesa en las que se miró su mano
+HELD = slice(3, 3 + BELIEF_WIDTH)  # ... y tenía esa entrada
+WILD_CHANCES = HELD.stop  # Podía jugar un comodín u otra carta
+WILD_HELD = WILD_CHANCES + 1  # ... y se guardó el comodín
+ACTION_CHANCES = WILD_HELD + 1  # Podía jugar una carta de acción o un número
+ACTION_SAVED = ACTION_CHANCES + 1  # ... y jugó el número
+PROFILE_WIDTH = ACTION_SAVED + 1
+
+BRIER_TOLERANCE = 0.002  # evaluate falla si los perfiles empeoran el Brier medio más que esto
+PRIOR_WEIGHT = 50.0  # Observaciones ficticias con la frecuencia de todos los perfiles
+
+WILD_FACES = [color is None for color, _ in CARD_FACES]
+ACTION_FACES = [color is not None and not isinstance(value, int) for color, value in CARD_FACES]
+NUMBER_FACES = [isinstance(value, int) for _, value in CARD_FACES]
+
+
+def profile_counts(game, seats=None):
+    """Contadores de una partida terminada por nombre de jugador: {nombre: fila}.
+
+    Necesita las instantáneas de decisión (observador 'snapshots'); seats
+    limita qué asientos humanos se cuentan (por defecto todos).
+    """
+    human_seats = [p for p in range(game.num_players) if p != MACHINE_SEAT]
+    seats = human_seats if seats is None else [p for p in human_seats if p in seats]
+    rows = {p: np.zeros(PROFILE_WIDTH) for p in seats}
+    snapshots = game.decision_snapshots
+    if not snapshots:
+        return {}
+    # Una fila por (decisión, asiento humano), en el orden de human_seats
+    _, outcomes = snapshot_rows(snapshots)
+    for k, seat in enumerate(human_seats):
+        if seat in rows:
+            rows[seat][OBSERVED] += len(snapshots)
+            rows[seat][HELD] += outcomes[k::len(human_seats)].sum(axis=0)
+    for snapshot in snapshots:
+        row = rows.get(snapshot['player'])
+        if row is None:
+            continue
+        row[DECISIONS] += 1
+        legal = [face for face in set(snapshot['hand']) if face_is_legal(face, snapshot['top'])]
+        action = snapshot['action']
+        if any(WILD_FACES[face] for face in legal) and not all(WILD_FACES[face] for face in legal):
+            row[WILD_CHANCES] += 1
+            row[WILD_HELD] += not WILD_FACES[action]
+        if any(ACTION_FACES[face] for face in legal) and any(NUMBER_FACES[face] for face in legal):
+            row[ACTION_CHANCES] += 1
+            row[ACTION_SAVED] += NUMBER_FACES[action]
+    counts = {}
+    for seat, row in rows.items():
+        row[GAMES] = 1
+        name = game.player_names[seat]
+        if name in counts:
+            counts[name] += row
+        else:
+            counts[name] = row
+    return counts
+
+
+def merge_counts(total, counts):
+    for name, row in counts.items():
+        if name in total:
+            total[name] += row
+        else:
+            total[name] = row.copy()
+    return total
+
+
+class ProfileStore:
+    """Perfiles de un directorio; se abren con mmap en el primer prior() y se amplían con learn()/save()"""
+
+    def __init__(self, path, prior_weight=PRIOR_WEIGHT):
+        self.path = path
+        self.prior_weight = prior_weight
+        self._rows = None  # nombre -> fila
+        self._array = None
+        self._population = None  # (veces que se tenía cada entrada, decisiones) de todos los perfiles
+        self._factors = {}
+        self.pending = {}  # Contadores aprendidos que aún no se guardaron
+
+    def _open(self):
+        if self._rows is not None:
+            return
+        manifest = load_json(os.path.join(self.path, 'manifest.json'))
+        if manifest is None:
+            self._rows = {}
+            return
+        if manifest['format'] != PROFILE_FORMAT or manifest['version'] != PROFILE_VERSION:
+            raise ValueError(f"Perfiles {self.path} en formato no soportado: "
+                             f"{manifest['format']} v{manifest['version']}")
+        self._array = np.load(os.path.join(self.path, 'profiles.npy'), mmap_mode='r')
+        self._rows = {name: i for i, name in enumerate(manifest['names'])}
+
+    def names(self):
+        self._open()
+        return list(self._rows)
+
+    def counts(self, name):
+        """Fila de contadores guardada de name, o None si no tiene perfil"""
+        self._open()
+        row = self._rows.get(name)
+        return None if row is None else np.array(self._array[row])
+
+    def population(self):
+        """Frecuencia con que cualquier jugador de los perfiles tiene cada entrada"""
+        if self._population is None:
+            self._open()
+            totals = np.asarray(self._array).sum(axis=0) if self._rows else np.zeros(PROFILE_WIDTH)
+            self._population = totals[HELD] / max(totals[OBSERVED], 1)
+        return self._population
+
+    def factors(self, name):
+        """Factor por entrada de name respecto de todos los perfiles (1 = como cualquiera), o None"""
+        if name not in self._factors:
+            counts = self.counts(name)
+            factors = None
+            if counts is not None:
+                population = self.population()
+                weight = self.prior_weight
+                frequency = (counts[HELD] + weight * population) / (counts[OBSERVED] + weight)
+                factors = np.divide(frequency, population, out=np.ones(BELIEF_WIDTH),
+                                    where=population > 0).tolist()
+            self._factors[name] = factors
+        return self._factors[name]
+
+    def prior(self, name, initial):
+        """Probabilidades iniciales de name: initial (escala del modelo) por su factor, o None"""
+        factors = self.factors(name)
+        if factors is None:
+            return None
+        return [min(value * factor, 1.0) for value, factor in zip(initial, factors)]
+
+    def learn(self, game, seats=None):
+        """Acumula una partida terminada (ver profile_counts); se escribe con save()"""
+        merge_counts(self.pending, profile_counts(game, seats))
+
+    def save(self):
+        """Suma lo aprendido a los perfiles del directorio y los reescribe de forma atómica"""
+        if not self.pending:
+            return
+        self._open()
+        names = list(self._rows)
+        array = np.zeros((len(names) + len(set(self.pending) - set(names)), PROFILE_WIDTH))
+        if names:
+            array[:len(names)] = self._array[:len(names)]
+        for name, row in self.pending.items():
+            if name not in self._rows:
+                self._rows[name] = len(names)
+                names.append(name)
+            array[self._rows[name]] += row
+        # Soltar el mmap antes de reemplazar el archivo
+        self._array = None
+        self._rows = None
+        self._population = None
+        self._factors = {}
+        self.pending = {}
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, 'profiles.npy')
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        atomic_write_json(os.path.join(self.path, 'manifest.json'),
+                          {'format': PROFILE_FORMAT, 'version': PROFILE_VERSION, 'width': PROFILE_WIDTH,
+                           'names': names})
+
+    def summary(self, name):
+        """Resumen legible del perfil de name"""
+        counts = self.counts(name)
+        return {
+            'jugador': name,
+            'partidas': int(counts[GAMES]),
+            'decisiones': int(counts[DECISIONS]),
+            'guarda_comodín': counts[WILD_HELD] / max(counts[WILD_CHANCES], 1),
+            'guarda_acción': counts[ACTION_SAVED] / max(counts[ACTION_CHANCES], 1),
+            'frecuencias': dict(zip(LABELS, (counts[HELD] / max(counts[OBSERVED], 1)).tolist())),
+            'factores': dict(zip(LABELS, self.factors(name))),
+        }
+
+
+def parse_players(specs):
+    """'Nombre=política' -> [(nombre, política)], en el orden de los asientos humanos"""
+    players = []
+    for spec in specs:
+        name, sep, policy = spec.partition('=')
+        if not sep or not name:
+            raise ValueError(f"Jugador inválido: {spec} (se esperaba Nombre=política)")
+        players.append((name, policy))
+    return players
+
+
+def _play_games(seed_start, n_games, players, num_decks, profiles=None):
+    """Partidas grabadas con players (nombre, política) en los asientos humanos"""
+    from UNOArena import load_policy
+    num_players = len(players) + 1
+    seats = [p for p in range(num_players) if p != MACHINE_SEAT]
+    policies = {seat: load_policy(policy) for seat, (_, policy) in zip(seats, players)}
+    for seed in range(seed_start, seed_start + n_games):
+        game = UNOGameEngine(seed=seed, policies=policies, observers=('beliefs', 'snapshots'),
+                             num_players=num_players, num_decks=num_decks, profiles=profiles)
+        for seat, (name, _) in zip(seats, players):
+            game.player_names[seat] = name
+        game.start_new_game()
+        game.play_until_over(MAX_TURNS)
+        yield game
+
+
+def _learn_worker(args):
+    total = {}
+    for game in _play_games(*args):
+        merge_counts(total, profile_counts(game))
+    return total
+
+
+def learn_games(store, players, n_games, workers=None, seed=0, num_decks=1):
+    """Simula n_games partidas con players en los asientos humanos y guarda sus perfiles"""
+    workers = workers or os.cpu_count() or 1
+    per_worker = -(-n_games // workers)
+    jobs = [(seed + start, min(per_worker, n_games - start), players, num_decks)
+            for start in range(0, n_games, per_worker)]
+    if len(jobs) == 1:
+        results = [_learn_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+            results = list(pool.map(_learn_worker, jobs))
+    for counts in results:
+        merge_counts(store.pending, counts)
+    store.save()
+    return store
+
+
+def evaluate_profiles(store, players, n_games, seed=0, num_decks=1):
+    """Calibración (UNOCalibration) de las mismas partidas sin perfiles y con ellos: (base, perfiles).
+
+    Las semillas deberían ser otras que las del aprendizaje.
+    """
+    results = []
+    for profiles in (None, store):
+        stats = CalibrationStats()
+        for game in _play_games(seed, n_games, players, num_decks, profiles):
+            stats.update(*snapshot_rows(game.decision_snapshots))
+        results.append(stats)
+    return tuple(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfiles de jugadores para el agente de UNO")
+    sub = parser.add_subparsers(dest='command', required=True)
+    learn = sub.add_parser('learn', help="Simular partidas y acumular los perfiles")
+    learn.add_argument('--out', required=True, help="Directorio de perfiles (se amplía si existe)")
+    learn.add_argument('--player', action='append', required=True, metavar='NOMBRE=POLÍTICA',
+                       help="Jugador y política (ver UNOArena), uno por asiento humano")
+    learn.add_argument('--games', type=int, default=1000)
+    learn.add_argument('--workers', type=int, default=None)
+    learn.add_argument('--seed', type=int, default=0)
+    learn.add_argument('--decks', type=int, default=1)
+    show = sub.add_parser('show', help="Mostrar los perfiles guardados")
+    show.add_argument('--data', required=True, help="Directorio de perfiles")
+    evaluate = sub.add_parser('evaluate', help="Brier de las probabilidades sin perfiles y con ellos")
+    evaluate.add_argument('--data', required=True, help="Directorio de perfiles")
+    evaluate.add_argument('--player', action='append', required=True, metavar='NOMBRE=POLÍTICA',
+                          help="Jugador y política, en el mismo orden que en learn")
+    evaluate.add_argument('--games', type=int, default=500)
+    evaluate.add_argument('--seed', type=int, default=10 ** 6, help="Semillas distintas de las de learn")
+    evaluate.add_argument('--decks', type=int, default=1)
+    evaluate.add_argument('--tolerance', type=float, default=BRIER_TOLERANCE,
+                          help="Empeoramiento máximo del Brier medio antes de fallar")
+    args = parser.parse_args()
+
+    if args.command == 'learn':
+        store = learn_games(ProfileStore(args.out), parse_players(args.player), args.games,
+                            args.workers, args.seed, args.decks)
+        print(f"{len(store.names())} perfiles -> {args.out}")
+        return
+
+    store = ProfileStore(args.data)
+    if args.command == 'evaluate':
+        base, seeded = evaluate_profiles(store, parse_players(args.player), args.games, args.seed, args.decks)
+        print(f"\n🎯 PERFILES: {base.rows} filas (decisión, jugador) por variante")
+        print(f"{'Entrada':10s} {'Brier':>7s} {'perfil':>7s}")
+        for row, seeded_row in zip(base.summary(), seeded.summary()):
+            print(f"{row['entrada']:10s} {row['brier']:7.4f} {seeded_row['brier']:7.4f}")
+        base_brier = base.brier_sum.sum() / max(base.rows, 1) / BELIEF_WIDTH
+        seeded_brier = seeded.brier_sum.sum() / max(seeded.rows, 1) / BELIEF_WIDTH
+        print(f"{'Media':10s} {base_brier:7.4f} {seeded_brier:7.4f}")
+        # Con perfiles las probabilidades no deberían empeorar (más allá del ruido entre partidas)
+        if seeded_brier > base_brier + args.tolerance:
+            sys.exit(1)
+        return
+
+    print(f"\n👤 PERFILES: {args.data}")
+    for name in store.names():
+        summary = store.summary(name)
+        print(f"\n{name}: {summary['partidas']} partidas, {summary['decisiones']} decisiones")
+        print(f"  Se guarda el comodín {summary['guarda_comodín']:.1%} de las veces, "
+              f"la carta de acción {summary['guarda_acción']:.1%}")
+        print("  Tiene en la mano: " + "  ".join(f"{label} {frequency:.0%}"
+                                                 for label, frequency in summary['frecuencias'].items()))
+        print("  Factores: " + "  ".join(f"{label} {factor:.2f}"
+                                         for label, factor in summary['factores'].items()))
+
+
+if __name__ == "__main__":
+    main()
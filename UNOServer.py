@@ -0,0 +1,455 @@
+"""Servidor asyncio con muchas mesas simultáneas sobre el motor sin interfaz.
+
+Protocolo: un objeto JSON por línea, sobre TCP o socket Unix. Las cartas
+viajan como su índice en CARD_FACES.
+
+Cliente -> servidor
+    {"op": "join", "players": 3, "decks": 1, "humans": 1, "full": false}
+    {"op": "play", "card": <cara>}
+    {"op": "draw"}
+    {"op": "uno"}
+    {"op": "leave"}
+
+Servidor -> cliente
+    {"op": "joined", "table": <id>, "seat": <asiento>}
+    {"op": "event", "type": "CardPlayed", ...}
+    {"op": "state", "version": <n>, "hand": [...], "top": <cara>, "sizes": [...], ...}
+    {"op": "game_over", "winner": <asiento o null>}
+    {"op": "error", "message": "..."}
+
+Una mesa empieza cuando se unen `humans` clientes; los demás asientos los
+juegan bots con heuristic_policy (la cascada de machine_select_card) y la
+máquina ocupa siempre el asiento 1. Con "full": true el estado incluye
+contadores y probabilidades (lo que usa la interfaz en modo cliente).
+
+Uso:
+    python UNOServer.py serve --port 7777
+    python UNOServer.py serve --unix /tmp/uno.sock
+    python UNOServer.py bench --tables 300    # servidor y clientes de prueba en localhost
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from UNOEngine import MAX_TURNS, UNOGameEngine, card_from_face, face_is_legal, heuristic_policy
+from UNOEvents import EVENT_TYPES, CardDrawn, CardPlayed, DirectionReversed, GameOver, TurnSkipped
+
+DEFAULT_PORT = 7777
+BACKLOG = 1024  # Conexiones pendientes; cientos de clientes pueden conectarse a la vez
+
+
+def encode_message(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+
+def encode_event(event, seat):
+    """Evento del motor visto desde seat (las cartas robadas solo las ve quien roba)"""
+    if isinstance(event, CardPlayed):
+        return {'op': 'event', 'type': 'CardPlayed', 'player': event.player_id,
+                'card': event.card.face_id,
+                'prev': event.prev_card.face_id if event.prev_card else None,
+                'from_draw': event.from_draw}
+    if isinstance(event, CardDrawn):
+        cards = ([card.face_id for card in event.cards] if event.player_id == seat
+                 else len(event.cards))
+        return {'op': 'event', 'type': 'CardDrawn', 'player': event.player_id, 'cards': cards,
+                'reason': event.reason}
+    if isinstance(event, TurnSkipped):
+        return {'op': 'event', 'type': 'TurnSkipped', 'player': event.player_id,
+                'reason': event.reason}
+    if isinstance(event, DirectionReversed):
+        return {'op': 'event', 'type': 'DirectionReversed', 'direction': event.direction}
+    return {'op': 'event', 'type': 'GameOver', 'winner': event.winner_id}
+
+
+def decode_event(message):
+    """Evento del motor reconstruido en el cliente (las cartas ajenas llegan como None)"""
+    kind = message['type']
+    if kind == 'CardPlayed':
+        prev = message['prev']
+        return CardPlayed(message['player'], card_from_face(message['card']),
+                          card_from_face(prev) if prev is not None else None, message['from_draw'])
+    if kind == 'CardDrawn':
+        cards = message['cards']
+        cards = [card_from_face(face) for face in cards] if isinstance(cards, list) else [None] * cards
+        return CardDrawn(message['player'], cards, message['reason'])
+    if kind == 'TurnSkipped':
+        return TurnSkipped(message['player'], message['reason'])
+    if kind == 'DirectionReversed':
+        return DirectionReversed(message['direction'])
+    return GameOver(message['winner'])
+
+
+def encode_counters(card_counters):
+    """Contadores con claves de texto para JSON (los números van como lista 1-9)"""
+    return {
+        'colors': card_counters['colors'],
+        'numbers': [card_counters['numbers'][num] for num in range(1, 10)],
+        'number_0': card_counters['number_0'],
+        'specials': card_counters['specials'],
+        'wildcards': card_counters['wildcards'],
+    }
+
+
+def decode_counters(data):
+    counters = dict(data)
+    counters['numbers'] = {num: count for num, count in enumerate(data['numbers'], start=1)}
+    return counters
+
+
+class ProtocolError(Exception):
+    """Mensaje inválido o fuera de turno; se responde con {"op": "error"}"""
+
+
+def int_field(message, key, default):
+    """Campo entero de un mensaje (los booleanos, null y los textos son ProtocolError)"""
+    value = message.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ProtocolError(f"'{key}' debe ser un entero, no {json.dumps(value)}")
+    return value
+
+
+class Connection:
+    def __init__(self, writer):
+        self.writer = writer
+        self.table = None
+        self.seat = None
+        self.full = False
+
+    def send(self, message):
+        if not self.writer.is_closing():
+            self.writer.write(encode_message(message))
+
+
+class Table:
+    """Una partida con sus clientes; los asientos sin cliente los juega un bot"""
+
+    def __init__(self, table_id, num_players=3, num_decks=1, humans=1, bot_delay=0.0, seed=None):
+        self.table_id = table_id
+        self.config = (num_players, num_decks, humans)
+        self.game = UNOGameEngine(seed=seed, num_players=num_players, num_decks=num_decks,
+                                  observers=('beliefs',))
+        if not 0 < humans <= len(self.game.human_seats):
+            raise ProtocolError(f"Una mesa de {num_players} admite de 1 a "
+                                f"{len(self.game.human_seats)} clientes")
+        self.bot_delay = bot_delay
+        self.clients = {}  # asiento -> Connection
+        self.open_seats = list(self.game.human_seats[:humans])
+        self.version = 0  # Cambia con cada jugada; los clientes actúan una vez por versión
+        self.moves = 0
+        self.finished = False
+        self._running_bots = False
+        self._events = []
+        for event_type in EVENT_TYPES:
+            self.game.events.subscribe(event_type, self._events.append)
+
+    @property
+    def waiting(self):
+        return bool(self.open_seats)
+
+    def is_bot(self, seat):
+        return seat == 1 or seat in self.game.policies
+
+    async def join(self, connection):
+        seat = self.open_seats.pop(0)
+        self.clients[seat] = connection
+        connection.table, connection.seat = self, seat
+        connection.send({'op': 'joined', 'table': self.table_id, 'seat': seat})
+        if not self.open_seats:
+            await self.start()
+
+    async def start(self):
+        for seat in self.game.human_seats:
+            if seat not in self.clients:
+                self.game.policies[seat] = heuristic_policy
+        self.game.start_new_game()
+        self.version += 1
+        await self.run_bots()
+
+    async def leave(self, connection):
+        """El asiento del cliente pasa a un bot (o vuelve a quedar libre si no empezó)"""
+        seat = connection.seat
+        self.clients.pop(seat, None)
+        connection.table = connection.seat = None
+        if not self.game.game_started and not self.finished:
+            self.open_seats.insert(0, seat)
+            return
+        self.game.policies[seat] = heuristic_policy
+        await self.run_bots()
+
+    async def handle(self, connection, message):
+        """Aplica la jugada de un cliente y deja jugar a los bots hasta el siguiente cliente"""
+        game = self.game
+        seat = connection.seat
+        if not game.game_started or game.current_player != seat:
+            raise ProtocolError("No es tu turno")
+        op = message.get('op')
+        if op == 'play':
+            face = int_field(message, 'card', None)
+            hand = game.player_hands[seat]
+            index = next((i for i, card in enumerate(hand) if card.face_id == face), None)
+            if index is None:
+                raise ProtocolError(f"La carta {face} no está en tu mano")
+            if not game.is_valid_play(hand[index]):
+                raise ProtocolError("Jugada inválida")
+            card = game.take_card(seat, index)
+            game.play_card(seat, card)
+        elif op == 'draw':
+            game.draw_card()
+        elif op == 'uno':
+            game.declare_uno()
+            return
+        else:
+            raise ProtocolError(f"Operación desconocida: {op}")
+        self.moves += 1
+        self.version += 1
+        await self.run_bots()
+
+    async def run_bots(self):
+        """Juega los turnos de bots seguidos; con bot_delay, publica y espera entre turnos"""
+        if self._running_bots:
+            return  # El bucle en curso ya recoge los nuevos asientos de bot
+        self._running_bots = True
+        game = self.game
+        try:
+            while game.game_started and self.is_bot(game.current_player) and self.moves < MAX_TURNS:
+                game.play_turn()
+                self.moves += 1
+                self.version += 1
+                if self.bot_delay:
+                    self.broadcast()
+                    await asyncio.sleep(self.bot_delay)
+        finally:
+            self._running_bots = False
+        if game.game_started and self.moves >= MAX_TURNS:
+            game.game_over(None)  # Partida atascada: se da por terminada sin ganador
+        self.broadcast()
+
+    def broadcast(self):
+        """Envía a cada cliente los eventos pendientes y su vista del estado"""
+        events, self._events[:] = list(self._events), []
+        game = self.game
+        for seat, connection in self.clients.items():
+            for event in events:
+                connection.send(encode_event(event, seat))
+            connection.send(self.state_for(seat, connection.full))
+        if not game.game_started and game.winner is not None or self.moves >= MAX_TURNS:
+            self.finish()
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        for connection in self.clients.values():
+            connection.send({'op': 'game_over', 'winner': self.game.winner})
+
+    def state_for(self, seat, full=False):
+        game = self.game
+        state = {
+            'op': 'state',
+            'table': self.table_id,
+            'version': self.version,
+            'seat': seat,
+            'started': game.game_started,
+            'hand': [card.face_id for card in game.player_hands[seat]],
+            'top': game.current_card.face_id if game.current_card else None,
+            'sizes': [len(hand) for hand in game.player_hands],
+            'turn': game.current_player,
+            'direction': game.game_direction,
+        }
+        if full:
+            state['names'] = game.player_names
+            state['counters'] = encode_counters(game.card_counters)
+            state['beliefs'] = {str(p): game.probability_vector(p) for p in game.human_seats}
+            state['deck'] = len(game.deck.cards)
+            state['discarded'] = len(game.deck.discarded)
+        return state
+
+
+class UNOServer:
+    def __init__(self, bot_delay=0.0, seed=None):
+        self.bot_delay = bot_delay
+        self.seed = seed
+        self.tables = {}
+        self.next_table_id = 1
+        self.games_finished = 0
+
+    def find_table(self, num_players, num_decks, humans):
+        """Mesa que espera clientes con la misma configuración, o una nueva"""
+        config = (num_players, num_decks, humans)
+        for table in self.tables.values():
+            if table.waiting and table.config == config:
+                return table
+        table_id = self.next_table_id
+        self.next_table_id += 1
+        seed = None if self.seed is None else self.seed + table_id
+        try:
+            table = Table(table_id, num_players, num_decks, humans, self.bot_delay, seed)
+        except ValueError as e:
+            raise ProtocolError(str(e))
+        self.tables[table_id] = table
+        return table
+
+    def drop_finished(self, table):
+        if table.finished and self.tables.pop(table.table_id, None) is not None:
+            self.games_finished += 1
+
+    async def dispatch(self, connection, message):
+        """Aplica un mensaje del cliente; los mensajes mal formados son ProtocolError"""
+        op = message.get('op')
+        table = connection.table
+        if op == 'join':
+            if table is not None:
+                raise ProtocolError("Ya estás en una mesa")
+            table = self.find_table(int_field(message, 'players', 3), int_field(message, 'decks', 1),
+                                    int_field(message, 'humans', 1))
+            connection.full = bool(message.get('full', False))
+            await table.join(connection)
+        elif table is None:
+            raise ProtocolError("Primero hay que unirse a una mesa")
+        elif op == 'leave':
+            await table.leave(connection)
+        else:
+            await table.handle(connection, message)
+        if table is not None:
+            self.drop_finished(table)
+
+    async def handle_client(self, reader, writer):
+        connection = Connection(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ProtocolError("Se esperaba un objeto JSON")
+                    await self.dispatch(connection, message)
+                except (ProtocolError, ValueError) as e:
+                    connection.send({'op': 'error', 'message': str(e)})
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            table = connection.table
+            if table is not None:
+                await table.leave(connection)
+                self.drop_finished(table)
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_client, path=unix_path, backlog=BACKLOG)
+        return await asyncio.start_server(self.handle_client, host, port, backlog=BACKLOG)
+
+
+# ----------------------------------------------------------------------
+# Clientes de prueba
+# ----------------------------------------------------------------------
+async def open_connection(host='127.0.0.1', port=DEFAULT_PORT, unix_path=None):
+    if unix_path:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+
+def choose_move(state):
+    """Mensaje de un cliente de prueba: primera carta válida, o robar"""
+    top = state['top']
+    for face in state['hand']:
+        if face_is_legal(face, top):
+            return {'op': 'play', 'card': face}
+    return {'op': 'draw'}
+
+
+async def scripted_client(host='127.0.0.1', port=DEFAULT_PORT, unix_path=None, players=3, humans=1):
+    """Juega una partida completa y devuelve (ganador, asiento, jugadas propias)"""
+    reader, writer = await open_connection(host, port, unix_path)
+    writer.write(encode_message({'op': 'join', 'players': players, 'humans': humans}))
+    acted_version = None
+    moves = 0
+    seat = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("El servidor cerró la conexión")
+            message = json.loads(line)
+            op = message['op']
+            if op == 'joined':
+                seat = message['seat']
+            elif op == 'game_over':
+                return message['winner'], seat, moves
+            elif op == 'error':
+                raise RuntimeError(message['message'])
+            elif (op == 'state' and message['started'] and message['turn'] == seat
+                  and message['version'] != acted_version):
+                acted_version = message['version']
+                if len(message['hand']) == 1:
+                    writer.write(encode_message({'op': 'uno'}))
+                writer.write(encode_message(choose_move(message)))
+                moves += 1
+                await writer.drain()
+    finally:
+        writer.close()
+
+
+async def run_bench(tables, players=3, humans=1, unix=True):
+    """Servidor y tables x humans clientes de prueba en el mismo proceso"""
+    server = UNOServer(seed=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        unix_path = os.path.join(tmp, 'uno.sock') if unix else None
+        listener = await server.start(port=0, unix_path=unix_path)
+        port = None if unix else listener.sockets[0].getsockname()[1]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            scripted_client(port=port, unix_path=unix_path, players=players, humans=humans)
+            for _ in range(tables * humans)))
+        elapsed = time.perf_counter() - start
+        listener.close()
+        await listener.wait_closed()
+    return results, elapsed, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de mesas de UNO")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="Atiende clientes por TCP o socket Unix")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--unix', default=None, help="Ruta de un socket Unix en lugar de TCP")
+    serve.add_argument('--bot-delay', type=float, default=0.0,
+                       help="Segundos entre turnos de bots (0 = sin espera)")
+    serve.add_argument('--seed', type=int, default=None)
+    bench = sub.add_parser('bench', help="Mesas simultáneas con clientes de prueba en localhost")
+    bench.add_argument('--tables', type=int, default=300)
+    bench.add_argument('--players', type=int, default=3)
+    bench.add_argument('--humans', type=int, default=1, help="Clientes por mesa")
+    bench.add_argument('--tcp', action='store_true', help="Usar TCP en lugar de socket Unix")
+    args = parser.parse_args()
+    if args.command == 'serve':
+        async def serve_forever():
+            server = UNOServer(args.bot_delay, args.seed)
+            listener = await server.start(args.host, args.port, args.unix)
+            print(f"🃏 Servidor UNO escuchando en {args.unix or f'{args.host}:{args.port}'}")
+            async with listener:
+                await listener.serve_forever()
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        results, elapsed, server = asyncio.run(
+            run_bench(args.tables, args.players, args.humans, unix=not args.tcp))
+        moves = sum(m for _, _, m in results)
+        client_wins = sum(1 for winner, seat, _ in results if winner == seat)
+        print(f"{server.games_finished} mesas terminadas en {elapsed:.2f} s "
+              f"({server.games_finished / elapsed:.1f} partidas/s, {moves / elapsed:.0f} jugadas de clientes/s)")
+        print(f"Victorias de clientes: {client_wins}/{len(results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Ajuste de los parámetros de machine_select_card por autojuego en paralelo.
+
+Búsqueda evolutiva simple: cada generación evalúa una población de
+conjuntos de parámetros con la máquina (asiento 1) contra oponentes base,
+conserva a los mejores y genera el resto por cruce y mutación. Todos los
+candidatos juegan con las mismas semillas para reducir la varianza. Al
+final, los mejores se vuelven a evaluar con semillas nuevas y se reportan
+con su intervalo de confianza (Wilson, 95%).
+
+Uso:
+    python UNOTuner.py --generations 10 --population 16 --games 400 --opponent heuristic
+"""
+import argparse
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+from UNOEngine import (DEFAULT_HEURISTIC_PARAMS, heuristic_policy, make_heuristic_policy,
+                       play_headless_game, random_policy)
+
+# Espacio de búsqueda
+THRESHOLDS = list(range(0, 8))
+DEFENSIVE_CARDS = ['r2', 'r4', 's', 'rev']
+STRATEGY_ORDERS = list(permutations(('color', 'number', 'wildcard')))
+TIE_BREAKS = ['random', 'probability']
+
+OPPONENTS = {'heuristic': heuristic_policy, 'random': random_policy}
+EVAL_SEED_OFFSET = 10 ** 6  # Semillas de la reevaluación final, distintas de la búsqueda
+
+
+def random_params(rng):
+    return {
+        'defensive_threshold': rng.choice(THRESHOLDS),
+        'defensive_cards': tuple(c for c in DEFENSIVE_CARDS if rng.random() < 0.5),
+        'strategy_order': rng.choice(STRATEGY_ORDERS),
+        'tie_break': rng.choice(TIE_BREAKS),
+    }
+
+
+def mutate(params, rng, rate=0.3):
+    child = dict(params)
+    if rng.random() < rate:
+        child['defensive_threshold'] = min(max(child['defensive_threshold'] + rng.choice([-1, 1]), 0),
+                                           THRESHOLDS[-1])
+    if rng.random() < rate:
+        cards = set(child['defensive_cards']) ^ {rng.choice(DEFENSIVE_CARDS)}
+        child['defensive_cards'] = tuple(c for c in DEFENSIVE_CARDS if c in cards)
+    if rng.random() < rate:
+        child['strategy_order'] = rng.choice(STRATEGY_ORDERS)
+    if rng.random() < rate:
+        child['tie_break'] = rng.choice(TIE_BREAKS)
+    return child
+
+
+def crossover(a, b, rng):
+    return {key: (a if rng.random() < 0.5 else b)[key] for key in DEFAULT_HEURISTIC_PARAMS}
+
+
+def params_key(params):
+    return tuple(sorted((key, tuple(value) if isinstance(value, (list, tuple)) else value)
+                        for key, value in params.items()))
+
+
+def wilson_interval(wins, games, z=1.96):
+    """Intervalo de confianza de Wilson para una tasa de victorias"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _evaluate_chunk(args):
+    params, opponent, seeds = args
+    policy = make_heuristic_policy(params)
+    opponent_policy = OPPONENTS[opponent]
+    wins = 0
+    for seed in seeds:
+        game = play_headless_game(seed=seed, policies={0: opponent_policy, 2: opponent_policy},
+                                  machine_policy=policy)
+        wins += game.winner == 1
+    return wins
+
+
+def evaluate_population(pool, population, opponent, seeds, chunk_size=50):
+    """Victorias de la máquina para cada candidato, repartiendo semillas entre procesos"""
+    jobs = []
+    owners = []
+    for index, params in enumerate(population):
+        for start in range(0, len(seeds), chunk_size):
+            jobs.append((params, opponent, seeds[start:start + chunk_size]))
+            owners.append(index)
+    wins = [0] * len(population)
+    for owner, chunk_wins in zip(owners, pool.map(_evaluate_chunk, jobs)):
+        wins[owner] += chunk_wins
+    return wins
+
+
+def tune(generations=10, population_size=16, games=400, opponent='heuristic', elite=4,
+         top=5, final_games=2000, workers=None, seed=0, log=print):
+    """Ejecuta la búsqueda y devuelve los mejores candidatos con su intervalo"""
+    rng = random.Random(seed)
+    population = [dict(DEFAULT_HEURISTIC_PARAMS)]
+    population += [random_params(rng) for _ in range(population_size - 1)]
+    seeds = list(range(seed, seed + games))
+    scored = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for generation in range(generations):
+            pending = [p for p in population if params_key(p) not in scored]
+            for params, wins in zip(pending, evaluate_population(pool, pending, opponent, seeds)):
+                scored[params_key(params)] = (wins, params)
+            ranked = sorted(population, key=lambda p: scored[params_key(p)][0], reverse=True)
+            best_wins = scored[params_key(ranked[0])][0]
+            log(f"Generación {generation + 1}/{generations}: mejor {best_wins / games:.1%}")
+            parents = ranked[:elite]
+            population = list(parents)
+            seen = {params_key(p) for p in population}
+            while len(population) < population_size:
+                child = mutate(crossover(rng.choice(parents), rng.choice(parents), rng), rng)
+                if params_key(child) not in seen:
+                    seen.add(params_key(child))
+                    population.append(child)
+        # Reevaluar a los mejores (y al valor por defecto) con semillas nuevas
+        finalists = sorted(scored.values(), key=lambda item: item[0], reverse=True)[:top]
+        finalists = [params for _, params in finalists]
+        if params_key(DEFAULT_HEURISTIC_PARAMS) not in {params_key(p) for p in finalists}:
+            finalists.append(dict(DEFAULT_HEURISTIC_PARAMS))
+        final_seeds = list(range(EVAL_SEED_OFFSET + seed, EVAL_SEED_OFFSET + seed + final_games))
+        final_wins = evaluate_population(pool, finalists, opponent, final_seeds)
+    results = []
+    for params, wins in zip(finalists, final_wins):
+        low, high = wilson_interval(wins, final_games)
+        results.append({
+            'params': {key: list(value) if isinstance(value, tuple) else value
+                       for key, value in params.items()},
+            'default': params_key(params) == params_key(DEFAULT_HEURISTIC_PARAMS),
+            'wins': wins,
+            'games': final_games,
+            'win_rate': wins / final_games,
+            'ci95': [low, high],
+        })
+    results.sort(key=lambda r: r['win_rate'], reverse=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajusta los parámetros de la heurística de la máquina")
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--population', type=int, default=16)
+    parser.add_argument('--games', type=int, default=400, help="Partidas por candidato y generación")
+    parser.add_argument('--final-games', type=int, default=2000, help="Partidas de la reevaluación final")
+    parser.add_argument('--opponent', choices=sorted(OPPONENTS), default='heuristic')
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+    results = tune(args.generations, args.population, args.games, args.opponent,
+                   top=args.top, final_games=args.final_games, workers=args.workers, seed=args.seed)
+    print("\n🏆 MEJORES CONFIGURACIONES")
+    for result in results:
+        low, high = result['ci95']
+        marker = " (por defecto)" if result['default'] else ""
+        print(f"{result['win_rate']:.1%} [{low:.1%}, {high:.1%}]{marker}: {result['params']}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import UNOBenchmark
+
+
+def test_failed_benchmark_is_recorded_and_the_rest_still_run(monkeypatch):
+    def broken(scale):
+        raise KeyError('colors')
+    monkeypatch.setitem(UNOBenchmark.BENCHMARKS, 'broken', broken)
+    suite = UNOBenchmark.run_suite(['broken', 'update_probabilities_after_play'], repeats=1, log=lambda *a: None)
+    assert suite['failed'] == {'broken': "KeyError: 'colors'"}
+    assert 'update_probabilities_after_play' in suite['results']
@@ -0,0 +1,39 @@
+from UNOEngine import BELIEF_INDEX, UNOCard, UNOGameEngine
+
+
+def first_play(seed):
+    """Juega hasta la primera carta registrada; devuelve (motor, probabilidades antes de ese turno)"""
+    game = UNOGameEngine(seed=seed, observers=('beliefs', 'stats', 'snapshots'))
+    game.start_new_game()
+    while True:
+        before = {p: game.probability_vector(p) for p in game.human_seats}
+        game.play_turn()
+        if game.jugada_stats:
+            return game, before
+
+
+def test_stats_record_beliefs_before_the_play():
+    game, before = first_play(seed=1)
+    row = game.jugada_stats[0]
+    assert row['J1_ROJO'] == before[0][BELIEF_INDEX['colors', 'r']] * 100
+    assert row['J1_8'] == before[0][BELIEF_INDEX['numbers', 8]] * 100
+    # Con seed=1 la primera jugada cambia esas dos entradas
+    assert game.probability_vector(0) != before[0]
+
+
+def test_snapshots_record_beliefs_before_the_play():
+    game, before = first_play(seed=1)
+    assert game.decision_snapshots[0]['beliefs'] == [before[p] for p in sorted(before)]
+
+
+def test_wild_as_previous_card_updates_without_error():
+    game = UNOGameEngine(seed=0, observers=('beliefs',))
+    game.start_new_game()
+    before = game.probability_vector(0)
+    # Comodín previo (sin color ni número) seguido de un comodín, un número y una especial
+    for card_color, value, card_type in ((None, 'r4', 'wildcard'), ('r', 5, 'number'), ('a', 's', 'special')):
+        card = UNOCard(card_color, value, card_type)
+        game.update_probabilities_after_play(0, card, None, 'c')
+    after = game.probability_vector(0)
+    assert after[BELIEF_INDEX['wildcards', 'r4']] != before[BELIEF_INDEX['wildcards', 'r4']]
+    assert all(0.0 <= value <= 1.0 for value in after)
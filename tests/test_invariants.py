@@ -0,0 +1,21 @@
+from UNOEngine import UNOGameEngine, play_headless_game
+from UNOInvariants import InvariantChecker
+
+
+def test_correct_game_reports_no_counter_violations():
+    checker = InvariantChecker(rate=1.0)
+    for seed in range(20):
+        play_headless_game(seed=seed, invariants=checker)
+    assert checker.checks > 0
+    assert checker.violations['contador'] == 0
+
+
+def test_counting_machine_plays_is_a_counter_violation(monkeypatch):
+    # La máquina no se cuenta; si el motor la descontara, el contador baja por una causa desconocida
+    def count_everyone(self, player_id, card, prev_color, prev_value):
+        self.update_card_counters_remove(card)
+    monkeypatch.setattr(UNOGameEngine, 'update_probabilities_after_play', count_everyone)
+    checker = InvariantChecker(rate=1.0)
+    play_headless_game(seed=3, invariants=checker)
+    assert checker.violations['contador'] > 0
+    assert checker.examples[0]['tipo'] == 'contador'